@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Measure throughput, request latency and peak memory of the client
+against a local stub of the Float API (tests/stub_server.py),
+run in a separate process with synthetic data.
+
+  python benchmarks/client_performance.py [--tasks 20000] [--latency 0.01]
+    [--rate 200 --per 1] [--writes 500] [--save results.json]
+    [--baseline results.json --tolerance 0.25]
+
+With --baseline, scenarios slower (objects/s) or using more memory
+than the baseline, beyond the tolerance, are reported and the exit
+status is 1, so regressions can fail a release build.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# The stub of the Float API shared with the tests
+STUB_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests', 'stub_server.py')
+
+from float_api import FloatAPI
+
+try:
+  from float_api import AsyncFloatAPI
+  import httpx
+except ImportError:
+  httpx = None
+
+
+def new_tasks(n):
+  return [
+    {'project_id': 1, 'people_id': 1 + i % 10, 'start_date': '2023-06-01',
+     'end_date': '2023-06-02', 'hours': 4, 'name': 'Benchmark {}'.format(i)}
+    for i in range(n)
+    ]
+
+
+def created_ids(api, n):
+  """Create n tasks, returning their ids"""
+  return [r.result['task_id'] for r in api.bulk_create_tasks(new_tasks(n)) if r.ok]
+
+
+def get_all_async(sync_api, url, workers):
+  async def run():
+    async with AsyncFloatAPI('token', 'benchmark', 'benchmark@example.com', max_workers=workers) as api:
+      api.base_url = url + '{}'
+      api.hooks = sync_api.hooks
+      return len(await api.get_all_tasks())
+
+  return asyncio.run(run())
+
+
+def scenarios(args, url):
+  """
+  Returns:
+    (name, run, setup, teardown) tuples. run(api, state) returns the
+    number of objects handled. setup(api) returns the state, and
+    teardown(api, state) cleans up. Only run is timed.
+  """
+  none = lambda api: None
+  keep = lambda api, state: None
+  delete = lambda api, ids: api.bulk_delete_tasks(ids)
+
+  s = [
+    ('get_all_tasks (1 worker)', lambda api, _: len(api.get_all_tasks(max_workers=1)), none, keep),
+    ('get_all_tasks ({} workers)'.format(args.workers), lambda api, _: len(api.get_all_tasks()), none, keep),
+    ('get_all_tasks as_records', lambda api, _: len(api.get_all_tasks(as_records=True)), none, keep),
+    ('iter_all_tasks', lambda api, _: sum(1 for t in api.iter_all_tasks()), none, keep),
+    ('iter_all_tasks (no read ahead)', lambda api, _: sum(1 for t in api.iter_all_tasks(read_ahead=False)), none, keep),
+    ('get_all_people', lambda api, _: len(api.get_all_people()), none, keep),
+  ]
+
+  if httpx is not None:
+    s.append(('async get_all_tasks', lambda api, _: get_all_async(api, url, args.workers), none, keep))
+
+  if args.writes:
+    s += [
+      ('bulk_create_tasks',
+        lambda api, items: sum(r.ok for r in api.bulk_create_tasks(items)),
+        lambda api: new_tasks(args.writes),
+        lambda api, items: None),
+      ('bulk_update_tasks',
+        lambda api, ids: sum(r.ok for r in api.bulk_update_tasks([{'task_id': i, 'hours': 2} for i in ids]).values()),
+        lambda api: created_ids(api, args.writes),
+        delete),
+      ('bulk_delete_tasks',
+        lambda api, ids: sum(r.ok for r in api.bulk_delete_tasks(ids).values()),
+        lambda api: created_ids(api, args.writes),
+        keep),
+    ]
+
+  return s
+
+
+def percentile(values, p):
+  if not values:
+    return 0
+  values = sorted(values)
+  return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def measure(api, run, setup, teardown, repeat, memory):
+  """
+  Returns:
+    The result of the fastest of repeat runs, with the peak memory
+    of an extra run if memory
+  """
+  latencies = []
+
+  def hook(event, info):
+    if event == 'request':
+      latencies.append(info['elapsed'])
+
+  api.add_hook(hook)
+  best = None
+
+  try:
+    for _ in range(repeat):
+      state = setup(api)
+      del latencies[:]
+
+      start = time.perf_counter()
+      count = run(api, state)
+      seconds = time.perf_counter() - start
+      requests = list(latencies)
+
+      teardown(api, state)
+
+      if best is None or seconds < best['seconds']:
+        best = {
+          'objects': count,
+          'seconds': seconds,
+          'objects_per_second': count / seconds,
+          'requests': len(requests),
+          'requests_per_second': len(requests) / seconds,
+          'latency_p50_ms': percentile(requests, 0.50) * 1000,
+          'latency_p95_ms': percentile(requests, 0.95) * 1000,
+          'latency_p99_ms': percentile(requests, 0.99) * 1000,
+        }
+
+    if memory:
+      state = setup(api)
+      tracemalloc.start()
+      try:
+        run(api, state)
+        best['peak_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+      finally:
+        tracemalloc.stop()
+      teardown(api, state)
+
+  finally:
+    api.remove_hook(hook)
+
+  return best
+
+
+def compare(results, baseline, tolerance):
+  """
+  Returns:
+    A list of regressions against the baseline
+  """
+  regressions = []
+
+  for name, r in results.items():
+    b = baseline.get(name)
+    if not b:
+      continue
+
+    if r['objects_per_second'] < b['objects_per_second'] * (1 - tolerance):
+      regressions.append('{}: {:.0f} objects/s, was {:.0f}'.format(
+        name, r['objects_per_second'], b['objects_per_second']))
+
+    if r.get('peak_mb') and b.get('peak_mb') and r['peak_mb'] > b['peak_mb'] * (1 + tolerance):
+      regressions.append('{}: {:.1f} MB peak, was {:.1f}'.format(name, r['peak_mb'], b['peak_mb']))
+
+  return regressions
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--tasks', type=int, default=20000)
+  parser.add_argument('--people', type=int, default=1000)
+  parser.add_argument('--latency', type=float, default=0.01, help='Seconds per request')
+  parser.add_argument('--rate', type=int, default=None, help='Requests per window')
+  parser.add_argument('--per', type=float, default=60, help='Seconds per rate limit window')
+  parser.add_argument('--writes', type=int, default=500, help='Objects per bulk write (0 to skip)')
+  parser.add_argument('--workers', type=int, default=4)
+  parser.add_argument('--repeat', type=int, default=3)
+  parser.add_argument('--no-memory', action='store_true', help='Skip measuring peak memory')
+  parser.add_argument('--only', help='Only scenarios with names containing this')
+  parser.add_argument('--save', help='Write the results to this JSON file')
+  parser.add_argument('--baseline', help='Compare with results saved with --save')
+  parser.add_argument('--tolerance', type=float, default=0.25)
+  args = parser.parse_args()
+
+  # The stub runs in its own process, so it is left
+  # out of the memory measurements and the GIL
+  server = subprocess.Popen(
+    [sys.executable, STUB_SERVER,
+     '--tasks', str(args.tasks), '--people', str(args.people), '--latency', str(args.latency),
+     '--per', str(args.per)] + (['--rate', str(args.rate)] if args.rate else []),
+    stdout=subprocess.PIPE, universal_newlines=True
+    )
+
+  try:
+    url = server.stdout.readline().strip()
+
+    api = FloatAPI('token', 'benchmark', 'benchmark@example.com', max_workers=args.workers)
+    api.base_url = url + '{}'
+
+    print('{} tasks, {} people, {} ms latency{}'.format(
+      args.tasks, args.people, args.latency * 1000,
+      ', {} requests per {} s'.format(args.rate, args.per) if args.rate else ''))
+    print('{:<32}{:>9}{:>10}{:>11}{:>9}{:>9}{:>9}{:>10}'.format(
+      'scenario', 'objects', 'seconds', 'objects/s', 'req/s', 'p50 ms', 'p95 ms', 'peak MB'))
+
+    results = {}
+    for name, run, setup, teardown in scenarios(args, url):
+      if args.only and args.only not in name:
+        continue
+
+      r = measure(api, run, setup, teardown, args.repeat, not args.no_memory)
+      results[name] = r
+
+      print('{:<32}{:>9}{:>10.2f}{:>11.0f}{:>9.0f}{:>9.1f}{:>9.1f}{:>10}'.format(
+        name, r['objects'], r['seconds'], r['objects_per_second'], r['requests_per_second'],
+        r['latency_p50_ms'], r['latency_p95_ms'],
+        '{:.1f}'.format(r['peak_mb']) if 'peak_mb' in r else '-'))
+
+  finally:
+    server.terminate()
+    server.wait()
+
+  if args.save:
+    with open(args.save, 'w') as f:
+      json.dump(results, f, indent=2)
+
+  if args.baseline:
+    with open(args.baseline) as f:
+      regressions = compare(results, json.load(f), args.tolerance)
+
+    for r in regressions:
+      print('Regression:', r)
+
+    if regressions:
+      sys.exit(1)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Compare the JSON decoders available to FloatAPI on pages of tasks.
+
+  python benchmarks/json_decoding.py [--pages 100] [--per-page 200]
+"""
+import argparse
+import json
+import timeit
+
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+
+def task(i):
+  """A task like the ones returned by the API"""
+  return {
+    "task_id": i,
+    "project_id": i % 50,
+    "phase_id": 0,
+    "start_date": "2023-01-02",
+    "end_date": "2023-01-06",
+    "start_time": None,
+    "hours": 7.5,
+    "people_id": i % 300,
+    "status": 2,
+    "priority": 0,
+    "name": "Task number {}".format(i),
+    "notes": "Some notes about task {}".format(i),
+    "repeat_state": 0,
+    "repeat_end_date": None,
+    "created_by": 1,
+    "created": "2023-01-01 12:00:00",
+    "modified_by": 1,
+    "modified": "2023-01-01 12:00:00",
+  }
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument('--pages', type=int, default=100)
+  parser.add_argument('--per-page', type=int, default=200)
+  parser.add_argument('--repeat', type=int, default=5)
+  args = parser.parse_args()
+
+  pages = [
+    json.dumps([task(p * args.per_page + i) for i in range(args.per_page)]).encode()
+    for p in range(args.pages)
+    ]
+
+  decoders = {
+    # What requests' Response.json() does
+    'json.loads(str)': lambda b: json.loads(b.decode('utf-8')),
+    'json.loads(bytes)': json.loads,
+  }
+  if orjson is not None:
+    decoders['orjson.loads(bytes)'] = orjson.loads
+
+  print("{} pages of {} tasks, {:.1f} MB".format(
+    args.pages, args.per_page, sum(len(p) for p in pages) / 1e6))
+
+  baseline = None
+  for name, decode in decoders.items():
+    seconds = min(timeit.repeat(lambda: [decode(p) for p in pages], number=1, repeat=args.repeat))
+    baseline = baseline or seconds
+    print("{:<22}{:8.1f} ms {:6.1f}x".format(name, seconds * 1000, baseline / seconds))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Compare the transports of FloatAPI against a local stub of the API
+(tests/stub_server.py): the overhead per request of sequential
+requests, and the time and connections used by concurrent pages and
+bulk writes.
+
+  python benchmarks/transports.py [--requests 2000] [--tasks 20000] [--workers 8]
+
+The stub only speaks HTTP/1.1 without TLS, so HTTP/2 is only compared
+with --url, pointing at a server (or proxy) speaking HTTP/2 over TLS.
+HTTP/2 requires h2: pip install float-api[http2]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# The stub of the Float API shared with the tests
+STUB_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests', 'stub_server.py')
+
+from float_api import FloatAPI
+from float_api import RequestsTransport
+
+try:
+  from float_api import HTTPXTransport
+  import httpx
+except ImportError:
+  httpx = None
+
+try:
+  import h2
+except ImportError:
+  h2 = None
+
+
+def transports(args):
+  """
+  Returns:
+    (name, function returning a new transport) tuples
+  """
+  t = [('requests', lambda: RequestsTransport(pool_maxsize=args.workers))]
+
+  if httpx is not None:
+    t.append(('httpx HTTP/1.1', lambda: HTTPXTransport(http2=False, max_connections=args.workers)))
+    if h2 is not None and args.url:
+      t.append(('httpx HTTP/2', lambda: HTTPXTransport(http2=True, max_connections=args.workers)))
+
+  return t
+
+
+def stats(url):
+  """
+  Returns:
+    The counters of the stub, or None for other servers
+  """
+  try:
+    with urllib.request.urlopen(url.split('/v3/')[0] + '/stats') as r:
+      return json.load(r)
+  except Exception:
+    return None
+
+
+def run(args, url, name, new_transport):
+  api = FloatAPI('token', 'benchmark', 'benchmark@example.com', max_workers=args.workers,
+                 transport=new_transport())
+  api.base_url = url + '{}'
+
+  # Open the connections
+  api.get_person(1)
+
+  result = {}
+
+  before = stats(url)
+  start = time.perf_counter()
+  for _ in range(args.requests):
+    api.get_person(1)
+  result['us_per_request'] = (time.perf_counter() - start) / args.requests * 1e6
+
+  start = time.perf_counter()
+  tasks = api.get_all_tasks()
+  result['get_all_seconds'] = time.perf_counter() - start
+  result['objects'] = len(tasks)
+
+  items = [
+    {'project_id': 1, 'people_id': 1, 'start_date': '2023-06-01', 'end_date': '2023-06-01', 'hours': 1}
+    for _ in range(args.writes)
+    ]
+  start = time.perf_counter()
+  created = api.bulk_create_tasks(items, max_workers=args.workers)
+  result['bulk_seconds'] = time.perf_counter() - start
+  api.bulk_delete_tasks([r.result['task_id'] for r in created if r.ok])
+
+  after = stats(url)
+  if before and after:
+    result['connections'] = after['connections'] - before['connections']
+
+  api.close()
+
+  return result
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--url', help='Base URL of another server, e.g. https://localhost:8443/v3/')
+  parser.add_argument('--requests', type=int, default=2000, help='Sequential requests')
+  parser.add_argument('--tasks', type=int, default=20000)
+  parser.add_argument('--writes', type=int, default=400, help='Tasks per bulk write')
+  parser.add_argument('--workers', type=int, default=8)
+  parser.add_argument('--latency', type=float, default=0, help='Seconds per request of the stub')
+  args = parser.parse_args()
+
+  server = None
+  url = args.url
+
+  if url is None:
+    server = subprocess.Popen(
+      [sys.executable, STUB_SERVER,
+       '--tasks', str(args.tasks), '--latency', str(args.latency)],
+      stdout=subprocess.PIPE, universal_newlines=True
+      )
+    url = server.stdout.readline().strip()
+
+  try:
+    print('{:<18}{:>12}{:>14}{:>14}{:>13}'.format(
+      'transport', 'us/request', 'get_all s', 'bulk s', 'connections'))
+
+    for name, new_transport in transports(args):
+      r = run(args, url, name, new_transport)
+      print('{:<18}{:>12.0f}{:>14.3f}{:>14.3f}{:>13}'.format(
+        name, r['us_per_request'], r['get_all_seconds'], r['bulk_seconds'], r.get('connections', '-')))
+
+  finally:
+    if server:
+      server.terminate()
+      server.wait()
+
+
+if __name__ == '__main__':
+  main()
@@ -1,6 +1,25 @@
 from .float_api import FloatAPI
 from .float_api import UnexpectedStatusCode
 from .float_api import DataValidationError
-
-
-
+from .float_api import BulkResult
+from .float_api import DeadlineExceeded
+from .async_float_api import AsyncFloatAPI
+from .transport import Transport
+from .transport import RequestsTransport
+from .transport import HTTPXTransport
+from .retry import RetryPolicy
+from .retry import RetryBudget
+from .rate_limit import RateLimiter
+from .cache import ResponseCache
+from .cache import ConditionalCache
+from .sync import SyncEngine
+from .mirror import FloatMirror
+from .interval_index import IntervalIndex
+from .metrics import MetricsCollector
+from .cassette import Cassette
+from .cassette import CassetteError
+from .records import Record
+from .records import Task
+from .records import Person
+from .records import Project
+from .records import LoggedTime
@@ -0,0 +1,709 @@
+import asyncio
+import time
+
+try:
+  import httpx
+except ImportError:
+  httpx = None
+
+from .float_api import BulkResult
+from .float_api import FloatAPI
+from .float_api import UnexpectedStatusCode
+from .float_api import DataValidationError
+from .float_api import DeadlineExceeded
+from .float_api import _convert
+from .float_api import _endpoint
+from .float_api import _merge_reports
+from .float_api import _remaining
+from .float_api import _report_chunks
+from .float_api import _unique
+from .transport import Transport
+
+
+class AsyncFloatAPI(FloatAPI):
+  """
+  An asyncio version of FloatAPI. All get_*, get_all_*, create_*,
+  update_* and delete_* calls are coroutines, and all iter_all_*
+  calls are async generators.
+
+  Requires httpx: pip install float-api[async]
+  """
+
+  def __init__(self, access_token, application_name, contact_email, max_workers=4,
+               rate_limiter=None, cache=None, conditional=None, json_decoder=None,
+               max_connections=10, http2=False, retry=None, timeout=(5, 60), deadline=None,
+               single_flight=True):
+    '''
+    https://dev.float.com/overview_authentication.html
+
+    max_workers: Number of pages get_all_* calls fetch concurrently
+    rate_limiter: A RateLimiter pacing all requests. Share one
+      between FloatAPI objects to share the limit.
+    cache: A ResponseCache for single objects from get_* calls.
+      update_* and delete_* calls update the cache.
+    conditional: A ConditionalCache. GET requests are sent with the
+      validators of the last response, and 304 responses are served
+      from the cache.
+    json_decoder: A function decoding the bytes of a response
+      (Default: orjson.loads if installed, otherwise json.loads)
+    max_connections: Size of the connection pool
+    http2: Use HTTP/2, so concurrent requests share one connection.
+      Requires h2: pip install float-api[http2]
+    retry: The RetryPolicy of all requests (Default: RetryPolicy())
+    timeout: Seconds to wait to connect and for a response, as a
+      (connect, read) tuple or a number for both. None waits forever.
+    deadline: Seconds a request may take, including retries
+      (Default: no deadline). See limits() to set a deadline for
+      several calls.
+    single_flight: Let identical GET requests in flight at the same
+      time, e.g. from several tasks, share one request
+    '''
+
+    if httpx is None:
+      raise ImportError("AsyncFloatAPI requires httpx. Install with: pip install float-api[async]")
+
+    # Requests are sent by the httpx client below, so
+    # the transport of FloatAPI is left without connections
+    super().__init__(
+      access_token, application_name, contact_email,
+      max_workers, rate_limiter, cache, conditional, json_decoder,
+      transport=Transport(), retry=retry, timeout=timeout, deadline=deadline,
+      single_flight=single_flight
+      )
+
+    # The client to use for all requests
+    self.client = httpx.AsyncClient(
+      headers=self.headers,
+      http2=http2,
+      limits=httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections
+        )
+      )
+
+
+  def close(self):
+    '''Use aclose()'''
+    raise TypeError("Close an AsyncFloatAPI with 'await api.aclose()'")
+
+
+  async def aclose(self):
+    '''Close all connections'''
+    await self.client.aclose()
+
+
+  async def __aenter__(self):
+    return self
+
+
+  async def __aexit__(self, *exc_info):
+    await self.aclose()
+
+
+  def _clean_params(self, params):
+    """
+    Drop params without a value. requests leaves these
+    out of the URL, httpx sends them as empty strings.
+    """
+    return {k: v for k, v in params.items() if v not in (None, [])}
+
+
+  async def _request(self, method, url, **kwargs):
+    """
+    Perform a request, retrying as set by the RetryPolicy
+    Args:
+      method: The HTTP method
+      url: The URL to request
+    """
+
+    timeout, deadline = self._request_limits()
+
+    start = time.perf_counter()
+    throttled = 0
+    retry = 0
+
+    self.retry.budget.deposit()
+
+    try:
+      while True:
+        # Wait for our turn
+        if self.rate_limiter:
+          await asyncio.sleep(self._reserve(deadline))
+
+        try:
+          attempt_timeout = self._attempt_timeout(timeout, deadline)
+        except DeadlineExceeded:
+          if self.rate_limiter:
+            self.rate_limiter.cancel()
+          raise
+        if attempt_timeout is not None:
+          attempt_timeout = httpx.Timeout(attempt_timeout[1], connect=attempt_timeout[0])
+
+        try:
+          r = await self.client.request(method, url, timeout=attempt_timeout, **kwargs)
+
+        except asyncio.CancelledError:
+          if self.rate_limiter:
+            self.rate_limiter.release()
+          raise
+
+        except httpx.HTTPError as e:
+          # No response to adjust the rate limiter to
+          if self.rate_limiter:
+            self.rate_limiter.release()
+
+          delay = self._retry_delay(
+            method, retry, deadline,
+            connect_error=isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)))
+          if delay is None:
+            if deadline is not None and time.monotonic() >= deadline:
+              raise DeadlineExceeded("Deadline exceeded") from e
+            raise
+
+        else:
+          # Let the rate limiter know how much is left
+          if self.rate_limiter:
+            self.rate_limiter.update(r.status_code, r.headers, self.retry.max_backoff)
+
+          throttled += r.status_code == 429
+
+          delay = self._retry_delay(method, retry, deadline, r)
+          if delay is None:
+            break
+
+        await asyncio.sleep(delay)
+        retry += 1
+
+    except Exception as e:
+      if self.hooks:
+        self._fire('request', self._error_info(method, url, e, time.perf_counter() - start, retry, throttled))
+      raise
+
+    if self.hooks:
+      self._fire('request', {
+        'method': method,
+        'endpoint': _endpoint(url[len(self.base_url.format('')):]),
+        'status_code': r.status_code,
+        'error': None,
+        'elapsed': time.perf_counter() - start,
+        'bytes_sent': len(r.request.content),
+        'bytes_received': len(r.content),
+        'retries': retry,
+        'throttled': throttled,
+        })
+
+    return r
+
+
+  async def _delete(self, path):
+    """
+    Args:
+      path: The string added to the base URL
+    """
+
+    with self._instrument('_delete', 'DELETE', path):
+
+      # Build the URL
+      url = self.base_url.format(path)
+
+      # Perform request
+      r = await self._request('DELETE', url)
+
+      # Raise exception on unexpected status code
+      if not r.status_code in [204,200]:
+        raise UnexpectedStatusCode("Got {} but expected 204".format(r.status_code), r.status_code)
+
+      # The object is gone
+      if self.cache:
+        self.cache.evict(path)
+
+      self._notify('DELETE', path, None)
+
+      return True
+
+
+  async def _get(self, path, error_object, params=None):
+    """
+    Args:
+      path: The string added to the base URL
+      error_object: The object to return if status code is not 200
+      params: key,value pairs to send in URL
+    """
+
+    with self._instrument('_get', 'GET', path) as info:
+
+      # Single objects are served from the cache, if possible
+      use_cache = self.cache is not None and not params
+      if use_cache:
+        cached = self.cache.get(path)
+        if cached is not None:
+          info['cached'] = True
+          return cached
+
+      # Build the URL
+      url = self.base_url.format(path)
+
+      # Perform request
+      data = (await self._get_json(url, params or {}))[0]
+
+      if use_cache:
+        self.cache.set(path, data)
+
+      return data
+
+
+  async def _get_json(self, url, params):
+    """
+    Args:
+      url: The URL to request
+      params: key,value pairs to send in URL
+    Returns:
+      A tuple of the decoded response and the response headers
+    """
+
+    params = self._clean_params(params)
+
+    if self.single_flight is None:
+      return await self._fetch_json(url, params)
+
+    # Share the request with identical requests in flight,
+    # waiting for them until the deadline at most
+    deadline = self._request_limits()[1]
+    try:
+      return await self.single_flight.do_async(
+        self._conditional_key(url, params),
+        lambda: self._fetch_json(url, params),
+        _remaining(deadline),
+        self._own_error
+        )
+    except asyncio.TimeoutError:
+      if deadline is None or time.monotonic() < deadline:
+        raise
+      raise DeadlineExceeded("Deadline exceeded") from None
+
+
+  def _timeout_errors(self):
+    return (httpx.TimeoutException,)
+
+
+  async def _fetch_json(self, url, params):
+    """
+    Request JSON. See _get_json.
+    """
+
+    # Send the validators of the last response, if any
+    key = None
+    headers = {}
+    if self.conditional is not None:
+      key = self._conditional_key(url, params)
+      headers = self.conditional.request_headers(key)
+
+    # Request data
+    r = await self._request('GET', url, headers=headers, params=params)
+
+    # Not modified. Serve the last response.
+    if r.status_code == 304 and key is not None:
+      stored = self.conditional.payload(key)
+      if stored is not None:
+        return stored
+
+      # The last response was evicted in the meantime
+      r = await self._request('GET', url, params=params)
+
+    # Raise exception on unexpected status code
+    if r.status_code != 200:
+      raise UnexpectedStatusCode("Got {} but expected 200".format(r.status_code), r.status_code)
+
+    data = self.json_decoder(r.content)
+
+    if key is not None:
+      self.conditional.store(key, r.headers, data)
+
+    return data, r.headers
+
+
+  async def _get_all_pages(self, path, error_object, params=None, max_workers=None,
+                           record_class=None):
+    """
+    Args:
+      path: The string added to the base URL
+      error_object: The object to return if status code is not 200
+      params: key,value pairs to send in URL
+      pagination: per-page (Default 200), page
+      max_workers: Number of pages to fetch concurrently
+        (Default is the value given to the constructor)
+      record_class: A Record class to convert the objects to
+    """
+
+    with self._instrument('_get_all_pages', 'GET', path) as info:
+
+      params = self._page_params(params)
+
+      if max_workers is None:
+        max_workers = self.max_workers
+
+      # Build the URL
+      url = self.base_url.format(path)
+
+      # The first page tells us how many pages there are
+      list_to_return, headers = await self._get_json(url, params)
+      list_to_return = _convert(list_to_return, record_class)
+
+      # The pages still to fetch
+      pages = range(
+        int(headers['X-Pagination-Current-Page']) + 1,
+        int(headers['X-Pagination-Page-Count']) + 1
+        )
+      info['pages'] = len(pages) + 1
+
+      # Limit the number of pages in flight
+      semaphore = asyncio.Semaphore(max(1, max_workers))
+
+      async def get_page(page):
+        async with semaphore:
+          return _convert((await self._get_json(url, dict(params, page=page)))[0], record_class)
+
+      # Gather returns the results in page order
+      for l in await asyncio.gather(*[get_page(page) for page in pages]):
+        list_to_return += l
+
+      # All records must be in the list to return
+      assert int(headers['X-Pagination-Total-Count']) == len(list_to_return), "Get all returns all records"
+
+      # Return the list of all records
+      return list_to_return
+
+
+  async def _iter_all_pages(self, path, error_object, params=None, read_ahead=True,
+                            record_class=None):
+    """
+    Async generator yielding the records of all pages, one page at a time.
+    Args:
+      path: The string added to the base URL
+      error_object: The object to return if status code is not 200
+      params: key,value pairs to send in URL
+      pagination: per-page (Default 200), page
+      read_ahead: Fetch the next page while the caller
+        processes the current one
+      record_class: A Record class to convert the objects to
+    """
+
+    with self._instrument('_iter_all_pages', 'GET', path) as info:
+
+      params = self._page_params(params)
+
+      # Build the URL
+      url = self.base_url.format(path)
+
+      # The first page tells us how many pages there are
+      records, headers = await self._get_json(url, params)
+      records = _convert(records, record_class)
+
+      # The pages still to fetch
+      pages = range(
+        int(headers['X-Pagination-Current-Page']) + 1,
+        int(headers['X-Pagination-Page-Count']) + 1
+        )
+      info['pages'] = len(pages) + 1
+
+      # Number of records yielded
+      count = 0
+
+      next_page = None
+
+      try:
+        for page in pages:
+
+          # Start fetching the next page before handing out this one
+          page_params = dict(params, page=page)
+          if read_ahead:
+            next_page = asyncio.ensure_future(self._get_json(url, page_params))
+
+          for record in records:
+            yield record
+          count += len(records)
+
+          if read_ahead:
+            records = _convert((await next_page)[0], record_class)
+          else:
+            records = _convert((await self._get_json(url, page_params))[0], record_class)
+
+        # Records on the last page
+        for record in records:
+          yield record
+        count += len(records)
+
+      finally:
+        if next_page and not next_page.done():
+          next_page.cancel()
+
+      # All records must have been yielded
+      assert int(headers['X-Pagination-Total-Count']) == count, "Iterate all returns all records"
+
+
+  async def _get_all_windows(self, path, id_key, params, windows, max_workers=None,
+                             record_class=None):
+    """
+    Get all pages of a number of date windows concurrently
+    Args:
+      path: The string added to the base URL
+      id_key: The key holding the id of an object
+      params: key,value pairs to send in URL
+      windows: A list of (start_date, end_date) tuples
+      max_workers: Number of windows to fetch concurrently
+        (Default is the value given to the constructor)
+      record_class: A Record class to convert the objects to
+    Returns:
+      The objects of all windows. Objects in several windows
+      are only included once.
+    """
+
+    if max_workers is None:
+      max_workers = self.max_workers
+
+    # Limit the number of windows in flight
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+
+    # Pages of a window are fetched one at a time, so
+    # no more than max_workers requests are in flight
+    async def get_window(window):
+      async with semaphore:
+        window_params = dict(params, start_date=window[0], end_date=window[1])
+        return await self._get_all_pages(path, [], window_params, 1, record_class)
+
+    lists = await asyncio.gather(*[get_window(window) for window in windows])
+
+    return _unique(lists, id_key)
+
+
+  async def _get_reports(self, path, key, id_key, start_date, end_date, ids, window=None,
+                         max_workers=None):
+    """
+    Get reports, split into chunks of periods and ids which are
+    fetched concurrently and merged.
+    Args:
+      path: The string added to the base URL
+      key: The key of the list of reports in the response
+      id_key: The key holding the id of a report
+      start_date: First date of the period (YYYY-MM-DD)
+      end_date: Last date of the period (YYYY-MM-DD)
+      ids: An id, a list of ids or None for all
+      window: Number of days in a window, or 'month'
+      max_workers: Number of chunks to fetch concurrently
+        (Default is the value given to the constructor)
+    """
+
+    if not self.date_re.match(start_date):
+        raise ValueError("Invalid start_date: {}".format(start_date))
+
+    if not self.date_re.match(end_date):
+        raise ValueError("Invalid end_date: {}".format(end_date))
+
+    if max_workers is None:
+      max_workers = self.max_workers
+
+    # Limit the number of chunks in flight
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+
+    async def get_chunk(chunk):
+      params = {
+        id_key: chunk[2],
+        'start_date': chunk[0],
+        'end_date': chunk[1]
+      }
+
+      async with semaphore:
+        r = await self._get(path, {}, params)
+
+      # Return list in key of dict
+      # or empty list if key not present
+      return r.get(key, [])
+
+    chunks = _report_chunks(start_date, end_date, ids, window)
+
+    # A single request needs no merging
+    if len(chunks) == 1:
+      return await get_chunk(chunks[0])
+
+    lists = await asyncio.gather(*[get_chunk(chunk) for chunk in chunks])
+
+    return _merge_reports(lists, id_key)
+
+
+  async def _get_many(self, path, id_key, ids, snapshot=None, max_workers=None,
+                      record_class=None):
+    """
+    Get objects by id with as few requests as possible.
+    See FloatAPI._get_many.
+    """
+
+    if max_workers is None:
+      max_workers = self.max_workers
+
+    ids = list(dict.fromkeys(ids))
+    found, missing = self._known(path, ids, snapshot)
+
+    # More than one round of concurrent requests
+    if len(missing) > max(1, max_workers):
+      url = self.base_url.format(path)
+      params = self._page_params(None)
+
+      # The first page tells us how many pages there are
+      objects, headers = await self._get_json(url, params)
+      self._pick(path, id_key, objects, found, missing)
+
+      pages = range(
+        int(headers['X-Pagination-Current-Page']) + 1,
+        int(headers['X-Pagination-Page-Count']) + 1
+        )
+
+      # Limit the number of pages in flight
+      semaphore = asyncio.Semaphore(max(1, max_workers))
+
+      async def get_page(page):
+        async with semaphore:
+          return (await self._get_json(url, dict(params, page=page)))[0]
+
+      if len(missing) > len(pages):
+        for objects in await asyncio.gather(*[get_page(page) for page in pages]):
+          self._pick(path, id_key, objects, found, missing)
+
+    # Get the rest one by one. Objects may exist even
+    # if they are not in the listing.
+    if missing:
+      async def get(i):
+        return await self._get('{}/{}'.format(path, i), {})
+
+      self._add_results(await self._bulk(get, missing.values(), max_workers), found)
+
+    if record_class is not None:
+      return {i: record_class.from_dict(found[i]) for i in ids if i in found}
+
+    return {i: found[i] for i in ids if i in found}
+
+
+  async def _post(self, path, data):
+    """
+    Args:
+      path: The string added to the base URL
+      data: The data to post
+    """
+
+    with self._instrument('_post', 'POST', path):
+
+      # Build the URL
+      url = self.base_url.format(path)
+
+      # Post
+      r = await self._request('POST', url, json=data)
+
+      # Raise exception if data could not be validated
+      if r.status_code == 422:
+        raise DataValidationError("API could not validate the data you posted" )
+
+      # Raise exception on unexpected status code
+      if r.status_code not in (200, 201):
+        raise UnexpectedStatusCode("Got {} but expected 200 or 201".format(r.status_code), r.status_code)
+
+      data = self.json_decoder(r.content)
+
+      self._notify('POST', path, data)
+
+      return data
+
+
+  async def _patch(self, path, data):
+    """
+    Args:
+      path: The string added to the base URL
+      data: The data to post
+    """
+
+    with self._instrument('_patch', 'PATCH', path):
+
+      # Build the URL
+      url = self.base_url.format(path)
+
+      # Patch
+      r = await self._request('PATCH', url, json=data)
+
+      # Raise exception on unexpected status code
+      if r.status_code != 200:
+        raise UnexpectedStatusCode("Got {} but expected 200".format(r.status_code), r.status_code)
+
+      data = self.json_decoder(r.content)
+
+      # Keep the cache up to date
+      if self.cache:
+        self.cache.set(path, data)
+
+      self._notify('PATCH', path, data)
+
+      return data
+
+
+  async def _bulk(self, function, items, max_workers=None, key=None):
+    """
+    Await function for every item concurrently. Exceptions raised
+    by the API are returned in the results instead of raised.
+    Args:
+      function: The coroutine function to call with an item
+      items: The items
+      max_workers: Number of calls to run concurrently
+        (Default is the value given to the constructor)
+      key: A function returning the key of an item
+    Returns:
+      A list of BulkResult in the order of items, or
+      a dict of BulkResult keyed by key, if key is given
+    """
+
+    if max_workers is None:
+      max_workers = self.max_workers
+
+    # Limit the number of calls in flight
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+
+    async def call(item):
+      async with semaphore:
+        try:
+          return BulkResult(item, await function(item), None)
+        except (DataValidationError, UnexpectedStatusCode, DeadlineExceeded, httpx.HTTPError) as e:
+          return BulkResult(item, None, e)
+
+    results = await asyncio.gather(*[call(item) for item in items])
+
+    if key:
+      return {key(r.item): r for r in results}
+
+    return list(results)
+
+
+  async def _bulk_create(self, path, validate, items, max_workers=None):
+    """
+    Validate all items up front, then post the valid ones concurrently
+    Args:
+      path: The string added to the base URL
+      validate: The function validating an item
+      items: The data of the objects to create
+      max_workers: Number of posts to run concurrently
+    Returns:
+      A list of BulkResult in the order of items
+    """
+
+    items = list(items)
+
+    # Items failing validation are never posted
+    errors = {}
+    for i, item in enumerate(items):
+      try:
+        validate(item)
+      except KeyError as e:
+        errors[i] = e
+
+    valid = [item for i, item in enumerate(items) if i not in errors]
+    posted = iter(await self._bulk(lambda item: self._post(path, item), valid, max_workers))
+
+    return [
+      BulkResult(item, None, errors[i]) if i in errors else next(posted)
+      for i, item in enumerate(items)
+      ]
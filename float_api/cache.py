@@ -0,0 +1,210 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache():
+  """
+  A size bounded LRU cache of single objects from the API,
+  keyed by path, e.g. 'people/123'.
+
+  Entries expire after a time to live, which can be set per
+  endpoint, e.g. {'people': 60, 'timeoff-types': 3600}.
+
+  A ResponseCache is thread safe.
+  """
+
+  def __init__(self, maxsize=1024, ttl=300, ttls=None):
+    '''
+    maxsize: Maximum number of objects in the cache
+    ttl: Seconds an object stays in the cache
+    ttls: Seconds an object stays in the cache, per endpoint
+    '''
+
+    self.maxsize = maxsize
+    self.ttl = ttl
+    self.ttls = ttls or {}
+
+    # (expiry time, object) keyed by path, least recently used first
+    self.entries = OrderedDict()
+
+    # Number of lookups found and not found in the cache
+    self.hits = 0
+    self.misses = 0
+
+    self.lock = threading.Lock()
+
+
+  def _ttl(self, path):
+    """
+    Return the time to live of path
+    """
+    return self.ttls.get(path.split('/')[0], self.ttl)
+
+
+  def get(self, path):
+    """
+    Returns:
+      The object at path, or None if not in the cache
+    """
+    with self.lock:
+      entry = self.entries.get(path)
+
+      # Missing or expired
+      if entry is None or entry[0] < time.monotonic():
+        if entry is not None:
+          del self.entries[path]
+        self.misses += 1
+        return None
+
+      self.entries.move_to_end(path)
+      self.hits += 1
+
+    # A copy, so callers can't change the cached object
+    return copy.deepcopy(entry[1])
+
+
+  def set(self, path, value):
+    """
+    Add the object at path to the cache
+    """
+    value = copy.deepcopy(value)
+
+    with self.lock:
+      self.entries[path] = (time.monotonic() + self._ttl(path), value)
+      self.entries.move_to_end(path)
+
+      # Evict the least recently used objects
+      while len(self.entries) > self.maxsize:
+        self.entries.popitem(last=False)
+
+
+  def evict(self, path):
+    """
+    Remove the object at path from the cache
+    """
+    with self.lock:
+      self.entries.pop(path, None)
+
+
+  def clear(self):
+    """
+    Remove all objects from the cache
+    """
+    with self.lock:
+      self.entries.clear()
+
+
+  def stats(self):
+    """
+    Returns:
+      A dict with the number of hits, misses and objects in the cache
+    """
+    with self.lock:
+      return {
+        'hits': self.hits,
+        'misses': self.misses,
+        'size': len(self.entries)
+      }
+
+
+class ConditionalCache():
+  """
+  Validators (ETag and Last-Modified) and payloads of GET responses,
+  keyed by URL and params. Used to send conditional requests, and to
+  serve the stored payload when the API answers 304 Not Modified.
+
+  A ConditionalCache is size bounded (least recently used are evicted)
+  and thread safe.
+  """
+
+  def __init__(self, maxsize=256):
+    '''
+    maxsize: Maximum number of responses to keep
+    '''
+
+    self.maxsize = maxsize
+
+    # (etag, last modified, payload, headers) keyed by request
+    self.entries = OrderedDict()
+
+    # Number of 304 responses served from the cache
+    self.hits = 0
+
+    self.lock = threading.Lock()
+
+
+  def request_headers(self, key):
+    """
+    Returns:
+      The conditional headers to send with the request
+    """
+    with self.lock:
+      entry = self.entries.get(key)
+
+    headers = {}
+
+    if entry is None:
+      return headers
+
+    if entry[0]:
+      headers['If-None-Match'] = entry[0]
+
+    if entry[1]:
+      headers['If-Modified-Since'] = entry[1]
+
+    return headers
+
+
+  def store(self, key, headers, data):
+    """
+    Keep the payload of a 200 response, if it has validators
+    Args:
+      key: The request
+      headers: The headers of the response
+      data: The decoded payload
+    """
+    etag = headers.get('ETag')
+    last_modified = headers.get('Last-Modified')
+
+    if not (etag or last_modified):
+      return
+
+    with self.lock:
+      self.entries[key] = (etag, last_modified, _copy_payload(data), headers.copy())
+      self.entries.move_to_end(key)
+
+      # Evict the least recently used responses
+      while len(self.entries) > self.maxsize:
+        self.entries.popitem(last=False)
+
+
+  def payload(self, key):
+    """
+    Returns:
+      A tuple of the stored payload and headers of a request,
+      or None if the request is no longer in the cache.
+    """
+    with self.lock:
+      entry = self.entries.get(key)
+      if entry is None:
+        return None
+      self.entries.move_to_end(key)
+      self.hits += 1
+
+    return _copy_payload(entry[2]), entry[3]
+
+
+def _copy_payload(data):
+  """
+  Copy the list and objects of a payload, so callers
+  can't change a stored payload. Cheaper than a deep copy.
+  """
+  if isinstance(data, list):
+    return [dict(o) if isinstance(o, dict) else o for o in data]
+
+  if isinstance(data, dict):
+    return dict(data)
+
+  return data
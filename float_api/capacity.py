@@ -0,0 +1,183 @@
+# Capacity and utilization of people per day, as NumPy matrices.
+#
+# Requires numpy:
+#   pip install float-api[columnar]
+
+from collections import namedtuple
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+
+# Hours per day from Sunday to Saturday, if a person has no work_days_hours
+DEFAULT_WORK_DAYS_HOURS = (0, 8, 8, 8, 8, 8, 0)
+
+
+class Capacity(namedtuple('Capacity', [
+    'people_ids', 'days', 'capacity', 'scheduled', 'timeoff', 'utilization', 'over_allocated'])):
+  """
+  Capacity of people per day. All matrices are people x days.
+
+  people_ids: The people_id of each row
+  days: The date of each column (datetime64[D])
+  capacity: Working hours, less time off and holidays
+  scheduled: Hours of tasks on working days
+  timeoff: Hours of time off on working days
+  utilization: scheduled / capacity (NaN where there is no capacity)
+  over_allocated: True where more is scheduled than there is capacity
+  """
+  __slots__ = ()
+
+
+def _intervals(objects, people_key, start_key, end_key):
+  """
+  Return the people_id, start date, end date and object of the intervals
+  in objects. Objects assigned to several people give an interval each.
+  """
+  rows = []
+
+  for o in objects:
+    people = o.get(people_key)
+    if people is None:
+      continue
+
+    if not isinstance(people, (list, tuple)):
+      people = [people]
+
+    for p in people:
+      rows.append((p, o.get(start_key), o.get(end_key) or o.get(start_key), o))
+
+  return rows
+
+
+def _daily_sum(shape, rows, idx, first_day, values):
+  """
+  Sum values per person and day over intervals, using a difference
+  array: add at the first day, subtract after the last, then cumsum.
+  Args:
+    shape: (people, days)
+    rows: (people_id, start_date, end_date, object) tuples
+    idx: A dict of row index by people_id
+    first_day: The first day of the matrix (datetime64[D])
+    values: A value per row
+  """
+  matrix = np.zeros((shape[0], shape[1] + 1))
+
+  if not rows:
+    return matrix[:, :-1]
+
+  people = np.array([idx.get(r[0], -1) for r in rows])
+  starts = (np.array([r[1] for r in rows], dtype='datetime64[D]') - first_day).astype(np.int64)
+  ends = (np.array([r[2] for r in rows], dtype='datetime64[D]') - first_day).astype(np.int64)
+  values = np.asarray(values, dtype=np.float64)
+
+  # Only intervals of known people overlapping the period
+  keep = (people >= 0) & (ends >= 0) & (starts < shape[1])
+  people, values = people[keep], values[keep]
+  starts = np.clip(starts[keep], 0, shape[1])
+  ends = np.clip(ends[keep], -1, shape[1] - 1)
+
+  np.add.at(matrix, (people, starts), values)
+  np.add.at(matrix, (people, ends + 1), -values)
+
+  return np.cumsum(matrix, axis=1)[:, :-1]
+
+
+def capacity_matrix(people, tasks, start_date, end_date, timeoffs=(), holidays=()):
+  """
+  Build the capacity of people per day in a period
+  Args:
+    people: People (dicts or records) with people_id and work_days_hours,
+      a list of 7 numbers of hours from Sunday to Saturday
+    tasks: Tasks with people_id (or people_ids), start_date, end_date
+      and hours per day
+    start_date: First day of the period
+    end_date: Last day of the period
+    timeoffs: Time off with people_ids, start_date, end_date and hours
+      per day, or full_day = 1
+    holidays: Holidays with date and optional end_date
+  Returns:
+    A Capacity
+  """
+  if np is None:
+    raise ImportError("Capacity requires numpy. Install with: pip install float-api[columnar]")
+
+  people = list(people)
+  people_ids = np.array([p.get('people_id') for p in people])
+  idx = {p: i for i, p in enumerate(people_ids.tolist())}
+
+  first_day = np.datetime64(start_date, 'D')
+  days = np.arange(first_day, np.datetime64(end_date, 'D') + 1)
+  shape = (len(people), len(days))
+
+  # Working hours of every person on every day. 1970-01-01 was a
+  # Thursday, day 4 of a week starting on Sunday.
+  work_days_hours = np.array(
+    [p.get('work_days_hours') or DEFAULT_WORK_DAYS_HOURS for p in people],
+    dtype=np.float64
+    ).reshape(len(people), 7)
+  weekdays = (days.astype(np.int64) + 4) % 7
+  working = work_days_hours[:, weekdays]
+
+  # No work on holidays
+  holiday_rows = [(None, h.get('date'), h.get('end_date') or h.get('date'), h) for h in holidays]
+  if holiday_rows:
+    holiday = _daily_sum((1, len(days)), holiday_rows, {None: 0}, first_day, [1] * len(holiday_rows))[0] > 0
+    working[:, holiday] = 0
+
+  # Tasks only count on working days
+  task_rows = _intervals(tasks, 'people_id', 'start_date', 'end_date')
+  task_rows += [
+    r for r in _intervals(tasks, 'people_ids', 'start_date', 'end_date')
+    if r[3].get('people_id') is None
+    ]
+  scheduled = _daily_sum(shape, task_rows, idx, first_day, [float(r[3].get('hours') or 0) for r in task_rows])
+  scheduled[working == 0] = 0
+
+  # Time off, full days taking all working hours of the day
+  timeoff_rows = _intervals(timeoffs, 'people_ids', 'start_date', 'end_date')
+  full_day = [bool(r[3].get('full_day')) for r in timeoff_rows]
+  partial = _daily_sum(
+    shape, timeoff_rows, idx, first_day,
+    [0 if f else float(r[3].get('hours') or 0) for r, f in zip(timeoff_rows, full_day)]
+    )
+  whole = _daily_sum(shape, timeoff_rows, idx, first_day, full_day) > 0
+  timeoff = np.where(whole, working, np.minimum(partial, working))
+
+  capacity = working - timeoff
+
+  with np.errstate(divide='ignore', invalid='ignore'):
+    utilization = np.where(capacity > 0, scheduled / capacity, np.nan)
+
+  return Capacity(
+    people_ids=people_ids,
+    days=days,
+    capacity=capacity,
+    scheduled=scheduled,
+    timeoff=timeoff,
+    utilization=utilization,
+    over_allocated=scheduled > capacity
+    )
+
+
+def capacity_from_api(api, start_date, end_date, window=None):
+  """
+  Build the capacity of all people in a period from the API
+  Args:
+    api: A FloatAPI
+    start_date: First day of the period (YYYY-MM-DD)
+    end_date: Last day of the period (YYYY-MM-DD)
+    window: Get tasks in windows, see FloatAPI.get_all_tasks
+  Returns:
+    A Capacity
+  """
+  return capacity_matrix(
+    api.get_all_people(),
+    api.get_all_tasks(start_date, end_date, window=window),
+    start_date,
+    end_date,
+    timeoffs=api.get_all_timeoffs(),
+    holidays=api.get_all_holidays()
+    )
@@ -0,0 +1,322 @@
+import json
+import os
+import threading
+from urllib.parse import parse_qsl
+from urllib.parse import urlencode
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+  import httpx
+except ImportError:
+  httpx = None
+
+
+class CassetteError(Exception):
+  """
+  Raise this error when replaying a request
+  which is not in the cassette
+  """
+  pass
+
+
+# Response headers describing the raw body. Bodies are stored decoded.
+_BODY_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+
+def _body_key(body):
+  """
+  Return a request body in a form which compares equal for equal JSON
+  """
+  if not body:
+    return None
+
+  if isinstance(body, bytes):
+    body = body.decode('utf-8')
+
+  try:
+    return json.dumps(json.loads(body), sort_keys=True)
+  except ValueError:
+    return body
+
+
+class Cassette():
+  """
+  Records requests to the API and their responses in a JSON file, and
+  replays them without a network. Status codes, headers (including
+  pagination headers) and bodies are replayed as recorded.
+
+  Requests are matched on their method, path and query (see match).
+  Several requests matching the same recorded request get the
+  responses in the order they were recorded, then the last one again.
+
+  Use as a context manager. Recordings are saved on exit:
+
+    with Cassette('tests/cassettes/tasks.json').mount(api):
+      api.get_all_tasks()
+
+  Works with FloatAPI and AsyncFloatAPI. Request headers, including
+  the access token, are never stored.
+  """
+
+  # Parts of a request to match on
+  matchers = ('method', 'path', 'query', 'body')
+
+  def __init__(self, path, mode='once', match=('method', 'path', 'query'), ignore_params=()):
+    '''
+    path: The cassette file
+    mode: 'once' records if the file does not exist and replays if it does,
+      'record' always records and 'replay' never does
+    match: The parts of requests to match: 'method', 'path', 'query' and 'body'
+    ignore_params: Query parameters not to match on, e.g. dates of today
+    '''
+
+    if mode not in ('once', 'record', 'replay'):
+      raise ValueError("Invalid mode: {}".format(mode))
+
+    for m in match:
+      if m not in self.matchers:
+        raise ValueError("Can not match on: {}".format(m))
+
+    self.path = path
+    self.match = tuple(match)
+    self.ignore_params = set(ignore_params)
+    self.recording = mode == 'record' or (mode == 'once' and not os.path.exists(path))
+    self.lock = threading.Lock()
+
+    # Recorded requests and responses
+    self.interactions = []
+
+    # The recorded responses by request key, in the order recorded
+    self.responses = {}
+
+    # The number of times each request key was replayed
+    self.played = {}
+
+    if not self.recording:
+      with open(path) as f:
+        for interaction in json.load(f)['interactions']:
+          self._add(interaction)
+
+
+  def __enter__(self):
+    return self
+
+
+  def __exit__(self, *exc_info):
+    if self.recording:
+      self.save()
+
+
+  def save(self):
+    """
+    Write the recorded interactions to the cassette file
+    """
+    directory = os.path.dirname(self.path)
+    if directory:
+      os.makedirs(directory, exist_ok=True)
+
+    with self.lock:
+      with open(self.path, 'w') as f:
+        json.dump({'version': 1, 'interactions': self.interactions}, f, indent=1)
+
+
+  def _key(self, method, url, body):
+    """
+    Return the parts of a request to match on
+    """
+    u = urlparse(url)
+    parts = {
+      'method': method.upper(),
+      'path': u.path,
+      'query': urlencode(sorted(
+        (k, v) for k, v in parse_qsl(u.query, keep_blank_values=True)
+        if k not in self.ignore_params
+        )),
+      'body': _body_key(body),
+    }
+    return tuple(parts[m] for m in self.match)
+
+
+  def _add(self, interaction):
+    """
+    Add a recorded interaction, and index its response by request key
+    """
+    request = interaction['request']
+    key = self._key(request['method'], request['url'], request['body'])
+
+    self.interactions.append(interaction)
+    self.responses.setdefault(key, []).append(interaction['response'])
+
+
+  def find(self, method, url, body):
+    """
+    Returns:
+      The recorded response to a request, a dict of status, headers and body
+    """
+    key = self._key(method, url, body)
+
+    with self.lock:
+      matches = self.responses.get(key)
+
+      if not matches:
+        raise CassetteError("No recorded response to {} {}".format(method, url))
+
+      played = self.played.get(key, 0)
+      self.played[key] = played + 1
+
+    return matches[min(played, len(matches) - 1)]
+
+
+  def record(self, method, url, body, status, headers, content):
+    """
+    Add a request and its response to the cassette
+    """
+    if isinstance(body, bytes):
+      body = body.decode('utf-8')
+
+    interaction = {
+      'request': {'method': method.upper(), 'url': url, 'body': body or None},
+      'response': {
+        'status': status,
+        'headers': {k: v for k, v in headers.items() if k.lower() not in _BODY_HEADERS},
+        'body': content.decode('utf-8'),
+      }
+    }
+
+    with self.lock:
+      self._add(interaction)
+
+
+  def mount(self, api):
+    """
+    Send all requests of api through the cassette
+    Returns:
+      The cassette
+    """
+    if hasattr(api, 'client'):
+      # An AsyncFloatAPI
+      api.client = httpx.AsyncClient(
+        headers=api.headers,
+        transport=_AsyncCassetteTransport(self, httpx.AsyncHTTPTransport())
+        )
+    elif api.session is None:
+      # An HTTPXTransport
+      api.transport.client = httpx.Client(
+        transport=_CassetteTransport(self, httpx.HTTPTransport(http2=api.transport.http2))
+        )
+    else:
+      adapter = _CassetteAdapter(self, api.session.get_adapter('https://'))
+      api.session.mount('https://', adapter)
+      api.session.mount('http://', adapter)
+
+    return self
+
+
+class _CassetteAdapter(BaseAdapter):
+  """
+  A requests adapter recording to, or replaying from, a cassette
+  """
+
+  def __init__(self, cassette, adapter):
+    super().__init__()
+    self.cassette = cassette
+    self.adapter = adapter
+
+
+  def send(self, request, **kwargs):
+    if self.cassette.recording:
+      r = self.adapter.send(request, **kwargs)
+      self.cassette.record(request.method, request.url, request.body, r.status_code, r.headers, r.content)
+      return r
+
+    stored = self.cassette.find(request.method, request.url, request.body)
+
+    r = requests.Response()
+    r.status_code = stored['status']
+    r.headers = CaseInsensitiveDict(stored['headers'])
+    r._content = stored['body'].encode('utf-8')
+    r.encoding = 'utf-8'
+    r.url = request.url
+    r.request = request
+    return r
+
+
+  def close(self):
+    self.adapter.close()
+
+
+def _replay(cassette, request, body):
+  """
+  Return the recorded httpx response to a request
+  """
+  stored = cassette.find(request.method, str(request.url), body)
+
+  return httpx.Response(
+    stored['status'],
+    headers=stored['headers'],
+    content=stored['body'].encode('utf-8'),
+    request=request
+    )
+
+
+def _recorded(cassette, request, body, r, content):
+  """
+  Record an httpx response, returning it with its body read
+  """
+  cassette.record(request.method, str(request.url), body, r.status_code, r.headers, content)
+  headers = [(k, v) for k, v in r.headers.items() if k.lower() not in _BODY_HEADERS]
+  return httpx.Response(r.status_code, headers=headers, content=content, request=request)
+
+
+if httpx is not None:
+
+  class _CassetteTransport(httpx.BaseTransport):
+    """
+    An httpx transport recording to, or replaying from, a cassette
+    """
+
+    def __init__(self, cassette, transport):
+      self.cassette = cassette
+      self.transport = transport
+
+
+    def handle_request(self, request):
+      body = request.read()
+
+      if not self.cassette.recording:
+        return _replay(self.cassette, request, body)
+
+      r = self.transport.handle_request(request)
+      return _recorded(self.cassette, request, body, r, r.read())
+
+
+    def close(self):
+      self.transport.close()
+
+
+  class _AsyncCassetteTransport(httpx.AsyncBaseTransport):
+    """
+    An async httpx transport recording to, or replaying from, a cassette
+    """
+
+    def __init__(self, cassette, transport):
+      self.cassette = cassette
+      self.transport = transport
+
+
+    async def handle_async_request(self, request):
+      body = await request.aread()
+
+      if not self.cassette.recording:
+        return _replay(self.cassette, request, body)
+
+      r = await self.transport.handle_async_request(request)
+      return _recorded(self.cassette, request, body, r, await r.aread())
+
+
+    async def aclose(self):
+      await self.transport.aclose()
@@ -0,0 +1,218 @@
+# Columnar export of Float objects to NumPy arrays, Arrow tables and
+# Parquet files. Objects are converted in chunks, so typed columns are
+# built without holding all objects as dicts at once.
+#
+# Requires numpy, and pyarrow for Arrow and Parquet:
+#   pip install float-api[columnar]
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+try:
+  import pyarrow as pa
+  import pyarrow.parquet as pq
+except ImportError:
+  pa = None
+  pq = None
+
+
+# The columns and their types, per entity. Types are 'int', 'float',
+# 'date', 'datetime' and 'str'. Missing ints are 0, missing floats NaN
+# and missing dates NaT.
+SCHEMAS = {
+  'tasks': {
+    'task_id': 'int',
+    'project_id': 'int',
+    'phase_id': 'int',
+    'people_id': 'int',
+    'start_date': 'date',
+    'end_date': 'date',
+    'hours': 'float',
+    'status': 'int',
+    'priority': 'int',
+    'repeat_state': 'int',
+    'repeat_end_date': 'date',
+    'name': 'str',
+    'notes': 'str',
+    'created': 'datetime',
+    'modified': 'datetime',
+  },
+  'logged_time': {
+    'logged_time_id': 'str',
+    'date': 'date',
+    'hours': 'float',
+    'billable': 'int',
+    'people_id': 'int',
+    'project_id': 'int',
+    'phase_id': 'int',
+    'task_id': 'int',
+    'task_name': 'str',
+    'notes': 'str',
+    'locked': 'int',
+    'locked_date': 'date',
+    'created': 'datetime',
+    'modified': 'datetime',
+  },
+  'people': {
+    'people_id': 'int',
+    'name': 'str',
+    'email': 'str',
+    'job_title': 'str',
+    'employee_type': 'int',
+    'active': 'int',
+    'people_type_id': 'int',
+    'start_date': 'date',
+    'end_date': 'date',
+    'default_hourly_rate': 'float',
+    'created': 'datetime',
+    'modified': 'datetime',
+  },
+}
+
+
+def _schema(schema):
+  """
+  Return schema, looking it up in SCHEMAS if it is a name
+  """
+  if np is None:
+    raise ImportError("Columnar export requires numpy. Install with: pip install float-api[columnar]")
+
+  if isinstance(schema, str):
+    return SCHEMAS[schema]
+
+  return schema
+
+
+def _column(values, kind):
+  """
+  Return a list of values as a typed NumPy array
+  """
+  if kind == 'int':
+    return np.array([0 if v is None or v == '' else v for v in values], dtype=np.int64)
+
+  if kind == 'float':
+    return np.array([None if v == '' else v for v in values], dtype=np.float64)
+
+  if kind == 'date':
+    return np.array([v or None for v in values], dtype='datetime64[D]')
+
+  if kind == 'datetime':
+    return np.array([v or None for v in values], dtype='datetime64[s]')
+
+  return np.array(values, dtype=object)
+
+
+def iter_column_chunks(objects, schema, chunk_size=50000):
+  """
+  Generator yielding dicts of NumPy arrays, of chunk_size objects each
+  Args:
+    objects: An iterable of objects (or records), e.g. api.iter_all_tasks()
+    schema: A dict of column names and types, or a key of SCHEMAS
+    chunk_size: Number of objects per chunk
+  """
+  schema = _schema(schema)
+
+  values = {c: [] for c in schema}
+  count = 0
+
+  for o in objects:
+    for c, l in values.items():
+      l.append(o.get(c))
+    count += 1
+
+    if count == chunk_size:
+      yield {c: _column(values[c], kind) for c, kind in schema.items()}
+      values = {c: [] for c in schema}
+      count = 0
+
+  if count:
+    yield {c: _column(values[c], kind) for c, kind in schema.items()}
+
+
+def to_numpy(objects, schema, chunk_size=50000):
+  """
+  Returns:
+    A dict of NumPy arrays, one per column of schema
+  """
+  schema = _schema(schema)
+
+  chunks = list(iter_column_chunks(objects, schema, chunk_size))
+
+  if not chunks:
+    return {c: _column([], kind) for c, kind in schema.items()}
+
+  return {c: np.concatenate([chunk[c] for chunk in chunks]) for c in schema}
+
+
+def _arrow_batch(chunk, arrow_schema):
+  """
+  Return a chunk of NumPy arrays as an Arrow record batch
+  """
+  return pa.RecordBatch.from_arrays(
+    [pa.array(chunk[f.name], type=f.type, from_pandas=True) for f in arrow_schema],
+    schema=arrow_schema
+    )
+
+
+def _arrow_schema(schema):
+  """
+  Return the Arrow schema of a dict of column names and types
+  """
+  types = {
+    'int': pa.int64(),
+    'float': pa.float64(),
+    'date': pa.date32(),
+    'datetime': pa.timestamp('s'),
+    'str': pa.string(),
+  }
+  return pa.schema([(c, types[kind]) for c, kind in schema.items()])
+
+
+def to_arrow(objects, schema, chunk_size=50000):
+  """
+  Returns:
+    An Arrow table with a column per column of schema
+  """
+  if pa is None:
+    raise ImportError("Arrow export requires pyarrow. Install with: pip install float-api[columnar]")
+
+  schema = _schema(schema)
+  arrow_schema = _arrow_schema(schema)
+
+  batches = [
+    _arrow_batch(chunk, arrow_schema)
+    for chunk in iter_column_chunks(objects, schema, chunk_size)
+    ]
+
+  return pa.Table.from_batches(batches, schema=arrow_schema)
+
+
+def write_parquet(objects, path, schema, chunk_size=50000):
+  """
+  Write objects to a Parquet file, a row group per chunk, so
+  only one chunk is held in memory at a time.
+  Args:
+    objects: An iterable of objects (or records), e.g. api.iter_all_tasks()
+    path: The file to write
+    schema: A dict of column names and types, or a key of SCHEMAS
+    chunk_size: Number of objects per row group
+  Returns:
+    The number of rows written
+  """
+  if pq is None:
+    raise ImportError("Parquet export requires pyarrow. Install with: pip install float-api[columnar]")
+
+  schema = _schema(schema)
+  arrow_schema = _arrow_schema(schema)
+
+  rows = 0
+
+  with pq.ParquetWriter(path, arrow_schema) as writer:
+    for chunk in iter_column_chunks(objects, schema, chunk_size):
+      batch = _arrow_batch(chunk, arrow_schema)
+      writer.write_batch(batch)
+      rows += batch.num_rows
+
+  return rows
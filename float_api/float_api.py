@@ -1,5 +1,28 @@
+import contextvars
+import json
 import re
-import requests
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import date
+from datetime import timedelta
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as WaitTimeout
+
+from .records import LoggedTime
+from .records import Person
+from .records import Project
+from .records import Task
+from .retry import RetryPolicy
+from .single_flight import SingleFlight
+from .transport import RequestsTransport
+
+# Use orjson to decode responses, if installed
+try:
+  import orjson
+except ImportError:
+  orjson = None
 
 
 #class ParameterMissingError(Exception):
@@ -10,7 +33,9 @@ class UnexpectedStatusCode(Exception):
   Raise this error when a call to the API
   returns a status code other than the one we expect
   """
-  pass
+  def __init__(self, message, status_code=None):
+    super().__init__(message)
+    self.status_code = status_code
 
 class DataValidationError(Exception):
   """
@@ -18,24 +43,243 @@ class DataValidationError(Exception):
   validate the data we gave it
   """
 
+class DeadlineExceeded(Exception):
+  """
+  Raise this error when a call runs
+  past its deadline
+  """
+  pass
+
+
+# The timeout and deadline of the calls in a context, see FloatAPI.limits
+_limits = contextvars.ContextVar('float_api_limits', default=None)
+
+
+def _in_context(function):
+  """
+  Return function, running in a copy of the current context, so calls
+  in the threads of an executor keep the limits of the caller
+  """
+  context = contextvars.copy_context()
+  return lambda *args: context.copy().run(function, *args)
+
+def _remaining(deadline):
+  """
+  Return the seconds left until a deadline on the monotonic clock,
+  or None if there is no deadline
+  """
+  if deadline is None:
+    return None
+
+  remaining = deadline - time.monotonic()
+  if remaining <= 0:
+    raise DeadlineExceeded("Deadline exceeded")
+
+  return remaining
+
+
+def default_json_decoder():
+  """
+  Return the fastest available function decoding JSON from bytes
+  """
+  if orjson is not None:
+    return orjson.loads
+
+  return json.loads
+
+
+# Path segments which are ids of objects
+_id_re = re.compile("^([0-9]+|[0-9a-f]{16,})$")
+
+
+def _endpoint(path):
+  """
+  Return a path with the ids replaced, e.g. 'tasks/{id}' for 'tasks/123'
+  """
+  return '/'.join(
+    '{id}' if _id_re.match(p) else p
+    for p in path.split('?')[0].strip('/').split('/')
+    )
+
+
+def _date_windows(start_date, end_date, window):
+  """
+  Split a period into consecutive windows
+  Args:
+    start_date: First date of the period (YYYY-MM-DD)
+    end_date: Last date of the period (YYYY-MM-DD)
+    window: Number of days in a window, or 'month' for calendar months
+  Returns:
+    A list of (start_date, end_date) tuples
+  """
+
+  if window != 'month' and (not isinstance(window, int) or window < 1):
+    raise ValueError("Invalid window: {}".format(window))
+
+  start = date.fromisoformat(start_date)
+  end = date.fromisoformat(end_date)
+
+  windows = []
+
+  while start <= end:
+    if window == 'month':
+      # The first day of next month
+      next_start = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    else:
+      next_start = start + timedelta(days=window)
+
+    windows.append((start.isoformat(), min(next_start - timedelta(days=1), end).isoformat()))
+    start = next_start
+
+  return windows
+
+
+def _convert(objects, record_class):
+  """
+  Convert a list of objects from the API to records of record_class
+  """
+  if record_class is None:
+    return objects
+
+  return [record_class.from_dict(o) for o in objects]
+
+
+def _unique(lists, key):
+  """
+  Concatenate lists of objects, keeping the first object with each key
+  """
+  seen = set()
+  unique = []
+
+  for l in lists:
+    for o in l:
+      if o[key] not in seen:
+        seen.add(o[key])
+        unique.append(o)
+
+  return unique
+
+
+def _report_chunks(start_date, end_date, ids, window):
+  """
+  Split a report request into chunks of a period and a single id
+  Returns:
+    A list of (start_date, end_date, id) tuples
+  """
+
+  if window:
+    periods = _date_windows(start_date, end_date, window)
+  else:
+    periods = [(start_date, end_date)]
+
+  if not isinstance(ids, (list, tuple, set)):
+    ids = [ids]
+
+  return [(first, last, i) for first, last in periods for i in ids]
+
+
+def _merge_reports(lists, id_key):
+  """
+  Merge reports of the same id. Numbers are summed, except for ids,
+  also in nested dicts like 'logged'. Other values are taken from
+  the first report.
+  """
+  merged = {}
+
+  for l in lists:
+    for r in l:
+      if r[id_key] not in merged:
+        merged[r[id_key]] = _merge_report({}, r)
+      else:
+        _merge_report(merged[r[id_key]], r)
+
+  return list(merged.values())
+
+
+def _merge_report(m, r):
+  """
+  Add the numbers of report r to the merged report m, and return m
+  """
+  for k, v in r.items():
+    if isinstance(v, dict) and isinstance(m.get(k, {}), dict):
+      _merge_report(m.setdefault(k, {}), v)
+    elif k.endswith('_id') or isinstance(v, bool) or not isinstance(v, (int, float)):
+      m.setdefault(k, v)
+    else:
+      m[k] = m.get(k, 0) + v
+
+  return m
+
+
+class BulkResult(namedtuple('BulkResult', ['item', 'result', 'error'])):
+  """
+  The outcome of one item of a bulk_* call. On success, result is
+  the response from the API and error is None. Otherwise, error is
+  the exception raised for the item.
+  """
+  __slots__ = ()
+
+  @property
+  def ok(self):
+    return self.error is None
+
+
 class FloatAPI():
 
-  def __init__(self, access_token, application_name, contact_email):
+  def __init__(self, access_token, application_name, contact_email, max_workers=4,
+               rate_limiter=None, cache=None, conditional=None, json_decoder=None,
+               pool_connections=10, pool_maxsize=10, pool_block=False, transport=None,
+               retry=None, timeout=(5, 60), deadline=None, single_flight=True):
     '''
     https://dev.float.com/overview_authentication.html
+
+    A FloatAPI can be shared by any number of threads. Set pool_maxsize
+    to the number of threads (plus max_workers for get_all_* calls), so
+    every thread can keep a connection open.
+
+    max_workers: Number of pages get_all_* calls fetch concurrently
+    rate_limiter: A RateLimiter pacing all requests. Share one
+      between FloatAPI objects to share the limit.
+    cache: A ResponseCache for single objects from get_* calls.
+      update_* and delete_* calls update the cache.
+    conditional: A ConditionalCache. GET requests are sent with the
+      validators of the last response, and 304 responses are served
+      from the cache.
+    json_decoder: A function decoding the bytes of a response
+      (Default: orjson.loads if installed, otherwise json.loads)
+    pool_connections: Number of hosts to keep connection pools for
+    pool_maxsize: Number of connections to keep open per host
+    pool_block: Wait for a free connection when pool_maxsize are in use,
+      instead of opening a connection which is closed after the request
+    transport: The Transport sending the requests, e.g. HTTPXTransport
+      for HTTP/2 (Default: a RequestsTransport with the pool options)
+    retry: The RetryPolicy of all requests (Default: RetryPolicy())
+    timeout: Seconds to wait to connect and for a response, as a
+      (connect, read) tuple or a number for both. None waits forever.
+    deadline: Seconds a request may take, including retries
+      (Default: no deadline). See limits() to set a deadline for
+      several calls.
+    single_flight: Let identical GET requests in flight at the same
+      time, e.g. from several threads, share one request
     '''
 
-    # The session to use for all requests
-    self.session = requests.Session()
+    # Sends all requests
+    if transport is None:
+      transport = RequestsTransport(pool_connections, pool_maxsize, pool_block)
+    self.transport = transport
 
-    retry_strategy = requests.packages.urllib3.util.retry.Retry(
-      total=10,
-      backoff_factor=2,
-      status_forcelist=[429, 500, 502, 503, 504],
-      allowed_methods=["GET", "POST", "PATCH", "DELETE"]
-    )
-    adapter = requests.adapters.HTTPAdapter(max_retries=retry_strategy)
-    self.session.mount("https://", adapter)
+    # The requests.Session of the default transport
+    self.session = getattr(transport, 'session', None)
+
+    # When and how to retry requests
+    self.retry = retry or RetryPolicy()
+
+    # Default limits of every request
+    self.timeout = timeout
+    self.deadline = deadline
+
+    # Shares identical GET requests in flight
+    self.single_flight = SingleFlight() if single_flight else None
 
     # Headers to send with every request
     self.headers = {
@@ -46,30 +290,390 @@ class FloatAPI():
     # The base URL af all calls to the Float API
     self.base_url = 'https://api.float.com/v3/{}'
 
+    # Default number of pages to fetch concurrently
+    self.max_workers = max_workers
+
+    # Decodes the body of all responses
+    self.json_decoder = json_decoder or default_json_decoder()
+
+    # Paces the requests, if set
+    self.rate_limiter = rate_limiter
+
+    # Single objects from the API, if set
+    self.cache = cache
+
+    # Validators and payloads of GET responses, if set
+    self.conditional = conditional
+
+    # Functions called after every successful write
+    self.listeners = []
+
+    # Functions called around every call and request
+    self.hooks = []
+
     # A regular expression for matching dates
     self.date_re = re.compile("^[0-9]{4}-[0-9]{2}-[0-9]{2}$")
 
 
+  def close(self):
+    '''Close all connections'''
+    self.transport.close()
+
+
+  def add_listener(self, listener):
+    """
+    Call listener after every successful create, update and delete,
+    with the HTTP method, the path and the object returned by the API
+    (None for deletes), e.g. listener('PATCH', 'tasks/123', {...})
+    """
+    self.listeners.append(listener)
+
+
+  def remove_listener(self, listener):
+    """
+    Stop calling listener
+    """
+    self.listeners.remove(listener)
+
+
+  def _notify(self, method, path, data):
+    """
+    Call all listeners, after a write
+    """
+
+    # GET requests in flight may return the data from before the write
+    if self.single_flight is not None:
+      self.single_flight.forget(self.base_url.format(path.split('/')[0]))
+
+    for listener in tuple(self.listeners):
+      listener(method, path, data)
+
+
+  def add_hook(self, hook):
+    """
+    Call hook(event, info) around every call and request, e.g. a
+    MetricsCollector. info is a dict. The events are:
+      'call_start': Before a _get, _get_all_pages, _iter_all_pages,
+        _post, _patch or _delete call. info has the 'call', the HTTP
+        'method', the 'path' and the 'endpoint' (the path without ids).
+      'call_end': After the call, with the 'elapsed' seconds and the
+        'error' raised, if any. get_all calls add the number of
+        'pages', and _get adds 'cached' if served from the cache.
+      'request': After every HTTP request, with the 'method',
+        'endpoint', 'status_code', 'elapsed' seconds, 'bytes_sent',
+        'bytes_received', 'retries', 'throttled' (429 responses) and
+        the 'error' raised, if any. Requests failing without a
+        response, e.g. on a timeout, have a status_code of None.
+    """
+    self.hooks.append(hook)
+
+
+  def remove_hook(self, hook):
+    """
+    Stop calling hook
+    """
+    self.hooks.remove(hook)
+
+
+  def _fire(self, event, info):
+    """
+    Call all hooks
+    """
+    for hook in tuple(self.hooks):
+      hook(event, info)
+
+
+  @contextmanager
+  def _instrument(self, call, method, path):
+    """
+    Fire the call_start and call_end events around a call. Yields
+    the info dict, so the call can add to it.
+    """
+    if not self.hooks:
+      yield {}
+      return
+
+    info = {'call': call, 'method': method, 'path': path, 'endpoint': _endpoint(path)}
+    self._fire('call_start', info)
+
+    start = time.perf_counter()
+    info['error'] = None
+
+    try:
+      yield info
+    except Exception as e:
+      info['error'] = e
+      raise
+    finally:
+      info['elapsed'] = time.perf_counter() - start
+      self._fire('call_end', info)
+
+
+  def _request_info(self, method, url, r, elapsed, retries, throttled):
+    """
+    Return the info of the request event of a response
+    """
+    info = self.transport.request_info(r)
+
+    info.update(
+      method=method,
+      endpoint=_endpoint(url[len(self.base_url.format('')):]),
+      status_code=r.status_code,
+      error=None,
+      elapsed=elapsed,
+      bytes_received=len(r.content),
+      retries=info['retries'] + retries,
+      throttled=info['throttled'] + throttled
+      )
+
+    return info
+
+
+  def _error_info(self, method, url, e, elapsed, retries, throttled):
+    """
+    Return the info of the request event of a request failing with e
+    """
+    return {
+      'method': method,
+      'endpoint': _endpoint(url[len(self.base_url.format('')):]),
+      'status_code': None,
+      'error': e,
+      'elapsed': elapsed,
+      'bytes_sent': 0,
+      'bytes_received': 0,
+      'retries': retries,
+      'throttled': throttled,
+      }
+
+
+  @contextmanager
+  def limits(self, timeout=None, deadline=None):
+    """
+    Limit the time of all calls in the block. Applies to the calls of
+    this thread (including the threads fetching pages for it), or of
+    this asyncio task.
+    Args:
+      timeout: Seconds to wait to connect and for a response, as a
+        (connect, read) tuple or a number for both
+      deadline: Seconds all calls in the block may take in total,
+        including all pages of get_all_* calls and retries. Calls
+        raise DeadlineExceeded when it has passed.
+    """
+    outer_timeout, outer_deadline = _limits.get() or (None, None)
+
+    if timeout is None:
+      timeout = outer_timeout
+
+    # An inner block can only shorten the deadline
+    if deadline is not None:
+      deadline = time.monotonic() + deadline
+      if outer_deadline is not None:
+        deadline = min(deadline, outer_deadline)
+    else:
+      deadline = outer_deadline
+
+    token = _limits.set((timeout, deadline))
+    try:
+      yield
+    finally:
+      _limits.reset(token)
+
+
+  def _request_limits(self):
+    """
+    Returns:
+      The (connect, read) timeout of a request, and its deadline
+      on the monotonic clock (or None)
+    """
+    timeout, deadline = _limits.get() or (None, None)
+
+    if timeout is None:
+      timeout = self.timeout
+
+    if timeout is not None and not isinstance(timeout, (tuple, list)):
+      timeout = (timeout, timeout)
+
+    if deadline is None and self.deadline is not None:
+      deadline = time.monotonic() + self.deadline
+
+    return timeout, deadline
+
+
+  def _attempt_timeout(self, timeout, deadline):
+    """
+    Return the timeout of an attempt, cut short by the deadline
+    """
+    if deadline is None:
+      return timeout
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+      raise DeadlineExceeded("Deadline exceeded")
+
+    if timeout is None:
+      return (remaining, remaining)
+
+    return (min(timeout[0], remaining), min(timeout[1], remaining))
+
+
+  def _reserve(self, deadline):
+    """
+    Take a token from the rate limiter
+    Args:
+      deadline: The deadline of the request, or None
+    Returns:
+      The seconds to wait before sending the request. Raises
+      DeadlineExceeded, giving back the token, if the wait would
+      pass the deadline.
+    """
+    wait = self.rate_limiter.reserve()
+
+    if deadline is not None and time.monotonic() + wait >= deadline:
+      self.rate_limiter.cancel()
+      raise DeadlineExceeded("Deadline exceeded waiting for the rate limiter")
+
+    return wait
+
+
+  def _retry_delay(self, method, retry, deadline, r=None, connect_error=False):
+    """
+    Args:
+      method: The HTTP method of the request
+      retry: The number of retries done
+      deadline: The deadline of the request, or None
+      r: The response, if any
+      connect_error: True if no connection could be made
+    Returns:
+      The seconds to wait before retrying a request, or None to give up
+    """
+
+    if retry >= self.retry.retries:
+      return None
+
+    if r is not None and not self.retry.retry_status(r.status_code):
+      return None
+
+    if r is None and not self.retry.retry_error(method, connect_error):
+      return None
+
+    delay = self.retry.backoff(retry, r.headers if r is not None else None)
+
+    # Don't wait past the deadline
+    if deadline is not None and time.monotonic() + delay >= deadline:
+      return None
+
+    if not self.retry.budget.withdraw():
+      return None
+
+    return delay
+
+
+  def _request(self, method, url, headers=None, **kwargs):
+    """
+    Perform a request, retrying as set by the RetryPolicy. All
+    requests to the API go through here.
+    Args:
+      method: The HTTP method
+      url: The URL to request
+      headers: Headers to send in addition to the default headers
+      kwargs: Passed on to the transport
+    """
+
+    if headers:
+      headers = dict(self.headers, **headers)
+    else:
+      headers = self.headers
+
+    timeout, deadline = self._request_limits()
+
+    start = time.perf_counter()
+    throttled = 0
+    retry = 0
+
+    self.retry.budget.deposit()
+
+    try:
+      while True:
+        # Wait for our turn
+        if self.rate_limiter:
+          time.sleep(self._reserve(deadline))
+
+        try:
+          attempt_timeout = self._attempt_timeout(timeout, deadline)
+        except DeadlineExceeded:
+          if self.rate_limiter:
+            self.rate_limiter.cancel()
+          raise
+
+        try:
+          r = self.transport.request(method, url, headers, timeout=attempt_timeout, **kwargs)
+
+        except self.transport.errors as e:
+          # No response to adjust the rate limiter to
+          if self.rate_limiter:
+            self.rate_limiter.release()
+
+          delay = self._retry_delay(
+            method, retry, deadline, connect_error=self.transport.is_connect_error(e))
+          if delay is None:
+            if deadline is not None and time.monotonic() >= deadline:
+              raise DeadlineExceeded("Deadline exceeded") from e
+            raise
+
+        else:
+          # Let the rate limiter know how much is left
+          if self.rate_limiter:
+            self.rate_limiter.update(r.status_code, r.headers, self.retry.max_backoff)
+
+          throttled += r.status_code == 429
+
+          delay = self._retry_delay(method, retry, deadline, r)
+          if delay is None:
+            break
+
+        time.sleep(delay)
+        retry += 1
+
+    except Exception as e:
+      if self.hooks:
+        self._fire('request', self._error_info(method, url, e, time.perf_counter() - start, retry, throttled))
+      raise
+
+    if self.hooks:
+      self._fire('request', self._request_info(
+        method, url, r, time.perf_counter() - start, retry, throttled))
+
+    return r
+
+
   def _delete(self, path):
     """
     Args:
       path: The string added to the base URL
     """
 
-    # Build the URL
-    url = self.base_url.format(path)
+    with self._instrument('_delete', 'DELETE', path):
 
-    # Perform request
-    r = self.session.delete(url, headers=self.headers)
+      # Build the URL
+      url = self.base_url.format(path)
 
-    # Raise exception on unexpected status code
-    if not r.status_code in [204,200]:
-      raise UnexpectedStatusCode("Got {} but expected 204".format(r.status_code))
+      # Perform request
+      r = self._request('DELETE', url)
 
-    return True
+      # Raise exception on unexpected status code
+      if not r.status_code in [204,200]:
+        raise UnexpectedStatusCode("Got {} but expected 204".format(r.status_code), r.status_code)
 
+      # The object is gone
+      if self.cache:
+        self.cache.evict(path)
 
-  def _get(self, path, error_object, params = {}):
+      self._notify('DELETE', path, None)
+
+      return True
+
+
+  def _get(self, path, error_object, params=None):
     """
     Args:
       path: The string added to the base URL
@@ -77,28 +681,38 @@ class FloatAPI():
       params: key,value pairs to send in URL
     """
 
-    # Build the URL
-    url = self.base_url.format(path)
+    with self._instrument('_get', 'GET', path) as info:
 
-    # Perform request
-    r = self.session.get(url, headers=self.headers, params=params)
+      # Single objects are served from the cache, if possible
+      use_cache = self.cache is not None and not params
+      if use_cache:
+        cached = self.cache.get(path)
+        if cached is not None:
+          info['cached'] = True
+          return cached
 
-    # Raise exception on unexpected status code
-    if r.status_code != 200:
-      raise UnexpectedStatusCode("Got {} but expected 200".format(r.status_code))
+      # Build the URL
+      url = self.base_url.format(path)
+
+      # Perform request
+      data = self._get_json(url, params or {})[0]
 
-    return r.json()
+      if use_cache:
+        self.cache.set(path, data)
 
+      return data
 
-  def _get_all_pages(self, path, error_object, params = {}):
+
+  def _page_params(self, params):
     """
+    Return a copy of params with Float's pagination keys set
     Args:
-      path: The string added to the base URL
-      error_object: The object to return if status code is not 200
       params: key,value pairs to send in URL
-      pagination: per-page (Default 200), page
     """
 
+    # Work on a copy, so the caller's dict is left untouched
+    params = dict(params or {})
+
     # If key 'per_page' is in params, change to key to 'per-page'.
     # Python does not allow '-' in variable names, but Float
     # parameter is called 'per-page'
@@ -109,44 +723,425 @@ class FloatAPI():
     if 'per-page' not in params:
       params['per-page'] = 200
 
-    # Set default objects per page
+    # Set default start page
     if 'page' not in params:
       params['page'] = 1
 
-    # The list of data to return
-    list_to_return = []
+    return params
 
-    # Build the URL
-    url = self.base_url.format(path)
 
-    # Perform request
-    while True:
-      # Request data
-      r = self.session.get(url, headers=self.headers, params=params)
+  def _conditional_key(self, url, params):
+    """
+    Return the key of a GET request in the ConditionalCache
+    """
+    items = sorted((k, v) for k, v in params.items() if v not in (None, []))
+    return url + '?' + urlencode(items, doseq=True)
 
-      # Throw AssertionError on unexpected status code
-      if r.status_code != 200:
-        raise UnexpectedStatusCode("Got {} but expected 200".format(r.status_code))
 
-      # Get the list returned by the request
-      l = r.json()
+  def _get_json(self, url, params):
+    """
+    Args:
+      url: The URL to request
+      params: key,value pairs to send in URL
+    Returns:
+      A tuple of the decoded response and the response headers
+    """
+
+    if self.single_flight is None:
+      return self._fetch_json(url, params)
+
+    # Share the request with identical requests in flight,
+    # waiting for them until the deadline at most
+    deadline = self._request_limits()[1]
+    try:
+      return self.single_flight.do(
+        self._conditional_key(url, params),
+        lambda: self._fetch_json(url, params),
+        _remaining(deadline),
+        self._own_error
+        )
+    except WaitTimeout:
+      if deadline is None or time.monotonic() < deadline:
+        raise
+      raise DeadlineExceeded("Deadline exceeded") from None
+
+
+  def _own_error(self, e):
+    """
+    Returns:
+      True if error e comes from the limits() of the caller rather
+      than from the request, so callers sharing the request make it
+      again instead of raising e
+    """
+    if isinstance(e, DeadlineExceeded):
+      return True
+
+    limits = _limits.get()
+    return limits is not None and limits[0] is not None and isinstance(e, self._timeout_errors())
 
-      # Add the new list to the list of data to return
-      list_to_return += l
 
-      # Exit loop if we are on the last page of results
-      if int(r.headers['X-Pagination-Current-Page']) >= int(r.headers['X-Pagination-Page-Count']):
-        break
+  def _timeout_errors(self):
+    """
+    Return the exceptions raised when the timeout of a request passed
+    """
+    return self.transport.timeout_errors
+
+
+  def _fetch_json(self, url, params):
+    """
+    Request JSON. See _get_json.
+    """
+
+    # Send the validators of the last response, if any
+    key = None
+    headers = {}
+    if self.conditional is not None:
+      key = self._conditional_key(url, params)
+      headers = self.conditional.request_headers(key)
 
-      # Next page
-      params['page'] += 1
+    # Request data
+    r = self._request('GET', url, headers=headers, params=params)
 
+    # Not modified. Serve the last response.
+    if r.status_code == 304 and key is not None:
+      stored = self.conditional.payload(key)
+      if stored is not None:
+        return stored
 
-    # All records must be in the list to return
-    assert int(r.headers['X-Pagination-Total-Count']) == len(list_to_return), "Get all returns all records"
+      # The last response was evicted in the meantime
+      r = self._request('GET', url, params=params)
 
-    # Return the list of all records
-    return list_to_return
+    # Raise exception on unexpected status code
+    if r.status_code != 200:
+      raise UnexpectedStatusCode("Got {} but expected 200".format(r.status_code), r.status_code)
+
+    data = self.json_decoder(r.content)
+
+    if key is not None:
+      self.conditional.store(key, r.headers, data)
+
+    return data, r.headers
+
+
+  def _get_all_pages(self, path, error_object, params=None, max_workers=None,
+                     record_class=None):
+    """
+    Args:
+      path: The string added to the base URL
+      error_object: The object to return if status code is not 200
+      params: key,value pairs to send in URL
+      pagination: per-page (Default 200), page
+      max_workers: Number of pages to fetch concurrently
+        (Default is the value given to the constructor)
+      record_class: A Record class to convert the objects to
+    """
+
+    with self._instrument('_get_all_pages', 'GET', path) as info:
+
+      params = self._page_params(params)
+
+      if max_workers is None:
+        max_workers = self.max_workers
+
+      # Build the URL
+      url = self.base_url.format(path)
+
+      # The first page tells us how many pages there are
+      list_to_return, headers = self._get_json(url, params)
+      list_to_return = _convert(list_to_return, record_class)
+
+      # The pages still to fetch
+      pages = range(
+        int(headers['X-Pagination-Current-Page']) + 1,
+        int(headers['X-Pagination-Page-Count']) + 1
+        )
+      info['pages'] = len(pages) + 1
+
+      def get_page(page):
+        return _convert(self._get_json(url, dict(params, page=page))[0], record_class)
+
+      # Fetch the remaining pages. Executor.map returns
+      # the results in page order.
+      if max_workers > 1 and len(pages) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pages))) as executor:
+          for l in executor.map(_in_context(get_page), pages):
+            list_to_return += l
+      else:
+        for page in pages:
+          list_to_return += get_page(page)
+
+      # All records must be in the list to return
+      assert int(headers['X-Pagination-Total-Count']) == len(list_to_return), "Get all returns all records"
+
+      # Return the list of all records
+      return list_to_return
+
+
+  def _iter_all_pages(self, path, error_object, params=None, read_ahead=True,
+                      record_class=None):
+    """
+    Generator yielding the records of all pages, one page at a time.
+    Args:
+      path: The string added to the base URL
+      error_object: The object to return if status code is not 200
+      params: key,value pairs to send in URL
+      pagination: per-page (Default 200), page
+      read_ahead: Fetch the next page while the caller
+        processes the current one
+      record_class: A Record class to convert the objects to
+    """
+
+    with self._instrument('_iter_all_pages', 'GET', path) as info:
+
+      params = self._page_params(params)
+
+      # Build the URL
+      url = self.base_url.format(path)
+
+      # The first page tells us how many pages there are
+      records, headers = self._get_json(url, params)
+      records = _convert(records, record_class)
+
+      # The pages still to fetch
+      pages = range(
+        int(headers['X-Pagination-Current-Page']) + 1,
+        int(headers['X-Pagination-Page-Count']) + 1
+        )
+      info['pages'] = len(pages) + 1
+
+      # Number of records yielded
+      count = 0
+
+      executor = ThreadPoolExecutor(max_workers=1) if read_ahead else None
+
+      try:
+        for page in pages:
+
+          # Start fetching the next page before handing out this one
+          page_params = dict(params, page=page)
+          if executor:
+            next_page = executor.submit(_in_context(self._get_json), url, page_params)
+
+          for record in records:
+            yield record
+          count += len(records)
+
+          if executor:
+            records = _convert(next_page.result()[0], record_class)
+          else:
+            records = _convert(self._get_json(url, page_params)[0], record_class)
+
+        # Records on the last page
+        for record in records:
+          yield record
+        count += len(records)
+
+      finally:
+        if executor:
+          executor.shutdown(wait=False)
+
+      # All records must have been yielded
+      assert int(headers['X-Pagination-Total-Count']) == count, "Iterate all returns all records"
+
+
+  def _get_all_windows(self, path, id_key, params, windows, max_workers=None,
+                       record_class=None):
+    """
+    Get all pages of a number of date windows concurrently
+    Args:
+      path: The string added to the base URL
+      id_key: The key holding the id of an object
+      params: key,value pairs to send in URL
+      windows: A list of (start_date, end_date) tuples
+      max_workers: Number of windows to fetch concurrently
+        (Default is the value given to the constructor)
+      record_class: A Record class to convert the objects to
+    Returns:
+      The objects of all windows. Objects in several windows
+      are only included once.
+    """
+
+    if max_workers is None:
+      max_workers = self.max_workers
+
+    # Pages of a window are fetched one at a time, so
+    # no more than max_workers requests are in flight
+    def get_window(window):
+      window_params = dict(params, start_date=window[0], end_date=window[1])
+      return self._get_all_pages(path, [], window_params, 1, record_class)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+      lists = list(executor.map(_in_context(get_window), windows))
+
+    return _unique(lists, id_key)
+
+
+  def _get_reports(self, path, key, id_key, start_date, end_date, ids, window=None,
+                   max_workers=None):
+    """
+    Get reports, split into chunks of periods and ids which are
+    fetched concurrently and merged.
+    Args:
+      path: The string added to the base URL
+      key: The key of the list of reports in the response
+      id_key: The key holding the id of a report
+      start_date: First date of the period (YYYY-MM-DD)
+      end_date: Last date of the period (YYYY-MM-DD)
+      ids: An id, a list of ids or None for all
+      window: Number of days in a window, or 'month'
+      max_workers: Number of chunks to fetch concurrently
+        (Default is the value given to the constructor)
+    """
+
+    if not self.date_re.match(start_date):
+        raise ValueError("Invalid start_date: {}".format(start_date))
+
+    if not self.date_re.match(end_date):
+        raise ValueError("Invalid end_date: {}".format(end_date))
+
+    if max_workers is None:
+      max_workers = self.max_workers
+
+    def get_chunk(chunk):
+      params = {
+        id_key: chunk[2],
+        'start_date': chunk[0],
+        'end_date': chunk[1]
+      }
+
+      # Return list in key of dict
+      # or empty list if key not present
+      return self._get(path, {}, params).get(key, [])
+
+    chunks = _report_chunks(start_date, end_date, ids, window)
+
+    # A single request needs no merging
+    if len(chunks) == 1:
+      return get_chunk(chunks[0])
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+      lists = list(executor.map(_in_context(get_chunk), chunks))
+
+    return _merge_reports(lists, id_key)
+
+
+  def _known(self, path, ids, snapshot):
+    """
+    Look up objects in a snapshot, then in the cache
+    Args:
+      path: The string added to the base URL
+      ids: The ids of the objects
+      snapshot: Objects keyed by id, or None
+    Returns:
+      A dict of the objects found keyed by id, and a dict
+      of the ids not found keyed by the id as a string
+    """
+    found = {}
+    missing = {}
+
+    for i in ids:
+      o = snapshot.get(i) if snapshot is not None else None
+
+      if o is None and self.cache is not None:
+        o = self.cache.get('{}/{}'.format(path, i))
+
+      if o is None:
+        missing[str(i)] = i
+      else:
+        found[i] = o
+
+    return found, missing
+
+
+  def _pick(self, path, id_key, objects, found, missing):
+    """
+    Move the missing objects in a list of objects to found
+    """
+    for o in objects:
+      key = str(o.get(id_key))
+      if key not in missing:
+        continue
+
+      i = missing.pop(key)
+      found[i] = o
+
+      if self.cache is not None:
+        self.cache.set('{}/{}'.format(path, i), o)
+
+
+  def _add_results(self, results, found):
+    """
+    Add the objects of BulkResults of single gets to found.
+    Objects which do not exist are left out.
+    """
+    for r in results:
+      if r.error is None:
+        found[r.item] = r.result
+      elif getattr(r.error, 'status_code', None) != 404:
+        raise r.error
+
+
+  def _get_many(self, path, id_key, ids, snapshot=None, max_workers=None,
+                record_class=None):
+    """
+    Get objects by id with as few requests as possible. Objects are
+    taken from the snapshot and the cache first. If the rest are few,
+    they are fetched one by one. Otherwise the first page of the listing
+    tells how many pages it has, and the rest are picked from the pages
+    if that takes fewer requests than fetching them one by one.
+    Args:
+      path: The string added to the base URL
+      id_key: The key holding the id of an object
+      ids: The ids of the objects
+      snapshot: Objects keyed by id to use first
+      max_workers: Number of requests to run concurrently
+        (Default is the value given to the constructor)
+      record_class: A Record class to convert the objects to
+    Returns:
+      A dict of the objects keyed by id, in the order of ids.
+      Ids of objects which do not exist are left out.
+    """
+
+    if max_workers is None:
+      max_workers = self.max_workers
+
+    ids = list(dict.fromkeys(ids))
+    found, missing = self._known(path, ids, snapshot)
+
+    # More than one round of concurrent requests
+    if len(missing) > max(1, max_workers):
+      url = self.base_url.format(path)
+      params = self._page_params(None)
+
+      # The first page tells us how many pages there are
+      objects, headers = self._get_json(url, params)
+      self._pick(path, id_key, objects, found, missing)
+
+      pages = range(
+        int(headers['X-Pagination-Current-Page']) + 1,
+        int(headers['X-Pagination-Page-Count']) + 1
+        )
+
+      def get_page(page):
+        return self._get_json(url, dict(params, page=page))[0]
+
+      if len(missing) > len(pages):
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pages)))) as executor:
+          for objects in executor.map(_in_context(get_page), pages):
+            self._pick(path, id_key, objects, found, missing)
+
+    # Get the rest one by one. Objects may exist even
+    # if they are not in the listing.
+    if missing:
+      def get(i):
+        return self._get('{}/{}'.format(path, i), {})
+
+      self._add_results(self._bulk(get, missing.values(), max_workers), found)
+
+    if record_class is not None:
+      return {i: record_class.from_dict(found[i]) for i in ids if i in found}
+
+    return {i: found[i] for i in ids if i in found}
 
 
   def _post(self, path, data):
@@ -156,21 +1151,27 @@ class FloatAPI():
       data: The data to post
     """
 
-    # Build the URL
-    url = self.base_url.format(path)
+    with self._instrument('_post', 'POST', path):
 
-    # Post
-    r = self.session.post(url, json=data, headers=self.headers)
+      # Build the URL
+      url = self.base_url.format(path)
 
-    # Raise exception if data could not be validated
-    if r.status_code == 422:
-      raise DataValidationError("API could not validate the data you posted" )
+      # Post
+      r = self._request('POST', url, json=data)
 
-    # Raise exception on unexpected status code
-    if r.status_code not in (200, 201):
-      raise UnexpectedStatusCode("Got {} but expected 200 or 201".format(r.status_code))
+      # Raise exception if data could not be validated
+      if r.status_code == 422:
+        raise DataValidationError("API could not validate the data you posted" )
+
+      # Raise exception on unexpected status code
+      if r.status_code not in (200, 201):
+        raise UnexpectedStatusCode("Got {} but expected 200 or 201".format(r.status_code), r.status_code)
+
+      data = self.json_decoder(r.content)
+
+      self._notify('POST', path, data)
 
-    return r.json()
+      return data
 
 
   def _patch(self, path, data):
@@ -180,17 +1181,27 @@ class FloatAPI():
       data: The data to post
     """
 
-    # Build the URL
-    url = self.base_url.format(path)
+    with self._instrument('_patch', 'PATCH', path):
 
-    # Post
-    r = self.session.patch(url, json=data, headers=self.headers)
+      # Build the URL
+      url = self.base_url.format(path)
 
-    # Raise exception on unexpected status code
-    if r.status_code != 200:
-      raise UnexpectedStatusCode("Got {} but expected 200".format(r.status_code))
+      # Post
+      r = self._request('PATCH', url, json=data)
+
+      # Raise exception on unexpected status code
+      if r.status_code != 200:
+        raise UnexpectedStatusCode("Got {} but expected 200".format(r.status_code), r.status_code)
+
+      data = self.json_decoder(r.content)
+
+      # Keep the cache up to date
+      if self.cache:
+        self.cache.set(path, data)
+
+      self._notify('PATCH', path, data)
 
-    return r.json()
+      return data
 
 
   ## GET ##
@@ -230,184 +1241,404 @@ class FloatAPI():
     return self._get('people/{}'.format(people_id), {})
 
 
-  def get_people_reports(self, start_date, end_date, people_id=None):
-    '''Get people reports'''
-    params = {
-      'people_id': people_id,
-      'start_date': start_date,
-      'end_date': end_date
-    }
-
-    r = self._get('reports/people', {}, params)
-
-    # Return list in key 'people' of dict
-    # or empty list if key not present
-    return r.get('people', [])
-
-
   def get_project(self, project_id):
     '''Get a project'''
     return self._get('projects/{}'.format(project_id), {})
 
 
-  def get_project_reports(self, start_date, end_date, project_id=None):
+  def get_project_reports(self, start_date, end_date, project_id=None, window=None,
+                          max_workers=None):
     """
     Returns a list of project reports. If a project_id is supplied,
     only a single report is returned.
+
+    project_id: A project_id, or a list of them to get the reports
+      of concurrently
+    window: Split the period into windows of this many days (or 'month'),
+      and get the windows concurrently. Numbers are summed per project.
     """
-    if not self.date_re.match(start_date):
-        raise ValueError("Invalid start_date: {}".format(start_date))
+    return self._get_reports(
+      'reports/projects', 'projects', 'project_id',
+      start_date, end_date, project_id, window, max_workers
+      )
 
-    if not self.date_re.match(end_date):
-        raise ValueError("Invalid end_date: {}".format(end_date))
 
-    params = {
-      'project_id': project_id,
-      'start_date': start_date,
-      'end_date': end_date
-    }
+  def get_people_reports(self, start_date, end_date, people_id=None, window=None,
+                         max_workers=None):
+    """
+    Returns a list of people reports. If a people_id is supplied,
+    only a single report is returned.
+
+    people_id: A people_id, or a list of them to get the reports
+      of concurrently
+    window: Split the period into windows of this many days (or 'month'),
+      and get the windows concurrently. Numbers are summed per person.
+    """
+    return self._get_reports(
+      'reports/people', 'people', 'people_id',
+      start_date, end_date, people_id, window, max_workers
+      )
+
+
+  def get_phase(self, phase_id):
+    '''Get a phase'''
+    return self._get('phases/{}'.format(phase_id), {})
+
+  def get_logged_time(self, logged_time_id):
+    '''Get a single logged time by ID.'''
+    return self._get('logged-time/{}'.format(logged_time_id), {})
+
+
+  def get_task(self, task_id):
+    '''Get a single task by ID.'''
+    return self._get('tasks/{}'.format(task_id), {})
+
+  def get_timeoff_type(self, timeoff_type_id):
+    '''Get a timeoff type'''
+    return self._get('timeoff-types/{}'.format(timeoff_type_id), {})
+
+
+  ## GET ALL ##
+
+  def get_all_accounts(self, fields=None, max_workers=None):
+    '''Get all Float accounts'''
+    params = {'fields': fields}
+    return self._get_all_pages('accounts', [], params, max_workers)
+
+
+  def get_all_clients(self, fields=None, max_workers=None):
+    '''Get all clients'''
+    params = {'fields': fields}
+    return self._get_all_pages('clients', [], params, max_workers)
+
+
+  def get_all_departments(self, fields=None, max_workers=None):
+    '''Get all departments'''
+    params = {'fields': fields}
+    return self._get_all_pages('departments', [], params, max_workers)
 
-    r = self._get('reports/projects', {}, params)
 
-    # Return list in key 'projects' of dict
-    # or empty list if key not present
-    return r.get('projects', [])
+  def get_all_holidays(self, fields=None, max_workers=None):
+    '''Get all holidays'''
+    params = {'fields': fields}
+    return self._get_all_pages('holidays', [], params, max_workers)
+
+
+  def get_all_milestones(self, fields=None, max_workers=None):
+    '''Get all milestones'''
+    params = {'fields': fields}
+    return self._get_all_pages('milestones', [], params, max_workers)
 
 
-  def get_people_reports(self, start_date, end_date, people_id=None):
+  def get_all_people(self, fields=None, max_workers=None, as_records=False):
+    '''Get all people. As Person records if as_records.'''
+    params = {'fields': fields}
+    return self._get_all_pages('people', [], params, max_workers, Person if as_records else None)
+
+
+  def get_all_phases(self, fields=None, max_workers=None):
+    '''Get all phases'''
+    params = {'fields': fields}
+    return self._get_all_pages('phases', [], params, max_workers)
+
+
+  def get_all_projects(self, fields=None, max_workers=None, as_records=False):
+    '''Get all projects. As Project records if as_records.'''
+    params = {'fields': fields}
+    return self._get_all_pages('projects', [], params, max_workers, Project if as_records else None)
+
+
+  def _tasks_params(self, start_date, end_date, fields):
     """
-    Returns a list of people reports. If a people_id is supplied,
-    only a single report is returned.
+    Return the params for listing tasks
     """
-    if not self.date_re.match(start_date):
-        raise ValueError("Invalid start_date: {}".format(start_date))
 
-    if not self.date_re.match(end_date):
-        raise ValueError("Invalid end_date: {}".format(end_date))
+    # Validate start date
+    if start_date and not self.date_re.match(start_date):
+      raise ValueError("Invalid start_date: {}".format(start_date))
 
-    params = {
-      'people_id': people_id,
+    # Validate end date
+    if end_date and not self.date_re.match(end_date):
+      raise ValueError("Invalid end_date: {}".format(end_date))
+
+    return {
+      'fields': fields,
       'start_date': start_date,
       'end_date': end_date
     }
 
-    r = self._get('reports/people', {}, params)
 
-    # Return list in key 'people' of dict
-    # or empty list if key not present
-    return r.get('people', [])
+  def get_all_tasks(self, start_date=None, end_date=None, fields=None, max_workers=None,
+                    window=None, as_records=False):
+    '''
+    Get all tasks. Optional date limits. As Task records if as_records.
+
+    window: Split the period into windows of this many days (or 'month'),
+      and get the windows concurrently. Requires start_date and end_date.
+      Tasks spanning several windows are only returned once.
+    '''
+    params = self._tasks_params(start_date, end_date, fields)
+
+    record_class = Task if as_records else None
+
+    if window is None:
+      return self._get_all_pages('tasks', [], params, max_workers, record_class)
+
+    if not (start_date and end_date):
+      raise ValueError("window requires start_date and end_date")
+
+    windows = _date_windows(start_date, end_date, window)
+
+    return self._get_all_windows('tasks', 'task_id', params, windows, max_workers, record_class)
+
+
+  def _logged_time_params(self, people_id, project_id, fields):
+    """
+    Return the params for listing logged time
+    """
+    params = {'fields': fields}
+
+    if people_id:
+      params.update({'people_id': people_id})
+
+    if project_id:
+      params.update({'project_id': project_id})
+
+    return params
+
+
+  def get_all_logged_time(self, people_id=None, project_id=None, fields=None, max_workers=None,
+                          as_records=False):
+    '''Get all logged time. As LoggedTime records if as_records.'''
+    params = self._logged_time_params(people_id, project_id, fields)
+    record_class = LoggedTime if as_records else None
+    return self._get_all_pages('logged-time', [], params, max_workers, record_class)
+
+  def get_all_timeoffs(self, fields=None, max_workers=None):
+    '''Get all timeoffs'''
+    params = {'fields': fields}
+    return self._get_all_pages('timeoffs', [], params, max_workers)
+
+
+  def get_all_timeoff_types(self, fields=None, max_workers=None):
+    '''Get all timeoff types'''
+    params = {'fields': fields}
+    return self._get_all_pages('timeoff-types', [], params, max_workers)
+
+
+  ## GET MANY ##
+
+  def get_people(self, people_ids, snapshot=None, max_workers=None, as_records=False):
+    '''
+    Get people by id, as a dict keyed by id. As Person records if as_records.
+
+    snapshot: People keyed by id to use first, e.g. the store of a SyncEngine
+    '''
+    return self._get_many('people', 'people_id', people_ids, snapshot, max_workers,
+                          Person if as_records else None)
+
+
+  def get_projects(self, project_ids, snapshot=None, max_workers=None, as_records=False):
+    '''
+    Get projects by id, as a dict keyed by id. As Project records if as_records.
+
+    snapshot: Projects keyed by id to use first, e.g. the store of a SyncEngine
+    '''
+    return self._get_many('projects', 'project_id', project_ids, snapshot, max_workers,
+                          Project if as_records else None)
+
+
+  def get_tasks(self, task_ids, snapshot=None, max_workers=None, as_records=False):
+    '''
+    Get tasks by id, as a dict keyed by id. As Task records if as_records.
+
+    snapshot: Tasks keyed by id to use first, e.g. an IntervalIndex
+    '''
+    return self._get_many('tasks', 'task_id', task_ids, snapshot, max_workers,
+                          Task if as_records else None)
 
 
-  def get_phase(self, phase_id):
-    '''Get a phase'''
-    return self._get('phases/{}'.format(phase_id), {})
+  ## ITER ALL ##
 
-  def get_logged_time(self, logged_time_id):
-    '''Get a single logged time by ID.'''
-    return self._get('logged-time/{}'.format(logged_time_id), {})
+  def iter_all_accounts(self, fields=None, read_ahead=True):
+    '''Iterate over all Float accounts'''
+    params = {'fields': fields}
+    return self._iter_all_pages('accounts', [], params, read_ahead)
 
 
-  def get_task(self, task_id):
-    '''Get a single task by ID.'''
-    return self._get('tasks/{}'.format(task_id), {})
+  def iter_all_clients(self, fields=None, read_ahead=True):
+    '''Iterate over all clients'''
+    params = {'fields': fields}
+    return self._iter_all_pages('clients', [], params, read_ahead)
 
-  def get_timeoff_type(self, timeoff_type_id):
-    '''Get a timeoff type'''
-    return self._get('timeoff-types/{}'.format(timeoff_type_id), {})
 
+  def iter_all_departments(self, fields=None, read_ahead=True):
+    '''Iterate over all departments'''
+    params = {'fields': fields}
+    return self._iter_all_pages('departments', [], params, read_ahead)
 
-  ## GET ALL ##
 
-  def get_all_accounts(self, fields=[]):
-    '''Get all Float accounts'''
+  def iter_all_holidays(self, fields=None, read_ahead=True):
+    '''Iterate over all holidays'''
     params = {'fields': fields}
-    return self._get_all_pages('accounts', [], params)
+    return self._iter_all_pages('holidays', [], params, read_ahead)
 
 
-  def get_all_clients(self, fields=[]):
-    '''Get all clients'''
+  def iter_all_milestones(self, fields=None, read_ahead=True):
+    '''Iterate over all milestones'''
     params = {'fields': fields}
-    return self._get_all_pages('clients', [], params)
+    return self._iter_all_pages('milestones', [], params, read_ahead)
 
 
-  def get_all_departments(self, fields=[]):
-    '''Get all departments'''
+  def iter_all_people(self, fields=None, read_ahead=True, as_records=False):
+    '''Iterate over all people. As Person records if as_records.'''
     params = {'fields': fields}
-    return self._get_all_pages('departments', [], params)
+    return self._iter_all_pages('people', [], params, read_ahead, Person if as_records else None)
 
 
-  def get_all_holidays(self, fields=[]):
-    '''Get all holidays'''
+  def iter_all_phases(self, fields=None, read_ahead=True):
+    '''Iterate over all phases'''
     params = {'fields': fields}
-    return self._get_all_pages('holidays', [], params)
+    return self._iter_all_pages('phases', [], params, read_ahead)
 
 
-  def get_all_milestones(self, fields=[]):
-    '''Get all milestones'''
+  def iter_all_projects(self, fields=None, read_ahead=True, as_records=False):
+    '''Iterate over all projects. As Project records if as_records.'''
     params = {'fields': fields}
-    return self._get_all_pages('milestones', [], params)
+    return self._iter_all_pages('projects', [], params, read_ahead, Project if as_records else None)
 
 
-  def get_all_people(self, fields=[]):
-    '''Get all people'''
-    params = {'fields': fields}
-    return self._get_all_pages('people', [], params)
+  def iter_all_tasks(self, start_date=None, end_date=None, fields=None, read_ahead=True,
+                     as_records=False):
+    '''Iterate over all tasks. Optional date limits. As Task records if as_records.'''
+    params = self._tasks_params(start_date, end_date, fields)
+    return self._iter_all_pages('tasks', [], params, read_ahead, Task if as_records else None)
 
 
-  def get_all_phases(self, fields=[]):
-    '''Get all phases'''
+  def iter_all_logged_time(self, people_id=None, project_id=None, fields=None, read_ahead=True,
+                           as_records=False):
+    '''Iterate over all logged time. As LoggedTime records if as_records.'''
+    params = self._logged_time_params(people_id, project_id, fields)
+    record_class = LoggedTime if as_records else None
+    return self._iter_all_pages('logged-time', [], params, read_ahead, record_class)
+
+
+  def iter_all_timeoffs(self, fields=None, read_ahead=True):
+    '''Iterate over all timeoffs'''
     params = {'fields': fields}
-    return self._get_all_pages('phases', [], params)
+    return self._iter_all_pages('timeoffs', [], params, read_ahead)
 
 
-  def get_all_projects(self, fields=[]):
-    '''Get all clients'''
+  def iter_all_timeoff_types(self, fields=None, read_ahead=True):
+    '''Iterate over all timeoff types'''
     params = {'fields': fields}
-    return self._get_all_pages('projects', [], params)
+    return self._iter_all_pages('timeoff-types', [], params, read_ahead)
 
 
-  def get_all_tasks(self, start_date=None, end_date=None, fields=[]):
-    '''Get all tasks. Optional date limits.'''
+  ## VALIDATE ##
 
-    # Validate start date
-    if start_date and not self.date_re.match(start_date):
-      raise ValueError("Invalid start_date: {}".format(start_date))
+  def _validate_milestone(self, data):
+    """
+    Raise KeyError if data is missing a required key
+    """
 
-    # Validate end date
-    if end_date and not self.date_re.match(end_date):
-      raise ValueError("Invalid end_date: {}".format(end_date))
+    required_fields = [
+      'project_id',
+      'name',
+      'date',
+      ]
 
-    params = {
-      'fields': fields,
-      'start_date': start_date,
-      'end_date': end_date
-    }
+    for f in required_fields:
+      if f not in data.keys():
+        raise KeyError('Missing required key \'{}\''.format(f))
 
-    return self._get_all_pages('tasks', [], params)
 
+  def _validate_person(self, data):
+    """
+    Raise KeyError if data is missing a required key
+    """
 
-  def get_all_logged_time(self, people_id=None, project_id=None, fields=[]):
-    '''Get all logged time'''
-    params = {'fields': fields}
+    if 'name' not in data.keys():
+      raise KeyError('Missing required key \'name\'')
 
-    if people_id:
-      params.update({'people_id': people_id})
 
-    if project_id:
-      params.update({'project_id': project_id})
+  def _validate_phase(self, data):
+    """
+    Raise KeyError if data is missing a required key
+    """
 
-    return self._get_all_pages('logged-time', [], params)
+    required_fields = [
+      'project_id',
+      'name',
+      'start_date',
+      'end_date'
+      ]
 
-  def get_all_timeoffs(self, fields=[]):
-    '''Get all timeoffs'''
-    params = {'fields': fields}
-    return self._get_all_pages('timeoffs', [], params)
+    for f in required_fields:
+      if f not in data.keys():
+        raise KeyError('Missing required key \'{}\''.format(f))
 
 
-  def get_all_timeoff_types(self, fields=[]):
-    '''Get all timeoff types'''
-    params = {'fields': fields}
-    return self._get_all_pages('timeoff-types', [], params)
+  def _validate_task(self, data):
+    """
+    Raise KeyError if data is missing a required key
+    """
+
+    required_fields = [
+      'project_id',
+      'start_date',
+      'end_date',
+      'hours',
+      'people_id'
+      ]
+
+    for f in required_fields:
+      if f not in data.keys():
+        raise KeyError('Missing required key \'{}\''.format(f))
+
+
+  def _validate_timeoff(self, data):
+    """
+    Raise KeyError if data is missing a required key
+    """
+
+    required_fields = [
+      'timeoff_type_id',
+      'start_date',
+      'end_date',
+      'people_ids'
+      ]
+
+    # If full_day is not 1, we need field 'hours'
+    if data.get('full_day', 0) == 0:
+      required_fields.append('hours')
+
+    for f in required_fields:
+      if f not in data.keys():
+        raise KeyError('Missing required key \'{}\''.format(f))
+
+    if not isinstance(data['people_ids'], list):
+      raise KeyError('Key \'{}\' not a list'.format('people_ids'))
+
+
+  def _validate_logged_time(self, data):
+    """
+    Raise KeyError if data is missing a required key
+    """
+
+    required_fields = [
+      'project_id',
+      'date',
+      'hours',
+      'people_ids'
+      ]
+
+    for f in required_fields:
+      if f not in data.keys():
+        raise KeyError('Missing required key \'{}\''.format(f))
+
+    if not isinstance(data['people_ids'], list):
+      raise KeyError('Key \'{}\' not a list'.format('people_ids'))
 
 
   ## CREATE ##
@@ -451,39 +1682,21 @@ class FloatAPI():
 
   def create_milestone(self, **kwargs):
 
-    required_fields = [
-      'project_id',
-      'name',
-      'date',
-      ]
-
-    for f in required_fields:
-      if f not in kwargs.keys():
-        raise KeyError('Missing required key \'{}\''.format(f))
+    self._validate_milestone(kwargs)
 
     return self._post('milestones', kwargs)
 
 
   def create_person(self, **kwargs):
 
-    if 'name' not in kwargs.keys():
-      raise KeyError('Missing required key \'name\'')
+    self._validate_person(kwargs)
 
     return self._post('people', kwargs)
 
 
   def create_phase(self, **kwargs):
 
-    required_fields = [
-      'project_id',
-      'name',
-      'start_date',
-      'end_date'
-      ]
-
-    for f in required_fields:
-      if f not in kwargs.keys():
-        raise KeyError('Missing required key \'{}\''.format(f))
+    self._validate_phase(kwargs)
 
     return self._post('phases', kwargs)
 
@@ -498,40 +1711,14 @@ class FloatAPI():
 
   def create_task(self, **kwargs):
 
-    required_fields = [
-      'project_id',
-      'start_date',
-      'end_date',
-      'hours',
-      'people_id'
-      ]
-
-    for f in required_fields:
-      if f not in kwargs.keys():
-        raise KeyError('Missing required key \'{}\''.format(f))
+    self._validate_task(kwargs)
 
     return self._post('tasks', kwargs)
 
 
   def create_timeoff(self, **kwargs):
 
-    required_fields = [
-      'timeoff_type_id',
-      'start_date',
-      'end_date',
-      'people_ids'
-      ]
-
-    # If full_day is not 1, we need field 'hours'
-    if kwargs.get('full_day', 0) == 0:
-      required_fields.append('hours')
-
-    for f in required_fields:
-      if f not in kwargs.keys():
-        raise KeyError('Missing required key \'{}\''.format(f))
-
-    if not isinstance(kwargs['people_ids'], list):
-      raise KeyError('Key \'{}\' not a list'.format('people_ids'))
+    self._validate_timeoff(kwargs)
 
     return self._post('timeoffs', kwargs)
 
@@ -545,21 +1732,9 @@ class FloatAPI():
 
   def create_logged_time(self, **kwargs):
 
-    required_fields = [
-      'project_id',
-      'date',
-      'hours',
-      'people_ids'
-      ]
-
-    for f in required_fields:
-      if f not in kwargs.keys():
-        raise KeyError('Missing required key \'{}\''.format(f))
-
-    if not isinstance(kwargs['people_ids'], list):
-      raise KeyError('Key \'{}\' not a list'.format('people_ids'))
+    self._validate_logged_time(kwargs)
 
-    return self._post('timeoff-types', kwargs)
+    return self._post('logged-time', kwargs)
 
 
   ## UPDATE ##
@@ -715,3 +1890,215 @@ class FloatAPI():
   def delete_logged_time(self, logged_time_id):
 
     return self._delete('logged-time/{}'.format(logged_time_id))
+
+
+  ## BULK ##
+
+  def _bulk(self, function, items, max_workers=None, key=None):
+    """
+    Call function for every item concurrently. Exceptions raised
+    by the API are returned in the results instead of raised.
+    Args:
+      function: The function to call with an item
+      items: The items
+      max_workers: Number of calls to run concurrently
+        (Default is the value given to the constructor)
+      key: A function returning the key of an item
+    Returns:
+      A list of BulkResult in the order of items, or
+      a dict of BulkResult keyed by key, if key is given
+    """
+
+    if max_workers is None:
+      max_workers = self.max_workers
+
+    def call(item):
+      try:
+        return BulkResult(item, function(item), None)
+      except (DataValidationError, UnexpectedStatusCode, DeadlineExceeded) + self.transport.errors as e:
+        return BulkResult(item, None, e)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+      results = list(executor.map(_in_context(call), items))
+
+    if key:
+      return {key(r.item): r for r in results}
+
+    return results
+
+
+  def _bulk_create(self, path, validate, items, max_workers=None):
+    """
+    Validate all items up front, then post the valid ones concurrently
+    Args:
+      path: The string added to the base URL
+      validate: The function validating an item
+      items: The data of the objects to create
+      max_workers: Number of posts to run concurrently
+    Returns:
+      A list of BulkResult in the order of items
+    """
+
+    items = list(items)
+
+    # Items failing validation are never posted
+    errors = {}
+    for i, item in enumerate(items):
+      try:
+        validate(item)
+      except KeyError as e:
+        errors[i] = e
+
+    valid = [item for i, item in enumerate(items) if i not in errors]
+    posted = iter(self._bulk(lambda item: self._post(path, item), valid, max_workers))
+
+    return [
+      BulkResult(item, None, errors[i]) if i in errors else next(posted)
+      for i, item in enumerate(items)
+      ]
+
+
+  def bulk_create_logged_time(self, items, max_workers=None):
+    '''Create logged time from a list of dicts'''
+    return self._bulk_create('logged-time', self._validate_logged_time, items, max_workers)
+
+
+  def bulk_create_milestones(self, items, max_workers=None):
+    '''Create milestones from a list of dicts'''
+    return self._bulk_create('milestones', self._validate_milestone, items, max_workers)
+
+
+  def bulk_create_people(self, items, max_workers=None):
+    '''Create people from a list of dicts'''
+    return self._bulk_create('people', self._validate_person, items, max_workers)
+
+
+  def bulk_create_phases(self, items, max_workers=None):
+    '''Create phases from a list of dicts'''
+    return self._bulk_create('phases', self._validate_phase, items, max_workers)
+
+
+  def bulk_create_tasks(self, items, max_workers=None):
+    '''Create tasks from a list of dicts'''
+    return self._bulk_create('tasks', self._validate_task, items, max_workers)
+
+
+  def bulk_create_timeoffs(self, items, max_workers=None):
+    '''Create timeoffs from a list of dicts'''
+    return self._bulk_create('timeoffs', self._validate_timeoff, items, max_workers)
+
+
+  def _bulk_update(self, path, id_key, items, max_workers=None):
+    """
+    Patch objects concurrently. Patches of the same object are
+    merged into one request, later patches taking precedence.
+    Args:
+      path: The string added to the base URL
+      id_key: The key holding the id of the object in an item
+      items: The patches
+      max_workers: Number of patches to run concurrently
+    Returns:
+      A dict of BulkResult keyed by id
+    """
+
+    # Merge the patches per id, in the order ids first appear
+    patches = {}
+    for item in items:
+      if id_key not in item.keys():
+        raise KeyError('Missing required key \'{}\''.format(id_key))
+      patches.setdefault(item[id_key], {}).update(item)
+
+    def patch(item):
+      return self._patch('{}/{}'.format(path, item[id_key]), item)
+
+    return self._bulk(patch, patches.values(), max_workers, key=lambda item: item[id_key])
+
+
+  def _bulk_delete(self, path, ids, max_workers=None):
+    """
+    Delete objects concurrently
+    Args:
+      path: The string added to the base URL
+      ids: The ids of the objects to delete
+      max_workers: Number of deletes to run concurrently
+    Returns:
+      A dict of BulkResult keyed by id
+    """
+
+    # Delete every object once
+    ids = list(dict.fromkeys(ids))
+
+    def delete(object_id):
+      return self._delete('{}/{}'.format(path, object_id))
+
+    return self._bulk(delete, ids, max_workers, key=lambda object_id: object_id)
+
+
+  def bulk_update_logged_time(self, items, max_workers=None):
+    '''Update logged time from a list of dicts with key logged_time_id'''
+    return self._bulk_update('logged-time', 'logged_time_id', items, max_workers)
+
+
+  def bulk_update_milestones(self, items, max_workers=None):
+    '''Update milestones from a list of dicts with key milestone_id'''
+    return self._bulk_update('milestones', 'milestone_id', items, max_workers)
+
+
+  def bulk_update_people(self, items, max_workers=None):
+    '''Update people from a list of dicts with key people_id'''
+    return self._bulk_update('people', 'people_id', items, max_workers)
+
+
+  def bulk_update_phases(self, items, max_workers=None):
+    '''Update phases from a list of dicts with key phase_id'''
+    return self._bulk_update('phases', 'phase_id', items, max_workers)
+
+
+  def bulk_update_projects(self, items, max_workers=None):
+    '''Update projects from a list of dicts with key project_id'''
+    return self._bulk_update('projects', 'project_id', items, max_workers)
+
+
+  def bulk_update_tasks(self, items, max_workers=None):
+    '''Update tasks from a list of dicts with key task_id'''
+    return self._bulk_update('tasks', 'task_id', items, max_workers)
+
+
+  def bulk_update_timeoffs(self, items, max_workers=None):
+    '''Update timeoffs from a list of dicts with key timeoff_id'''
+    return self._bulk_update('timeoffs', 'timeoff_id', items, max_workers)
+
+
+  def bulk_delete_logged_time(self, ids, max_workers=None):
+    '''Delete logged time from a list of ids'''
+    return self._bulk_delete('logged-time', ids, max_workers)
+
+
+  def bulk_delete_milestones(self, ids, max_workers=None):
+    '''Delete milestones from a list of ids'''
+    return self._bulk_delete('milestones', ids, max_workers)
+
+
+  def bulk_delete_people(self, ids, max_workers=None):
+    '''Delete people from a list of ids'''
+    return self._bulk_delete('people', ids, max_workers)
+
+
+  def bulk_delete_phases(self, ids, max_workers=None):
+    '''Delete phases from a list of ids'''
+    return self._bulk_delete('phases', ids, max_workers)
+
+
+  def bulk_delete_projects(self, ids, max_workers=None):
+    '''Delete projects from a list of ids'''
+    return self._bulk_delete('projects', ids, max_workers)
+
+
+  def bulk_delete_tasks(self, ids, max_workers=None):
+    '''Delete tasks from a list of ids'''
+    return self._bulk_delete('tasks', ids, max_workers)
+
+
+  def bulk_delete_timeoffs(self, ids, max_workers=None):
+    '''Delete timeoffs from a list of ids'''
+    return self._bulk_delete('timeoffs', ids, max_workers)
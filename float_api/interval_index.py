@@ -0,0 +1,281 @@
+import threading
+from bisect import bisect_left
+from bisect import insort
+from datetime import date
+
+
+def _day(value):
+  """
+  Return a date (datetime.date or 'YYYY-MM-DD') as a day number
+  """
+  if isinstance(value, date):
+    return value.toordinal()
+  return date.fromisoformat(str(value)[:10]).toordinal()
+
+
+class IntervalIndex():
+  """
+  An in-memory index of objects with a start_date and end_date, like
+  tasks and time off, for fast queries by period, person and project.
+
+  The intervals are kept in lists sorted by start date, one for all
+  objects and one per people_id and project_id. Over every list is a
+  tree of the latest end date of each range of intervals (a segment
+  tree), so a query only visits the branches holding intervals which
+  overlap the period. A query of k objects takes O((k + 1) log n),
+  however long the intervals are. Adding or removing an object takes
+  O(n) (inserting into the lists), and the trees of the lists changed
+  are rebuilt in O(n) by the next query.
+
+  Objects can be dicts or records. Objects assigned to several people
+  (people_ids) are indexed under each of them.
+  """
+
+  # Query keys, and the keys of objects they match
+  keys = {
+    'people_id': ('people_id', 'people_ids'),
+    'project_id': ('project_id',),
+  }
+
+  def __init__(self, objects=(), id_key='task_id', path='tasks'):
+    '''
+    objects: The objects to index, e.g. api.get_all_tasks()
+    id_key: The id key of the objects, e.g. 'timeoff_id'
+    path: The API path of the objects, for updates from attach()
+    '''
+
+    self.id_key = id_key
+    self.path = path
+    self.lock = threading.Lock()
+
+    # Objects keyed by id (as a string, as in API paths)
+    self.objects = {}
+
+    # Sorted (start, end, id) tuples per (key, value). All objects
+    # are in the bucket None.
+    self.buckets = {}
+
+    # The segment tree of the latest end dates, per bucket. Built when
+    # a bucket is queried, and dropped when the bucket changes.
+    self.trees = {}
+
+    for o in objects:
+      self.add(o)
+
+
+  def __len__(self):
+    return len(self.objects)
+
+
+  def __contains__(self, object_id):
+    return str(object_id) in self.objects
+
+
+  def get(self, object_id):
+    """
+    Returns:
+      An object by id, or None
+    """
+    return self.objects.get(str(object_id))
+
+
+  def _buckets(self, o):
+    """
+    Return the buckets an object belongs in
+    """
+    buckets = [None]
+
+    for key, fields in self.keys.items():
+      values = set()
+      for f in fields:
+        v = o.get(f)
+        if isinstance(v, (list, tuple)):
+          values.update(v)
+        elif v is not None:
+          values.add(v)
+      buckets += [(key, v) for v in values]
+
+    return buckets
+
+
+  def _entry(self, o):
+    """
+    Return the (start, end, id) tuple of an object
+    """
+    start = _day(o.get('start_date'))
+    end = _day(o.get('end_date')) if o.get('end_date') else start
+    return (start, end, str(o.get(self.id_key)))
+
+
+  def add(self, o):
+    """
+    Add an object, replacing the object with the same id
+    """
+    with self.lock:
+      self._remove(str(o.get(self.id_key)))
+
+      entry = self._entry(o)
+      self.objects[entry[2]] = o
+
+      for b in self._buckets(o):
+        insort(self.buckets.setdefault(b, []), entry)
+        self.trees.pop(b, None)
+
+
+  def update(self, o):
+    """
+    Update an indexed object with the keys in o, or add it
+    """
+    old = self.get(o.get(self.id_key))
+
+    if isinstance(old, dict) and isinstance(o, dict):
+      o = dict(old, **o)
+
+    self.add(o)
+
+
+  def remove(self, object_id):
+    """
+    Remove an object by id
+    Returns:
+      The removed object, or None
+    """
+    with self.lock:
+      return self._remove(str(object_id))
+
+
+  def _remove(self, object_id):
+    o = self.objects.pop(object_id, None)
+
+    if o is None:
+      return None
+
+    entry = self._entry(o)
+
+    for b in self._buckets(o):
+      entries = self.buckets[b]
+      del entries[bisect_left(entries, entry)]
+      self.trees.pop(b, None)
+      if not entries:
+        del self.buckets[b]
+
+    return o
+
+
+  def overlapping(self, start_date, end_date, people_id=None, project_id=None):
+    """
+    Return the objects overlapping a period, sorted by start date
+    Args:
+      start_date: First day of the period (date or YYYY-MM-DD)
+      end_date: Last day of the period (date or YYYY-MM-DD)
+      people_id: Only objects of this person
+      project_id: Only objects of this project
+    """
+    start = _day(start_date)
+    end = _day(end_date)
+
+    if people_id is not None:
+      bucket = ('people_id', people_id)
+    elif project_id is not None:
+      bucket = ('project_id', project_id)
+    else:
+      bucket = None
+
+    with self.lock:
+      entries = self.buckets.get(bucket, [])
+
+      # Intervals starting before the end of the period,
+      # and ending after its start
+      last = bisect_left(entries, (end + 1,))
+      objects = [self.objects[entries[i][2]] for i in self._ending_after(bucket, last, start)]
+
+    # Filter on the key not used for the lookup
+    if people_id is not None and project_id is not None:
+      objects = [o for o in objects if o.get('project_id') == project_id]
+
+    return objects
+
+
+  def _tree(self, bucket):
+    """
+    Return the segment tree of a bucket: node 1 is the root, the
+    children of node i are 2i and 2i + 1, and the leaves are the end
+    dates of the intervals. Every node holds the latest end date below.
+    """
+    tree = self.trees.get(bucket)
+
+    if tree is None:
+      entries = self.buckets[bucket]
+      size = 1
+      while size < len(entries):
+        size *= 2
+
+      tree = [-1] * size + [e[1] for e in entries] + [-1] * (size - len(entries))
+      for i in range(size - 1, 0, -1):
+        tree[i] = max(tree[2 * i], tree[2 * i + 1])
+
+      self.trees[bucket] = tree
+
+    return tree
+
+
+  def _ending_after(self, bucket, last, start):
+    """
+    Return the positions, in order, of the first last intervals of
+    a bucket ending on or after day start
+    """
+    if not last:
+      return []
+
+    tree = self._tree(bucket)
+    size = len(tree) // 2
+    found = []
+
+    # Depth first, left to right, skipping branches ending before start
+    stack = [(1, 0, size)]
+    while stack:
+      node, lo, hi = stack.pop()
+      if lo >= last or tree[node] < start:
+        continue
+      if node >= size:
+        found.append(lo)
+        continue
+      mid = (lo + hi) // 2
+      stack.append((2 * node + 1, mid, hi))
+      stack.append((2 * node, lo, mid))
+
+    return found
+
+
+  def at(self, day, people_id=None, project_id=None):
+    """
+    Return the objects on a day, sorted by start date
+    """
+    return self.overlapping(day, day, people_id, project_id)
+
+
+  def attach(self, api):
+    """
+    Keep the index up to date with the creates, updates and deletes
+    done through api
+    """
+    api.add_listener(self.on_write)
+
+
+  def detach(self, api):
+    api.remove_listener(self.on_write)
+
+
+  def on_write(self, method, path, data):
+    """
+    Apply a write to the API, see FloatAPI.add_listener
+    """
+    parts = path.split('/')
+
+    if parts[0] != self.path:
+      return
+
+    if method == 'DELETE':
+      self.remove(parts[1])
+    elif data:
+      self.update(data)
@@ -0,0 +1,232 @@
+import threading
+from bisect import bisect_left
+
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Upper bounds of the response size buckets, in bytes
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Histogram():
+  """
+  Counts of observations per bucket, like a Prometheus histogram
+  """
+
+  def __init__(self, buckets):
+    self.buckets = tuple(buckets)
+    self.counts = [0] * (len(self.buckets) + 1)
+    self.sum = 0
+    self.count = 0
+
+
+  def observe(self, value):
+    self.counts[bisect_left(self.buckets, value)] += 1
+    self.sum += value
+    self.count += 1
+
+
+  def cumulative(self):
+    """
+    Returns:
+      (upper bound, count of observations <= bound) tuples, ending
+      with the bound '+Inf'
+    """
+    total = 0
+    result = []
+
+    for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+      total += count
+      result.append((bound, total))
+
+    return result
+
+
+def _labels(**labels):
+  """
+  Return labels in the Prometheus text format
+  """
+  return '{' + ','.join(
+    '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+    for k, v in labels.items()
+    ) + '}'
+
+
+class MetricsCollector():
+  """
+  Collects metrics of the calls and requests of a client. Add to a
+  client with api.add_hook(collector). One collector can be added to
+  several clients.
+
+  Per endpoint (the path without ids, e.g. 'tasks/{id}') and method
+  it keeps a latency histogram, the number of responses per status
+  code (or 'error' for requests failing without a response), retries, 429 responses, bytes sent and received, and a
+  histogram of response sizes. Per call and endpoint it keeps a
+  latency histogram, the number of pages, cache hits and errors.
+  """
+
+  def __init__(self, latency_buckets=LATENCY_BUCKETS, size_buckets=SIZE_BUCKETS):
+    '''
+    latency_buckets: Upper bounds of the latency buckets, in seconds
+    size_buckets: Upper bounds of the response size buckets, in bytes
+    '''
+
+    self.latency_buckets = latency_buckets
+    self.size_buckets = size_buckets
+    self.lock = threading.Lock()
+    self.reset()
+
+
+  def reset(self):
+    """
+    Forget all metrics
+    """
+    with self.lock:
+      # Keyed by (method, endpoint)
+      self.requests = {}
+
+      # Keyed by (call, endpoint)
+      self.calls = {}
+
+
+  def __call__(self, event, info):
+    if event == 'request':
+      self._request(info)
+    elif event == 'call_end':
+      self._call(info)
+
+
+  def _request(self, info):
+    key = (info['method'], info['endpoint'])
+
+    with self.lock:
+      m = self.requests.get(key)
+      if m is None:
+        m = self.requests[key] = {
+          'latency': Histogram(self.latency_buckets),
+          'size': Histogram(self.size_buckets),
+          'status': {},
+          'retries': 0,
+          'throttled': 0,
+          'bytes_sent': 0,
+          'bytes_received': 0,
+          }
+
+      status = info['status_code'] if info['status_code'] is not None else 'error'
+
+      m['latency'].observe(info['elapsed'])
+      if status != 'error':
+        m['size'].observe(info['bytes_received'])
+      m['status'][status] = m['status'].get(status, 0) + 1
+      m['retries'] += info['retries']
+      m['throttled'] += info['throttled']
+      m['bytes_sent'] += info['bytes_sent']
+      m['bytes_received'] += info['bytes_received']
+
+
+  def _call(self, info):
+    key = (info['call'], info['endpoint'])
+
+    with self.lock:
+      m = self.calls.get(key)
+      if m is None:
+        m = self.calls[key] = {
+          'latency': Histogram(self.latency_buckets),
+          'pages': 0,
+          'cached': 0,
+          'errors': 0,
+          }
+
+      m['latency'].observe(info['elapsed'])
+      m['pages'] += info.get('pages', 0)
+      m['cached'] += bool(info.get('cached'))
+      m['errors'] += info['error'] is not None
+
+
+  def stats(self):
+    """
+    Returns:
+      A dict of totals: requests, failed (requests without a
+      response), retries, throttled, bytes_sent, bytes_received,
+      calls, pages and errors (calls raising an exception)
+    """
+    with self.lock:
+      requests = list(self.requests.values())
+      calls = list(self.calls.values())
+
+    return {
+      'requests': sum(m['latency'].count for m in requests),
+      'failed': sum(m['status'].get('error', 0) for m in requests),
+      'retries': sum(m['retries'] for m in requests),
+      'throttled': sum(m['throttled'] for m in requests),
+      'bytes_sent': sum(m['bytes_sent'] for m in requests),
+      'bytes_received': sum(m['bytes_received'] for m in requests),
+      'calls': sum(m['latency'].count for m in calls),
+      'pages': sum(m['pages'] for m in calls),
+      'errors': sum(m['errors'] for m in calls),
+    }
+
+
+  def to_prometheus(self, prefix='float_api'):
+    """
+    Returns:
+      All metrics in the Prometheus text exposition format
+    """
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+      lines.append('# HELP {}_{} {}'.format(prefix, name, help_text))
+      lines.append('# TYPE {}_{} {}'.format(prefix, name, kind))
+      for suffix, labels, value in samples:
+        lines.append('{}_{}{}{} {}'.format(prefix, name, suffix, _labels(**labels), value))
+
+    def histogram(h, **labels):
+      samples = [('_bucket', dict(labels, le=bound), count) for bound, count in h.cumulative()]
+      samples.append(('_sum', labels, h.sum))
+      samples.append(('_count', labels, h.count))
+      return samples
+
+    def counter(metrics, field, label_names):
+      return [('', dict(zip(label_names, key)), m[field]) for key, m in metrics]
+
+    with self.lock:
+      requests = sorted(self.requests.items())
+      calls = sorted(self.calls.items())
+
+      request_labels = ('method', 'endpoint')
+      call_labels = ('call', 'endpoint')
+
+      metric('request_duration_seconds', 'histogram', 'Latency of HTTP requests, including retries', [
+        s for (method, endpoint), m in requests
+        for s in histogram(m['latency'], method=method, endpoint=endpoint)
+        ])
+      metric('requests_total', 'counter', 'HTTP requests by final status code, or error', [
+        ('', {'method': method, 'endpoint': endpoint, 'status': status}, count)
+        for (method, endpoint), m in requests
+        for status, count in sorted(m['status'].items(), key=lambda item: str(item[0]))
+        ])
+      metric('retries_total', 'counter', 'Retried HTTP requests',
+        counter(requests, 'retries', request_labels))
+      metric('throttled_total', 'counter', 'Responses with status 429',
+        counter(requests, 'throttled', request_labels))
+      metric('request_bytes_total', 'counter', 'Bytes of request bodies sent',
+        counter(requests, 'bytes_sent', request_labels))
+      metric('response_bytes_total', 'counter', 'Bytes of response bodies received',
+        counter(requests, 'bytes_received', request_labels))
+      metric('response_size_bytes', 'histogram', 'Size of response bodies', [
+        s for (method, endpoint), m in requests
+        for s in histogram(m['size'], method=method, endpoint=endpoint)
+        ])
+      metric('call_duration_seconds', 'histogram', 'Duration of client calls', [
+        s for (call, endpoint), m in calls
+        for s in histogram(m['latency'], call=call, endpoint=endpoint)
+        ])
+      metric('pages_total', 'counter', 'Pages fetched by get_all and iter_all calls',
+        counter(calls, 'pages', call_labels))
+      metric('cache_hits_total', 'counter', 'Calls served from the response cache',
+        counter(calls, 'cached', call_labels))
+      metric('call_errors_total', 'counter', 'Calls raising an exception',
+        counter(calls, 'errors', call_labels))
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,194 @@
+import json
+import sqlite3
+import threading
+
+
+class FloatMirror():
+  """
+  A local SQLite copy of a Float account, for fast offline queries.
+
+  snapshot() stores the records of all get_all_* calls. Every entity
+  gets a table with the record as JSON, and the columns Float is
+  usually queried by, which are indexed.
+
+  Use ':memory:' as path for an in-memory database.
+  """
+
+  # Table name, get_all_* call, id key and indexed columns per entity
+  entities = {
+    'accounts': ('get_all_accounts', 'account_id', ()),
+    'clients': ('get_all_clients', 'client_id', ()),
+    'departments': ('get_all_departments', 'department_id', ()),
+    'holidays': ('get_all_holidays', 'holiday_id', ('date',)),
+    'milestones': ('get_all_milestones', 'milestone_id', ('project_id', 'date')),
+    'people': ('get_all_people', 'people_id', ()),
+    'phases': ('get_all_phases', 'phase_id', ('project_id', 'start_date', 'end_date')),
+    'projects': ('get_all_projects', 'project_id', ('client_id',)),
+    'tasks': ('get_all_tasks', 'task_id', ('people_id', 'project_id', 'start_date', 'end_date')),
+    'logged_time': ('get_all_logged_time', 'logged_time_id', ('people_id', 'project_id', 'date')),
+    'timeoffs': ('get_all_timeoffs', 'timeoff_id', ('start_date', 'end_date')),
+    'timeoff_types': ('get_all_timeoff_types', 'timeoff_type_id', ()),
+  }
+
+  def __init__(self, path):
+    '''
+    path: The SQLite database file
+    '''
+
+    self.db = sqlite3.connect(path, check_same_thread=False)
+    self.lock = threading.Lock()
+
+    with self.lock, self.db:
+      for table, (call, id_key, columns) in self.entities.items():
+        self.db.execute(
+          "CREATE TABLE IF NOT EXISTS {} ({} PRIMARY KEY, {}data TEXT NOT NULL)".format(
+            table, id_key, ''.join('{}, '.format(c) for c in columns))
+          )
+        for c in columns:
+          self.db.execute(
+            "CREATE INDEX IF NOT EXISTS {0}_{1} ON {0} ({1})".format(table, c)
+            )
+
+
+  def close(self):
+    self.db.close()
+
+
+  def snapshot(self, api, entities=None):
+    """
+    Replace the contents of the mirror with the records in Float
+    Args:
+      api: The FloatAPI to copy from
+      entities: The entities to copy (Default: all)
+    Returns:
+      The number of records stored per entity
+    """
+    counts = {}
+
+    for table in entities or self.entities:
+      call = self.entities[table][0]
+      counts[table] = self.store(table, getattr(api, call)(), replace=True)
+
+    return counts
+
+
+  def store(self, table, records, replace=False):
+    """
+    Insert or update records of an entity
+    Args:
+      table: The entity, e.g. 'tasks'
+      records: The records to store
+      replace: Delete all existing records of the entity first
+    Returns:
+      The number of records stored
+    """
+    call, id_key, columns = self.entities[table]
+    keys = (id_key,) + columns
+
+    sql = "INSERT OR REPLACE INTO {} ({}, data) VALUES ({}?)".format(
+      table, ', '.join(keys), '?, ' * len(keys))
+
+    rows = (
+      tuple(r.get(k) for k in keys) + (json.dumps(r),)
+      for r in records
+      )
+
+    with self.lock, self.db:
+      if replace:
+        self.db.execute("DELETE FROM {}".format(table))
+      return self.db.executemany(sql, rows).rowcount
+
+
+  def delete(self, table, ids):
+    """
+    Delete records of an entity by id
+    """
+    id_key = self.entities[table][1]
+
+    with self.lock, self.db:
+      self.db.executemany(
+        "DELETE FROM {} WHERE {} = ?".format(table, id_key),
+        [(i,) for i in ids]
+        )
+
+
+  def get(self, table, object_id):
+    """
+    Returns:
+      A single record by id, or None
+    """
+    r = self.query(table, **{self.entities[table][1]: object_id})
+    return r[0] if r else None
+
+
+  def query(self, table, start_date=None, end_date=None, **filters):
+    """
+    Return the records of an entity matching all filters.
+    Args:
+      table: The entity, e.g. 'tasks'
+      start_date, end_date: Only records overlapping this period.
+        Uses the 'start_date' and 'end_date' columns, or the 'date'
+        column of the entity.
+      filters: Column values to match, e.g. people_id=123. A list
+        or tuple matches any of its values.
+    """
+    call, id_key, columns = self.entities[table]
+
+    where = []
+    args = []
+
+    for k, v in filters.items():
+      if k != id_key and k not in columns:
+        raise ValueError("Can not query {} by {}".format(table, k))
+      if isinstance(v, (list, tuple, set)):
+        v = list(v)
+        where.append("{} IN ({})".format(k, ', '.join('?' * len(v))))
+        args += v
+      else:
+        where.append("{} = ?".format(k))
+        args.append(v)
+
+    # Columns holding the period of a record
+    if 'start_date' in columns:
+      first, last = 'start_date', 'end_date'
+    else:
+      first, last = 'date', 'date'
+
+    if start_date:
+      where.append("{} >= ?".format(last))
+      args.append(start_date)
+
+    if end_date:
+      where.append("{} <= ?".format(first))
+      args.append(end_date)
+
+    sql = "SELECT data FROM {}".format(table)
+    if where:
+      sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY {}".format(id_key)
+
+    with self.lock:
+      rows = self.db.execute(sql, args).fetchall()
+
+    return [json.loads(r[0]) for r in rows]
+
+
+  def tasks_for_person(self, people_id, start_date=None, end_date=None):
+    """
+    Returns the tasks of a person, optionally only in a period
+    """
+    return self.query('tasks', start_date, end_date, people_id=people_id)
+
+
+  def tasks_for_project(self, project_id, start_date=None, end_date=None):
+    """
+    Returns the tasks of a project, optionally only in a period
+    """
+    return self.query('tasks', start_date, end_date, project_id=project_id)
+
+
+  def logged_time_for_person(self, people_id, start_date=None, end_date=None):
+    """
+    Returns the logged time of a person, optionally only in a period
+    """
+    return self.query('logged_time', start_date, end_date, people_id=people_id)
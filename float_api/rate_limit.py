@@ -0,0 +1,153 @@
+import threading
+import time
+
+
+class RateLimiter():
+  """
+  A token bucket pacing requests to the Float API.
+
+  The bucket starts out allowing `rate` requests per `per` seconds.
+  After every response it is adjusted to the X-RateLimit-* headers
+  sent by Float, so requests are paced to stay just below the limit
+  instead of running into it and backing off on 429.
+
+  A RateLimiter is thread safe. Pass the same instance to several
+  FloatAPI objects to share the limit between them.
+  """
+
+  def __init__(self, rate=200, per=60.0, burst=None, margin=1):
+    '''
+    rate: Number of requests allowed per period
+    per: Length of a period in seconds
+    burst: Maximum number of requests to send back to back (Default: rate)
+    margin: Number of requests to keep in hand below the server's limit
+    '''
+
+    self.per = per
+    self.margin = margin
+
+    # Requests added to the bucket per second
+    self.fill_rate = rate / per
+
+    # Maximum number of tokens in the bucket
+    self.capacity = burst or rate
+
+    # Available tokens. Negative when requests have been reserved ahead.
+    self.tokens = self.capacity
+
+    # When tokens were last added
+    self.updated = time.monotonic()
+
+    # No requests before this time (monotonic clock)
+    self.blocked_until = 0.0
+
+    # Requests reserved, but without a response yet
+    self.in_flight = 0
+
+    self.lock = threading.Lock()
+
+
+  def _refill(self, now):
+    """
+    Add the tokens earned since last refill
+    """
+    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+    self.updated = now
+
+
+  def reserve(self):
+    """
+    Take a token from the bucket.
+    Returns:
+      The number of seconds to wait before sending the request
+    """
+    with self.lock:
+      now = time.monotonic()
+      self._refill(now)
+      self.tokens -= 1
+      self.in_flight += 1
+
+      # Seconds until the reserved token has been earned
+      wait = max(0.0, -self.tokens / self.fill_rate)
+
+      return max(wait, self.blocked_until - now)
+
+
+  def acquire(self):
+    """
+    Block until a request may be sent
+    """
+    wait = self.reserve()
+    if wait > 0:
+      time.sleep(wait)
+
+
+  def release(self):
+    """
+    Let the bucket know a request reserved got no response
+    """
+    with self.lock:
+      self.in_flight = max(0, self.in_flight - 1)
+
+
+  def cancel(self):
+    """
+    Give back the token of a request reserved, but not sent
+    """
+    with self.lock:
+      self._refill(time.monotonic())
+      self.tokens = min(self.capacity, self.tokens + 1)
+      self.in_flight = max(0, self.in_flight - 1)
+
+
+  def update(self, status_code, headers, max_wait=None):
+    """
+    Adjust the bucket to the rate limit headers of a response
+    Args:
+      status_code: The status code of the response
+      headers: The headers of the response
+      max_wait: Maximum seconds to wait for a Retry-After
+        (Default: as long as the server asks)
+    """
+
+    limit = _int_header(headers, 'X-RateLimit-Limit')
+    remaining = _int_header(headers, 'X-RateLimit-Remaining')
+    reset = _int_header(headers, 'X-RateLimit-Reset')
+    retry_after = _int_header(headers, 'Retry-After')
+    if retry_after is not None and max_wait is not None:
+      retry_after = min(retry_after, max_wait)
+
+    with self.lock:
+      now = time.monotonic()
+      self._refill(now)
+      self.in_flight = max(0, self.in_flight - 1)
+
+      # Follow the limit of the server
+      if limit:
+        self.fill_rate = limit / self.per
+        self.capacity = min(self.capacity, limit)
+
+      # Never send more than the server has left, minus the margin and
+      # the requests in flight, which the server has not counted yet
+      if remaining is not None:
+        self.tokens = min(self.tokens, remaining - self.margin - self.in_flight)
+
+      # Nothing left. Wait until the window resets.
+      if reset is not None and remaining is not None and remaining <= self.margin:
+        # Reset is either a Unix timestamp or a number of seconds
+        seconds = reset - time.time() if reset > 1e9 else reset
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+      # The server told us to back off
+      if status_code == 429 and retry_after is not None:
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+
+
+def _int_header(headers, name):
+  """
+  Return the value of header name as an int, or None if missing or invalid
+  """
+  try:
+    return int(float(headers[name]))
+  except (KeyError, TypeError, ValueError):
+    return None
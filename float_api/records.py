@@ -0,0 +1,245 @@
+from datetime import date
+from datetime import datetime
+from functools import lru_cache
+
+
+# Many records share the same dates, so parsed dates are shared too
+
+@lru_cache(maxsize=8192)
+def _parse_date(value):
+  try:
+    return date.fromisoformat(value) if value else None
+  except (TypeError, ValueError):
+    # Keep what the API returned
+    return value
+
+
+@lru_cache(maxsize=8192)
+def _parse_datetime(value):
+  try:
+    return datetime.fromisoformat(value) if value else None
+  except (TypeError, ValueError):
+    # Keep what the API returned
+    return value
+
+
+class Record():
+  """
+  A compact, typed version of an object returned by the API.
+
+  Attributes are the keys returned by Float. Dates ('YYYY-MM-DD') are
+  parsed to datetime.date and timestamps ('YYYY-MM-DD HH:MM:SS') to
+  datetime.datetime. Keys not known by the class are kept in 'extra'.
+
+  Records use __slots__, so they take a fraction of the memory of a
+  dict. They can still be read like a dict: record['task_id'].
+  """
+
+  __slots__ = ('extra',)
+
+  # The keys of the object
+  fields = ()
+
+  # Keys holding dates and timestamps
+  date_fields = ()
+  datetime_fields = ()
+
+  def __init__(self, **kwargs):
+    for f in self.fields:
+      setattr(self, f, kwargs.pop(f, None))
+    self.extra = kwargs or None
+
+
+  @classmethod
+  def from_dict(cls, d):
+    """
+    Return a record of an object from the API
+    """
+    r = cls.__new__(cls)
+
+    for f in cls.fields:
+      setattr(r, f, d.get(f))
+
+    for f in cls.date_fields:
+      setattr(r, f, _parse_date(d.get(f)))
+
+    for f in cls.datetime_fields:
+      setattr(r, f, _parse_datetime(d.get(f)))
+
+    # Keys not known by the class
+    r.extra = {k: v for k, v in d.items() if k not in cls._field_set} or None
+
+    return r
+
+
+  def to_dict(self):
+    """
+    Return the record as the object returned by the API
+    """
+    d = {f: getattr(self, f) for f in self.fields}
+
+    for f in self.date_fields:
+      if isinstance(d[f], date):
+        d[f] = d[f].isoformat()
+
+    for f in self.datetime_fields:
+      if isinstance(d[f], datetime):
+        d[f] = d[f].isoformat(' ')
+
+    if self.extra:
+      d.update(self.extra)
+
+    return d
+
+
+  def __getitem__(self, key):
+    try:
+      return getattr(self, key)
+    except (AttributeError, TypeError):
+      if self.extra and key in self.extra:
+        return self.extra[key]
+      raise KeyError(key)
+
+
+  def get(self, key, default=None):
+    try:
+      return self[key]
+    except KeyError:
+      return default
+
+
+  def __eq__(self, other):
+    if type(other) is not type(self):
+      return NotImplemented
+    return self.to_dict() == other.to_dict()
+
+
+  def __repr__(self):
+    id_field = self.fields[0]
+    return '{}({}={!r})'.format(type(self).__name__, id_field, getattr(self, id_field))
+
+
+  def __init_subclass__(cls, **kwargs):
+    super().__init_subclass__(**kwargs)
+    cls._field_set = frozenset(cls.fields)
+
+
+def _record_class(name, fields, date_fields=(), datetime_fields=(), doc=None):
+  """
+  Return a Record class with a slot per field
+  """
+  return type(name, (Record,), {
+    '__slots__': tuple(fields),
+    '__doc__': doc,
+    'fields': tuple(fields),
+    'date_fields': tuple(date_fields),
+    'datetime_fields': tuple(datetime_fields),
+    })
+
+
+Task = _record_class(
+  'Task',
+  [
+    'task_id',
+    'project_id',
+    'phase_id',
+    'start_date',
+    'end_date',
+    'start_time',
+    'hours',
+    'people_id',
+    'people_ids',
+    'status',
+    'priority',
+    'name',
+    'notes',
+    'repeat_state',
+    'repeat_end_date',
+    'created_by',
+    'created',
+    'modified_by',
+    'modified',
+  ],
+  date_fields=['start_date', 'end_date', 'repeat_end_date'],
+  datetime_fields=['created', 'modified'],
+  doc='A task. See Record.'
+  )
+
+
+Person = _record_class(
+  'Person',
+  [
+    'people_id',
+    'name',
+    'email',
+    'job_title',
+    'department',
+    'notes',
+    'avatar_file',
+    'auto_email',
+    'employee_type',
+    'work_days_hours',
+    'active',
+    'people_type_id',
+    'tags',
+    'start_date',
+    'end_date',
+    'default_hourly_rate',
+    'created',
+    'modified',
+  ],
+  date_fields=['start_date', 'end_date'],
+  datetime_fields=['created', 'modified'],
+  doc='A person. See Record.'
+  )
+
+
+Project = _record_class(
+  'Project',
+  [
+    'project_id',
+    'name',
+    'client_id',
+    'color',
+    'notes',
+    'tags',
+    'budget_type',
+    'budget_total',
+    'default_hourly_rate',
+    'non_billable',
+    'tentative',
+    'active',
+    'project_manager',
+    'all_pms_schedule',
+    'created',
+    'modified',
+  ],
+  datetime_fields=['created', 'modified'],
+  doc='A project. See Record.'
+  )
+
+
+LoggedTime = _record_class(
+  'LoggedTime',
+  [
+    'logged_time_id',
+    'date',
+    'notes',
+    'hours',
+    'billable',
+    'people_id',
+    'project_id',
+    'phase_id',
+    'task_id',
+    'task_name',
+    'locked',
+    'locked_date',
+    'created',
+    'created_by',
+    'modified_by',
+    'modified',
+  ],
+  date_fields=['date', 'locked_date'],
+  datetime_fields=['created', 'modified'],
+  doc='Logged time. See Record.'
+  )
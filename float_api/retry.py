@@ -0,0 +1,141 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+# Status codes to retry
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class RetryBudget():
+  """
+  Limits retries to a share of the requests sent, so a struggling API
+  is not flooded with retries. Every request adds `ratio` tokens to
+  the budget, and every retry takes one. A reserve of `min_tokens`
+  allows retries when few requests have been sent.
+
+  A RetryBudget is thread safe. Share one between clients to share
+  the budget.
+  """
+
+  def __init__(self, ratio=0.2, min_tokens=10, max_tokens=100):
+    '''
+    ratio: Retries allowed per request sent
+    min_tokens: Retries allowed before any requests are sent
+    max_tokens: Maximum number of retries saved up
+    '''
+
+    self.ratio = ratio
+    self.max_tokens = max_tokens
+    self.tokens = min_tokens
+    self.lock = threading.Lock()
+
+
+  def deposit(self):
+    """
+    Add the tokens of a request
+    """
+    with self.lock:
+      self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+
+  def withdraw(self):
+    """
+    Take a token for a retry.
+    Returns:
+      False if the budget is spent
+    """
+    with self.lock:
+      if self.tokens < 1:
+        return False
+      self.tokens -= 1
+      return True
+
+
+def retry_after(headers):
+  """
+  Return the seconds to wait in a Retry-After header (seconds or
+  an HTTP date), or None
+  """
+  value = headers.get('Retry-After')
+
+  if not value:
+    return None
+
+  if value.strip().isdigit():
+    return int(value)
+
+  try:
+    return max(0, parsedate_to_datetime(value).timestamp() - time.time())
+  except (TypeError, ValueError):
+    return None
+
+
+class RetryPolicy():
+  """
+  When and how long to wait before retrying a request.
+
+  Requests are retried on the status codes in status_codes, and on
+  errors of the transport. POST requests are only retried if the
+  connection could not be made, so objects are not created twice.
+
+  The wait is the server's Retry-After, if any. Otherwise it grows
+  exponentially, with full jitter (a random wait between 0 and the
+  backoff), so clients retrying at the same time are spread out.
+  Either way, it is at most max_backoff.
+  """
+
+  def __init__(self, retries=5, backoff_factor=0.5, max_backoff=30, jitter=True,
+               status_codes=RETRY_STATUS_CODES, budget=None):
+    '''
+    retries: Maximum number of retries of a request
+    backoff_factor: The backoff is backoff_factor * 2^retry seconds
+    max_backoff: Maximum seconds to wait before a retry
+    jitter: Wait a random time up to the backoff
+    status_codes: The status codes to retry
+    budget: A RetryBudget limiting the retries of the client
+      (Default: a budget of 20% of requests)
+    '''
+
+    self.retries = retries
+    self.backoff_factor = backoff_factor
+    self.max_backoff = max_backoff
+    self.jitter = jitter
+    self.status_codes = tuple(status_codes)
+    self.budget = budget if budget is not None else RetryBudget()
+
+
+  def retry_status(self, status_code):
+    """
+    Returns:
+      True if responses with status_code are retried
+    """
+    return status_code in self.status_codes
+
+
+  def retry_error(self, method, connect_error):
+    """
+    Returns:
+      True if a request failing with an error is retried
+    """
+    return connect_error or method.upper() != 'POST'
+
+
+  def backoff(self, retry, headers=None):
+    """
+    Returns:
+      The seconds to wait before retry number retry + 1
+    """
+    # The server knows best, but a worker must not stall for long
+    if headers is not None:
+      seconds = retry_after(headers)
+      if seconds is not None:
+        return min(self.max_backoff, seconds)
+
+    backoff = min(self.max_backoff, self.backoff_factor * (2 ** retry))
+
+    if self.jitter:
+      return random.uniform(0, backoff)
+
+    return backoff
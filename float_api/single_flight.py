@@ -0,0 +1,195 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as WaitTimeout
+
+from .cache import _copy_payload
+
+
+class SingleFlight():
+  """
+  Lets identical calls in flight at the same time share one call.
+
+  The first caller of a key makes the call. Callers of the same key
+  arriving before it is done wait for it, and get a copy of its result
+  (or its exception). Once done, or forgotten after a write, the next
+  caller makes a new call.
+
+  Errors of the first caller's own making, e.g. its deadline passing,
+  are not shared: the callers waiting make a new call instead.
+
+  Keys are URLs with their query string.
+
+  A SingleFlight is thread safe. Coroutines are shared per event loop.
+  """
+
+  def __init__(self):
+    # The future of every call in flight, the number of callers waiting
+    # for it, and whether it failed with an error of the caller making
+    # it, by event loop (None if not async) and key
+    self.calls = {}
+    self.lock = threading.Lock()
+
+    # Number of callers which got the result of another call
+    self.shared = 0
+
+
+  def _join(self, key, start):
+    """
+    Returns:
+      The entry of the call of key, and True if the caller makes it
+    """
+    with self.lock:
+      entry = self.calls.get(key)
+      if entry is None:
+        entry = self.calls[key] = [None, 0, False]
+        entry[0] = start(entry)
+        return entry, True
+
+      entry[1] += 1
+      self.shared += 1
+      return entry, False
+
+
+  def _done(self, key, entry):
+    """
+    Let the next caller of key make a new call
+    """
+    with self.lock:
+      if self.calls.get(key) is entry:
+        del self.calls[key]
+
+
+  def forget(self, url):
+    """
+    Let the next callers of url, and of the URLs below it, make a new
+    call instead of waiting for a call in flight. Call after a write,
+    as the calls in flight may return the data from before the write.
+    """
+    with self.lock:
+      for key in list(self.calls):
+        call_url = key[1].split('?')[0]
+        if call_url == url or call_url.startswith(url + '/'):
+          del self.calls[key]
+
+
+  def do(self, key, function, timeout=None, own_error=None):
+    """
+    Return the result of function(), shared with all callers of key
+    while it runs
+    Args:
+      key: The key of the call
+      function: The call to make, returning a tuple of the decoded
+        response and the response headers
+      timeout: Seconds to wait for the calls of other callers. Raises
+        concurrent.futures.TimeoutError when it has passed.
+      own_error: A function returning True if an exception raised by
+        function() comes from the caller, not the call. Called by the
+        caller making the call.
+    """
+
+    key = (None, key)
+    end = None if timeout is None else time.monotonic() + timeout
+
+    while True:
+      entry, leader = self._join(key, lambda entry: Future())
+      future = entry[0]
+
+      if leader:
+        break
+
+      left = _left(end)
+      try:
+        data, headers = future.result(left)
+      except Exception:
+        # Not ours to share. Make the call again.
+        if entry[2]:
+          continue
+        raise
+
+      return _copy_payload(data), headers
+
+    try:
+      data, headers = function()
+    except BaseException as e:
+      entry[2] = own_error is not None and own_error(e)
+      self._done(key, entry)
+      future.set_exception(e)
+      raise
+
+    self._done(key, entry)
+    future.set_result((data, headers))
+
+    # Callers may change what they get, so the waiters
+    # copy the response, and so does the caller if shared
+    if entry[1]:
+      data = _copy_payload(data)
+
+    return data, headers
+
+
+  async def do_async(self, key, function, timeout=None, own_error=None):
+    """
+    Return the result of await function(), shared with all callers
+    of key while it runs. See do(). Raises asyncio.TimeoutError when
+    timeout has passed.
+    """
+
+    # Calls are shared within an event loop only
+    key = (id(asyncio.get_running_loop()), key)
+    end = None if timeout is None else time.monotonic() + timeout
+
+    while True:
+      entry, leader = self._join(
+        key, lambda entry: asyncio.ensure_future(_call(function, entry, own_error)))
+      task = entry[0]
+      if leader:
+        task.add_done_callback(lambda t, entry=entry: self._done(key, entry))
+
+      try:
+        remaining = _left(end)
+      except WaitTimeout:
+        raise asyncio.TimeoutError() from None
+
+      # A caller giving up must not cancel the call of the others
+      try:
+        data, headers = await asyncio.wait_for(asyncio.shield(task), remaining)
+      except Exception:
+        # Not ours to share. Make the call again.
+        if not leader and entry[2]:
+          continue
+        raise
+
+      if not leader or entry[1]:
+        data = _copy_payload(data)
+
+      return data, headers
+
+
+async def _call(function, entry, own_error):
+  """
+  Await function(), noting in the entry of the call whether it failed
+  with an error of the caller. Runs in the context of the caller.
+  """
+  try:
+    return await function()
+  except Exception as e:
+    entry[2] = own_error is not None and own_error(e)
+    raise
+
+
+def _left(end):
+  """
+  Return the seconds left until end on the monotonic clock, or None
+  if there is no end. Raises concurrent.futures.TimeoutError once
+  it has passed.
+  """
+  if end is None:
+    return None
+
+  left = end - time.monotonic()
+  if left <= 0:
+    raise WaitTimeout()
+
+  return left
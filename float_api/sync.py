@@ -0,0 +1,119 @@
+class SyncEngine():
+  """
+  Keep a local copy of Float records up to date, by fetching only the
+  records modified since the last sync.
+
+  The first sync fetches all records. Later syncs ask for records
+  modified since the high-water mark (the latest 'modified' timestamp
+  seen). If Float has fewer records than the store, the deleted ones
+  are found by listing the ids only.
+
+  The local copy is a dict of records keyed by id, per entity. Pass
+  your own dict-like store to keep it between runs, together with
+  the high-water marks from high_water.
+  """
+
+  # The path and id key of the entities which can be synced
+  endpoints = {
+    'tasks': ('tasks', 'task_id'),
+    'logged_time': ('logged-time', 'logged_time_id'),
+    'people': ('people', 'people_id'),
+    'projects': ('projects', 'project_id'),
+    'timeoffs': ('timeoffs', 'timeoff_id'),
+  }
+
+  def __init__(self, api, entities=('tasks', 'logged_time', 'people'), store=None,
+               high_water=None, detect_deletions=True):
+    '''
+    api: The FloatAPI to sync from
+    entities: The entities to sync. Keys of SyncEngine.endpoints.
+    store: Records keyed by id, per entity (Default: in memory)
+    high_water: The latest 'modified' timestamp seen, per entity
+    detect_deletions: Remove records no longer in Float
+    '''
+
+    for entity in entities:
+      if entity not in self.endpoints:
+        raise ValueError("Can not sync entity: {}".format(entity))
+
+    self.api = api
+    self.entities = tuple(entities)
+    self.detect_deletions = detect_deletions
+
+    # Records keyed by id, per entity
+    self.store = store if store is not None else {}
+    for entity in self.entities:
+      if entity not in self.store:
+        self.store[entity] = {}
+
+    # The latest 'modified' timestamp seen, per entity
+    self.high_water = dict(high_water or {})
+
+
+  def sync(self):
+    """
+    Sync all entities.
+    Returns:
+      A dict with the ids of the 'updated' and 'deleted' records, per entity
+    """
+    return {entity: self.sync_entity(entity) for entity in self.entities}
+
+
+  def _count(self, path, id_key):
+    """
+    Return the number of records of an entity in Float,
+    with a single request for a page of one id
+    """
+    api = self.api
+    params = api._page_params({'per_page': 1, 'fields': id_key})
+    headers = api._get_json(api.base_url.format(path), params)[1]
+    return int(headers['X-Pagination-Total-Count'])
+
+
+  def sync_entity(self, entity):
+    """
+    Sync a single entity.
+    Returns:
+      A dict with the ids of the 'updated' and 'deleted' records
+    """
+
+    path, id_key = self.endpoints[entity]
+    records = self.store[entity]
+    high_water = self.high_water.get(entity)
+
+    if high_water is None:
+      # First sync. Get everything.
+      fetched = self.api._get_all_pages(path, [], {})
+    else:
+      # Only the records modified since last sync. Records are filtered
+      # here as well, in case the endpoint ignores modified_since.
+      # Records modified in the same second as the high-water mark are
+      # fetched again, so the unchanged ones are skipped below.
+      fetched = self.api._get_all_pages(path, [], {'modified_since': high_water})
+      fetched = [r for r in fetched if r.get('modified', '') >= high_water]
+
+    # The records which are new or changed
+    changed = [r for r in fetched if records.get(r[id_key]) != r]
+
+    for r in changed:
+      records[r[id_key]] = r
+
+      # Timestamps are 'YYYY-MM-DD HH:MM:SS', so they compare as strings
+      if r.get('modified') and (high_water is None or r['modified'] > high_water):
+        high_water = r['modified']
+
+    self.high_water[entity] = high_water
+
+    # Ids no longer in Float. All records in Float are in the store
+    # now, so there is nothing to delete if Float has as many.
+    deleted = []
+    if self.detect_deletions and self._count(path, id_key) != len(records):
+      ids = set(r[id_key] for r in self.api._get_all_pages(path, [], {'fields': id_key}))
+      deleted = [i for i in records if i not in ids]
+      for i in deleted:
+        del records[i]
+
+    return {
+      'updated': [r[id_key] for r in changed],
+      'deleted': deleted
+    }
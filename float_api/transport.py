@@ -0,0 +1,190 @@
+import requests
+from urllib3.exceptions import NewConnectionError
+
+try:
+  import httpx
+except ImportError:
+  httpx = None
+
+try:
+  import h2
+except ImportError:
+  h2 = None
+
+
+class Transport():
+  """
+  Sends the HTTP requests of a FloatAPI. Subclass to use another HTTP
+  library. Responses must have status_code, headers and content
+  (the raw bytes of the body), like requests and httpx responses.
+  """
+
+  # The exceptions raised when a request fails
+  errors = ()
+
+  # The exceptions raised when a connection could not be made,
+  # so the request was never sent
+  connect_errors = ()
+
+  # The exceptions raised when a timeout passed
+  timeout_errors = ()
+
+  def request(self, method, url, headers, params=None, json=None, timeout=None):
+    """
+    Send a request once. FloatAPI does the retries.
+    Args:
+      timeout: A (connect, read) tuple of seconds, or None
+    Returns:
+      The response
+    """
+    raise NotImplementedError
+
+
+  def is_connect_error(self, e):
+    """
+    Returns:
+      True if error e was raised because no connection could be
+      made, so the request was never sent
+    """
+    return isinstance(e, self.connect_errors)
+
+
+  def request_info(self, r):
+    """
+    Returns:
+      A dict with the 'bytes_sent' of a response, and the 'retries'
+      and 'throttled' (429 responses) done by the transport itself
+    """
+    return {'bytes_sent': 0, 'retries': 0, 'throttled': 0}
+
+
+  def close(self):
+    """
+    Close all connections
+    """
+    pass
+
+
+class RequestsTransport(Transport):
+  """
+  Sends requests with a requests.Session. Connections are kept open
+  in a pool per host. This is the default.
+  """
+
+  errors = (requests.RequestException,)
+  connect_errors = (requests.exceptions.ConnectTimeout,)
+  timeout_errors = (requests.Timeout,)
+
+  def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False):
+    '''
+    pool_connections: Number of hosts to keep connection pools for
+    pool_maxsize: Number of connections to keep open per host
+    pool_block: Wait for a free connection when pool_maxsize are in use,
+      instead of opening a connection which is closed after the request
+    '''
+
+    # The session to use for all requests
+    self.session = requests.Session()
+
+    adapter = requests.adapters.HTTPAdapter(
+      pool_connections=pool_connections,
+      pool_maxsize=pool_maxsize,
+      pool_block=pool_block
+      )
+    self.session.mount("https://", adapter)
+    self.session.mount("http://", adapter)
+
+
+  def request(self, method, url, headers, params=None, json=None, timeout=None):
+    return self.session.request(
+      method, url, headers=headers, params=params, json=json, timeout=timeout)
+
+
+  def is_connect_error(self, e):
+    if isinstance(e, self.connect_errors):
+      return True
+
+    # requests raises ConnectionError too when the server closes the
+    # connection after getting the request. Only the errors of urllib3
+    # opening a connection mean the request was never sent.
+    if not isinstance(e, requests.ConnectionError) or not e.args:
+      return False
+
+    reason = getattr(e.args[0], 'reason', e.args[0])
+    return isinstance(reason, NewConnectionError)
+
+
+  def request_info(self, r):
+
+    # The retries done by urllib3, if an adapter retrying is mounted
+    retries = getattr(getattr(r.raw, 'retries', None), 'history', None) or ()
+
+    body = r.request.body or b''
+
+    return {
+      'bytes_sent': len(body.encode() if isinstance(body, str) else body),
+      'retries': len(retries),
+      'throttled': sum(h.status == 429 for h in retries),
+      }
+
+
+  def close(self):
+    self.session.close()
+
+
+class HTTPXTransport(Transport):
+  """
+  Sends requests with an httpx.Client. With HTTP/2, concurrent
+  requests (pages of get_all_* calls, bulk calls) share a single
+  multiplexed connection per host instead of one connection each.
+
+  Requires httpx, and h2 for HTTP/2: pip install float-api[http2]
+  """
+
+  def __init__(self, http2=None, max_connections=10):
+    '''
+    http2: Use HTTP/2 (Default: if h2 is installed)
+    max_connections: Size of the connection pool
+    '''
+
+    if httpx is None:
+      raise ImportError("HTTPXTransport requires httpx. Install with: pip install float-api[http2]")
+
+    if http2 is None:
+      http2 = h2 is not None
+
+    self.http2 = http2
+    self.errors = (httpx.HTTPError,)
+    self.connect_errors = (httpx.ConnectError, httpx.ConnectTimeout)
+    self.timeout_errors = (httpx.TimeoutException,)
+
+    # The client to use for all requests
+    self.client = httpx.Client(
+      http2=http2,
+      limits=httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections
+        )
+      )
+
+
+  def request(self, method, url, headers, params=None, json=None, timeout=None):
+
+    # requests leaves params without a value out of
+    # the URL, httpx sends them as empty strings
+    if params:
+      params = {k: v for k, v in params.items() if v not in (None, [])}
+
+    if timeout is not None:
+      timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+
+    return self.client.request(
+      method, url, headers=headers, params=params, json=json, timeout=timeout)
+
+
+  def request_info(self, r):
+    return {'bytes_sent': len(r.request.content), 'retries': 0, 'throttled': 0}
+
+
+  def close(self):
+    self.client.close()
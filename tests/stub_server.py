@@ -0,0 +1,491 @@
+"""
+A local stand-in for the Float API, used by the offline tests and
+the benchmarks.
+
+The stub keeps its data in memory and answers the same paths as
+https://api.float.com/v3/ including the pagination headers. It can
+add latency, enforce a rate limit with Float's X-RateLimit-* headers,
+and serve synthetic data. GET /stats returns the number of requests,
+429 responses and connections served.
+
+Run it on its own, e.g. for the benchmarks, with:
+
+    python tests/stub_server.py [--tasks 100000] [--latency 0.02] [--rate 200]
+
+It prints its base URL and serves until stopped.
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qs
+from urllib.parse import urlparse
+
+# The key holding the id of the objects at each path
+ID_KEYS = {
+    "accounts": "account_id",
+    "clients": "client_id",
+    "departments": "department_id",
+    "holidays": "holiday_id",
+    "logged-time": "logged_time_id",
+    "milestones": "milestone_id",
+    "people": "people_id",
+    "phases": "phase_id",
+    "projects": "project_id",
+    "tasks": "task_id",
+    "timeoffs": "timeoff_id",
+    "timeoff-types": "timeoff_type_id",
+}
+
+
+def synthetic_data(tasks=10000, people=300, projects=50, logged_time=0, seed=1):
+    """Return objects like the ones returned by Float, per path"""
+    rnd = random.Random(seed)
+
+    def day(offset):
+        return time.strftime("%Y-%m-%d", time.gmtime(1672531200 + offset * 86400))
+
+    data = {}
+
+    data["people"] = [
+        {
+            "people_id": i,
+            "name": "Person {}".format(i),
+            "email": "person{}@example.com".format(i),
+            "job_title": "Developer",
+            "department": {"department_id": i % 10, "name": "Department {}".format(i % 10)},
+            "employee_type": 1,
+            "work_days_hours": [0, 8, 8, 8, 8, 8, 0],
+            "active": 1,
+            "people_type_id": 1,
+            "tags": [],
+            "start_date": None,
+            "end_date": None,
+            "default_hourly_rate": "100.00",
+            "created": "2023-01-01 12:00:00",
+            "modified": "2023-01-01 12:00:00",
+        }
+        for i in range(1, people + 1)
+    ]
+
+    data["projects"] = [
+        {
+            "project_id": i,
+            "name": "Project {}".format(i),
+            "client_id": i % 20,
+            "color": "3451b2",
+            "notes": "",
+            "tags": [],
+            "budget_type": 0,
+            "budget_total": None,
+            "default_hourly_rate": None,
+            "non_billable": 0,
+            "tentative": 0,
+            "active": 1,
+            "project_manager": 1,
+            "all_pms_schedule": 0,
+            "created": "2023-01-01 12:00:00",
+            "modified": "2023-01-01 12:00:00",
+        }
+        for i in range(1, projects + 1)
+    ]
+
+    data["tasks"] = []
+    for i in range(1, tasks + 1):
+        start = rnd.randrange(365)
+        data["tasks"].append(
+            {
+                "task_id": i,
+                "project_id": rnd.randint(1, max(1, projects)),
+                "phase_id": 0,
+                "start_date": day(start),
+                "end_date": day(start + rnd.randrange(10)),
+                "start_time": None,
+                "hours": rnd.choice([1, 2, 4, 7.5, 8]),
+                "people_id": rnd.randint(1, max(1, people)),
+                "status": 2,
+                "priority": 0,
+                "name": "Task number {}".format(i),
+                "notes": "Some notes about task {}".format(i),
+                "repeat_state": 0,
+                "repeat_end_date": None,
+                "created_by": 1,
+                "created": "2023-01-01 12:00:00",
+                "modified_by": 1,
+                "modified": "2023-01-01 12:00:00",
+            }
+        )
+
+    data["logged-time"] = [
+        {
+            "logged_time_id": "{:032x}".format(i),
+            "date": day(rnd.randrange(365)),
+            "notes": "",
+            "hours": rnd.choice([1, 2, 4, 8]),
+            "billable": 1,
+            "people_id": rnd.randint(1, max(1, people)),
+            "project_id": rnd.randint(1, max(1, projects)),
+            "phase_id": 0,
+            "task_id": None,
+            "task_name": None,
+            "locked": 0,
+            "locked_date": None,
+            "created": "2023-01-01 12:00:00",
+            "created_by": 1,
+            "modified_by": 1,
+            "modified": "2023-01-01 12:00:00",
+        }
+        for i in range(1, logged_time + 1)
+    ]
+
+    return data
+
+
+class StubFloat:
+    """
+    A Float API on localhost. Use as a context manager:
+
+        with StubFloat({"people": [...]}) as stub:
+            api = stub.api()
+
+    data: Records per path, e.g. synthetic_data()
+    keep_alive: Keep connections open (HTTP/1.1), like Float
+    latency: Seconds to wait before answering a request
+    rate: Requests allowed per window of per seconds (Default: no limit).
+        Requests over the limit get a 429 with a Retry-After header.
+    cache_pages: Keep encoded listings until a write through the API.
+        Leave off when changing data directly.
+    port: The port to listen on (Default: any free port)
+    """
+
+    def __init__(self, data=None, keep_alive=False, latency=0, rate=None, per=60, cache_pages=False, port=0):
+        # Records per path
+        self.data = {path: [] for path in ID_KEYS}
+        for path, records in (data or {}).items():
+            self.data[path] = records if isinstance(records, dict) or callable(records) else list(records)
+
+        # Every request as a (method, path, query) tuple
+        self.requests = []
+
+        # Number of requests to answer with 429 Too Many Requests
+        self.throttle = 0
+
+        # Number of 429 responses sent
+        self.throttled = 0
+
+        # Number of connections accepted
+        self.connections = 0
+
+        # Seconds to wait before answering a request
+        self.latency = latency
+
+        # The rate limit, and the requests in the current window
+        self.rate = rate
+        self.per = per
+        self.window_start = time.monotonic()
+        self.window_count = 0
+
+        # Encoded listings by path and query, if cache_pages
+        self.pages = {} if cache_pages else None
+
+        # The highest id given to a created record, per path
+        self.last_ids = {}
+
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), _handler(self, keep_alive))
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{}/v3/".format(self.server.server_address[1])
+
+    def api(self, **kwargs):
+        """Return a FloatAPI talking to the stub"""
+        from float_api import FloatAPI
+
+        api = FloatAPI("token", "stub test", "test@example.com", **kwargs)
+        api.base_url = self.url + "{}"
+        return api
+
+    def async_api(self, **kwargs):
+        """Return an AsyncFloatAPI talking to the stub"""
+        from float_api import AsyncFloatAPI
+
+        api = AsyncFloatAPI("token", "stub test", "test@example.com", **kwargs)
+        api.base_url = self.url + "{}"
+        return api
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def next_id(self, path):
+        """Return the id of a new record, after the last record and the last id given"""
+        key = ID_KEYS[path]
+        last = max([r[key] for r in self.data[path][-1:]] + [self.last_ids.get(path, 0)])
+        self.last_ids[path] = last + 1
+        return last + 1
+
+    def admit(self):
+        """
+        Count a request against the rate limit
+        Returns:
+            The rate limit headers, and the seconds to wait if over the limit
+        """
+        if self.rate is None:
+            return {}, None
+
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= self.per:
+                self.window_start = now
+                self.window_count = 0
+
+            reset = self.per - (now - self.window_start)
+            headers = {
+                "X-RateLimit-Limit": self.rate,
+                "X-RateLimit-Remaining": max(0, self.rate - self.window_count - 1),
+                "X-RateLimit-Reset": math.ceil(reset),
+            }
+
+            if self.window_count >= self.rate:
+                self.throttled += 1
+                return headers, math.ceil(reset)
+
+            self.window_count += 1
+            return headers, None
+
+    def stats(self):
+        with self.lock:
+            return {"requests": len(self.requests), "throttled": self.throttled, "connections": self.connections}
+
+    def changed(self, path):
+        """Drop the cached listings of path, after a write"""
+        if self.pages:
+            self.pages = {k: v for k, v in self.pages.items() if k[0] != path}
+
+    def find(self, path, object_id):
+        key = ID_KEYS[path]
+        for r in self.data[path]:
+            if str(r[key]) == str(object_id):
+                return r
+        return None
+
+
+def _handler(stub, keep_alive=False):
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 keeps connections open, like Float
+        if keep_alive:
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            with stub.lock:
+                stub.connections += 1
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body=None, headers=None):
+            payload = body if isinstance(body, bytes) else b"" if body is None else json.dumps(body).encode()
+            headers = dict(self.rate_headers, **(headers or {}))
+
+            # Answer conditional GET requests like Float
+            if self.command == "GET" and status == 200:
+                headers["ETag"] = '"{}"'.format(hashlib.md5(payload).hexdigest())
+                if self.headers.get("If-None-Match") == headers["ETag"]:
+                    status, payload = 304, b""
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for k, v in headers.items():
+                self.send_header(k, str(v))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _route(self):
+            """Record the request. Returns None if over the rate limit."""
+            u = urlparse(self.path)
+            parts = u.path[len("/v3/"):].strip("/").split("/")
+            query = {k: v[-1] for k, v in parse_qs(u.query).items()}
+            with stub.lock:
+                stub.requests.append((self.command, u.path, query))
+            if stub.latency:
+                time.sleep(stub.latency)
+
+            self.rate_headers, wait = stub.admit()
+            if wait is not None:
+                self._send(429, headers={"Retry-After": wait})
+                return None
+            return parts, query
+
+        def _throttled(self):
+            self.rate_headers = {}
+            with stub.lock:
+                if stub.throttle <= 0:
+                    return False
+                stub.throttle -= 1
+                stub.throttled += 1
+            self._send(429, headers={"Retry-After": 0})
+            return True
+
+        def _listing(self, path, query):
+            """Return the encoded page of a listing and its pagination headers"""
+            records = stub.data[path]
+            for k, v in query.items():
+                if k.endswith("_id"):
+                    records = [r for r in records if str(r.get(k)) == v]
+            if "start_date" in query:
+                records = [r for r in records if r.get("end_date", "") >= query["start_date"]]
+            if "end_date" in query:
+                records = [r for r in records if r.get("start_date", "") <= query["end_date"]]
+            if "modified_since" in query:
+                records = [r for r in records if r.get("modified", "") >= query["modified_since"]]
+            if "fields" in query:
+                fields = query["fields"].split(",")
+                records = [{f: r[f] for f in fields if f in r} for r in records]
+            per_page = int(query.get("per-page", 50))
+            page = int(query.get("page", 1))
+            page_count = max(1, math.ceil(len(records) / per_page))
+            headers = {
+                "X-Pagination-Total-Count": len(records),
+                "X-Pagination-Page-Count": page_count,
+                "X-Pagination-Current-Page": page,
+                "X-Pagination-Per-Page": per_page,
+            }
+            start = (page - 1) * per_page
+            return json.dumps(records[start:start + per_page]).encode(), headers
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self.rate_headers = {}
+                return self._send(200, stub.stats())
+            if self._throttled():
+                return
+            route = self._route()
+            if route is None:
+                return
+            parts, query = route
+            path = parts[0]
+
+            if path == "reports":
+                report = stub.data.get("reports/" + parts[1], {})
+                return self._send(200, report(query) if callable(report) else report)
+
+            if path not in stub.data:
+                return self._send(404)
+
+            if len(parts) == 2:
+                record = stub.find(path, parts[1])
+                return self._send(200, record) if record else self._send(404)
+
+            if stub.pages is None:
+                return self._send(200, *self._listing(path, query))
+
+            key = (path, tuple(sorted(query.items())))
+            with stub.lock:
+                if key not in stub.pages:
+                    stub.pages[key] = self._listing(path, query)
+                page = stub.pages[key]
+            self._send(200, *page)
+
+        def do_POST(self):
+            if self._throttled():
+                return
+            route = self._route()
+            if route is None:
+                return
+            path = route[0][0]
+            record = self._body()
+            with stub.lock:
+                record[ID_KEYS[path]] = stub.next_id(path)
+                stub.data[path].append(record)
+                stub.changed(path)
+            self._send(201, record)
+
+        def do_PATCH(self):
+            if self._throttled():
+                return
+            route = self._route()
+            if route is None:
+                return
+            parts = route[0]
+            record = stub.find(parts[0], parts[1])
+            if record is None:
+                return self._send(404)
+            with stub.lock:
+                record.update(self._body())
+                stub.changed(parts[0])
+            self._send(200, record)
+
+        def do_DELETE(self):
+            if self._throttled():
+                return
+            route = self._route()
+            if route is None:
+                return
+            parts = route[0]
+            record = stub.find(parts[0], parts[1])
+            if record is None:
+                return self._send(404)
+            with stub.lock:
+                stub.data[parts[0]].remove(record)
+                stub.changed(parts[0])
+            self._send(204)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--people", type=int, default=300)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--logged-time", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0, help="Seconds per request")
+    parser.add_argument("--rate", type=int, default=None, help="Requests per window")
+    parser.add_argument("--per", type=float, default=60, help="Seconds per rate limit window")
+    args = parser.parse_args()
+
+    data = synthetic_data(args.tasks, args.people, args.projects, args.logged_time)
+    stub = StubFloat(
+        data, keep_alive=True, latency=args.latency, rate=args.rate, per=args.per, cache_pages=True, port=args.port
+    )
+
+    print(stub.url, flush=True)
+
+    try:
+        stub.server.serve_forever(poll_interval=0.05)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
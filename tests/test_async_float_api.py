@@ -0,0 +1,71 @@
+import asyncio
+
+from pytest import fixture
+from pytest import raises
+
+from float_api import UnexpectedStatusCode
+from stub_server import StubFloat
+
+
+@fixture
+def stub():
+    people = [{"people_id": i, "name": "Person {}".format(i)} for i in range(1, 501)]
+    reports = {"people": [{"people_id": 1, "scheduled": 8}]}
+    with StubFloat({"people": people, "reports/people": reports}) as stub:
+        yield stub
+
+
+def run(stub, coroutine_function):
+    async def main():
+        async with stub.async_api(max_workers=4) as api:
+            return await coroutine_function(api)
+
+    return asyncio.run(main())
+
+
+def test_get_all(stub):
+    people = run(stub, lambda api: api._get_all_pages("people", [], {"per_page": 40}))
+    assert [p["people_id"] for p in people] == list(range(1, 501)), "Pages are returned in order"
+
+
+def test_iter_all(stub):
+    async def collect(api):
+        return [p async for p in api._iter_all_pages("people", [], {"per_page": 40})]
+
+    people = run(stub, collect)
+    assert len(people) == 500, "Iterate all records"
+
+
+def test_create_get_update_delete(stub):
+    async def crud(api):
+        person = await api.create_person(name="New")
+        person = await api.update_person(people_id=person["people_id"], name="Updated")
+        fetched = await api.get_person(person["people_id"])
+        deleted = await api.delete_person(person["people_id"])
+        return fetched, deleted
+
+    fetched, deleted = run(stub, crud)
+    assert fetched["name"] == "Updated", "Person is updated"
+    assert deleted is True, "Person is deleted"
+
+
+def test_reports(stub):
+    reports = run(stub, lambda api: api.get_people_reports("2023-01-01", "2023-01-31"))
+    assert reports == [{"people_id": 1, "scheduled": 8}], "Reports are unwrapped"
+
+
+def test_unexpected_status_code(stub):
+    with raises(UnexpectedStatusCode):
+        run(stub, lambda api: api.get_person(100000))
+
+
+def test_connections(stub):
+    async def main():
+        api = stub.async_api()
+        assert api.session is None, "No requests.Session"
+        with raises(TypeError):
+            api.close()
+        await api.aclose()
+        assert api.client.is_closed
+
+    asyncio.run(main())
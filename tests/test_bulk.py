@@ -0,0 +1,76 @@
+import asyncio
+
+from pytest import fixture
+
+from float_api import DataValidationError
+from stub_server import StubFloat
+
+
+def task(i):
+    return {"project_id": 1, "start_date": "2023-01-02", "end_date": "2023-01-06", "hours": 8, "people_id": i}
+
+
+@fixture
+def stub():
+    with StubFloat() as stub:
+        yield stub
+
+
+def test_bulk_create(stub):
+    api = stub.api(max_workers=8)
+    items = [task(i) for i in range(50)]
+    items[10] = {"project_id": 1}
+
+    results = api.bulk_create_tasks(items)
+
+    assert [r.item for r in results] == items, "Results are in the order of items"
+    assert isinstance(results[10].error, KeyError), "Invalid item is reported"
+    assert sum(r.ok for r in results) == 49, "Valid items are created"
+    assert len(stub.data["tasks"]) == 49, "Invalid item was not posted"
+    assert results[0].result["task_id"] > 0, "Result is the created task"
+
+
+def test_bulk_create_reports_api_errors(stub):
+    api = stub.api()
+
+    def post(path, data):
+        raise DataValidationError("Invalid")
+
+    api._post = post
+    results = api.bulk_create_tasks([task(1), task(2)])
+    assert all(isinstance(r.error, DataValidationError) for r in results), "API errors are reported"
+
+
+def test_async_bulk_create(stub):
+    async def main():
+        async with stub.async_api() as api:
+            return await api.bulk_create_people([{"name": "A"}, {}, {"name": "B"}])
+
+    results = asyncio.run(main())
+    assert [r.ok for r in results] == [True, False, True], "Results are in the order of items"
+
+
+def test_bulk_update_merges_patches(stub):
+    stub.data["tasks"] = [dict(task(i), task_id=i) for i in range(1, 11)]
+    api = stub.api()
+
+    items = [{"task_id": i, "hours": 4} for i in range(1, 11)]
+    items.append({"task_id": 1, "name": "Renamed"})
+    results = api.bulk_update_tasks(items)
+
+    patches = [r for r in stub.requests if r[0] == "PATCH"]
+    assert len(patches) == 10, "One patch per task"
+    assert results[1].result["hours"] == 4, "First patch is applied"
+    assert results[1].result["name"] == "Renamed", "Later patch is merged"
+
+
+def test_bulk_delete(stub):
+    stub.data["tasks"] = [dict(task(i), task_id=i) for i in range(1, 6)]
+    api = stub.api()
+
+    results = api.bulk_delete_tasks([1, 2, 2, 99])
+
+    assert list(results) == [1, 2, 99], "Results keyed by id, every id once"
+    assert results[1].ok and results[2].ok, "Existing tasks are deleted"
+    assert not results[99].ok, "Missing task is reported"
+    assert len(stub.data["tasks"]) == 3, "Other tasks are kept"
@@ -0,0 +1,65 @@
+import time
+
+from pytest import fixture
+
+from float_api import ResponseCache
+from stub_server import StubFloat
+
+
+@fixture
+def stub():
+    with StubFloat({"people": [{"people_id": 1, "name": "Person"}]}) as stub:
+        yield stub
+
+
+def gets(stub):
+    return [r for r in stub.requests if r[0] == "GET"]
+
+
+def test_get_is_cached(stub):
+    cache = ResponseCache()
+    api = stub.api(cache=cache)
+    assert api.get_person(1) == api.get_person(1), "Same person from the cache"
+    assert len(gets(stub)) == 1, "Only one request"
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}, "One hit and one miss"
+
+
+def test_cached_object_is_a_copy(stub):
+    api = stub.api(cache=ResponseCache())
+    api.get_person(1)["name"] = "Changed"
+    assert api.get_person(1)["name"] == "Person", "Changes by the caller are not cached"
+
+
+def test_update_writes_through(stub):
+    api = stub.api(cache=ResponseCache())
+    api.get_person(1)
+    api.update_person(people_id=1, name="Updated")
+    assert api.get_person(1)["name"] == "Updated", "Updated person is cached"
+    assert len(gets(stub)) == 1, "Update did not require a new get"
+
+
+def test_delete_evicts(stub):
+    cache = ResponseCache()
+    api = stub.api(cache=cache)
+    api.get_person(1)
+    api.delete_person(1)
+    assert cache.get("people/1") is None, "Deleted person is not cached"
+
+
+def test_ttl_per_endpoint():
+    cache = ResponseCache(ttl=60, ttls={"people": 0.01})
+    cache.set("people/1", {})
+    cache.set("projects/1", {})
+    time.sleep(0.02)
+    assert cache.get("people/1") is None, "People expire"
+    assert cache.get("projects/1") == {}, "Projects have not expired"
+
+
+def test_lru_eviction():
+    cache = ResponseCache(maxsize=2)
+    cache.set("people/1", 1)
+    cache.set("people/2", 2)
+    cache.get("people/1")
+    cache.set("people/3", 3)
+    assert cache.get("people/2") is None, "Least recently used is evicted"
+    assert cache.get("people/1") == 1, "Recently used is kept"
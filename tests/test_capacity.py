@@ -0,0 +1,36 @@
+from pytest import importorskip
+
+np = importorskip("numpy")
+
+from float_api.capacity import capacity_matrix
+
+
+def test_capacity_matrix():
+    people = [
+        {"people_id": 1, "work_days_hours": [0, 8, 8, 8, 8, 8, 0]},
+        {"people_id": 2, "work_days_hours": [0, 4, 4, 4, 4, 4, 0]},
+    ]
+    # Monday 2023-01-02 to Sunday 2023-01-08
+    tasks = [
+        {"people_id": 1, "start_date": "2022-12-28", "end_date": "2023-01-03", "hours": 6},
+        {"people_id": 1, "start_date": "2023-01-03", "end_date": "2023-01-08", "hours": 4},
+        {"people_ids": [1, 2], "start_date": "2023-01-06", "end_date": "2023-01-06", "hours": 2},
+        {"people_id": 99, "start_date": "2023-01-02", "end_date": "2023-01-06", "hours": 8},
+    ]
+    timeoffs = [
+        {"people_ids": [2], "start_date": "2023-01-02", "end_date": "2023-01-02", "full_day": 1},
+        {"people_ids": [2], "start_date": "2023-01-03", "end_date": "2023-01-03", "hours": 1},
+    ]
+    holidays = [{"date": "2023-01-05"}]
+
+    c = capacity_matrix(people, tasks, "2023-01-02", "2023-01-08", timeoffs, holidays)
+
+    assert list(c.people_ids) == [1, 2]
+    assert c.days[0] == np.datetime64("2023-01-02")
+    assert c.capacity[0].tolist() == [8, 8, 8, 0, 8, 0, 0], "Holiday and weekend have no capacity"
+    assert c.capacity[1].tolist() == [0, 3, 4, 0, 4, 0, 0], "Time off is subtracted"
+    assert c.scheduled[0].tolist() == [6, 10, 4, 0, 6, 0, 0], "Tasks only count on working days"
+    assert c.scheduled[1].tolist() == [0, 0, 0, 0, 2, 0, 0], "Tasks of several people"
+    assert c.over_allocated[0].tolist() == [False, True, False, False, False, False, False]
+    assert c.utilization[0, 0] == 0.75, "Utilization is scheduled / capacity"
+    assert np.isnan(c.utilization[0, 3]), "No utilization without capacity"
@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+from pytest import raises
+
+from float_api import AsyncFloatAPI
+from float_api import Cassette
+from float_api import CassetteError
+from float_api import FloatAPI
+from float_api import UnexpectedStatusCode
+from stub_server import StubFloat
+
+PEOPLE = [{"people_id": i, "name": "Person {}".format(i)} for i in range(1, 121)]
+
+
+def test_record_and_replay(tmp_path):
+    path = str(tmp_path / "people.json")
+
+    with StubFloat({"people": PEOPLE}) as stub:
+        api = stub.api()
+        with Cassette(path).mount(api):
+            recorded = api._get_all_pages("people", [], {"per_page": 50})
+            api.update_person(people_id=1, name="New name")
+            person = api.get_person(1)
+            with raises(UnexpectedStatusCode):
+                api.get_person(1000)
+        base_url = api.base_url
+
+    cassette = json.load(open(path))
+    assert len(cassette["interactions"]) == 6, "Every request is recorded"
+    assert "token" not in open(path).read(), "The access token is not stored"
+
+    # The stub is gone. Everything is served from the cassette.
+    api = FloatAPI("token", "stub test", "test@example.com")
+    api.base_url = base_url
+    with Cassette(path).mount(api) as cassette:
+        assert not cassette.recording
+        assert api._get_all_pages("people", [], {"per_page": 50}) == recorded, "Pages are replayed"
+        assert api.get_person(1) == person == dict(PEOPLE[0], name="New name")
+        with raises(UnexpectedStatusCode):
+            api.get_person(1000)
+        with raises(CassetteError):
+            api.get_person(2)
+
+
+def test_order_and_ignored_params(tmp_path):
+    path = str(tmp_path / "reports.json")
+    reports = {"people": [{"people_id": 1, "scheduled": 8}]}
+
+    with StubFloat({"people": [dict(p) for p in PEOPLE[:2]], "reports/people": reports}) as stub:
+        api = stub.api()
+        with Cassette(path, ignore_params=("start_date", "end_date")).mount(api):
+            first = api.get_person(2)
+            api.update_person(people_id=2, name="Changed")
+            second = api.get_person(2)
+            api.get_people_reports("2023-01-01", "2023-01-31")
+
+        with Cassette(path, mode="replay", ignore_params=("start_date", "end_date")).mount(api):
+            assert api.get_person(2) == first, "Responses are replayed in recorded order"
+            assert api.get_person(2) == second
+            assert api.get_person(2) == second, "The last response is repeated"
+            assert api.get_people_reports("2024-02-01", "2024-02-28") == reports["people"]
+
+
+def test_async(tmp_path):
+    path = str(tmp_path / "async.json")
+
+    async def get_all(api):
+        async with api:
+            return await api._get_all_pages("people", [], {"per_page": 30})
+
+    with StubFloat({"people": PEOPLE}) as stub:
+        api = stub.async_api()
+        with Cassette(path).mount(api):
+            recorded = asyncio.run(get_all(api))
+        base_url = api.base_url
+
+    api = AsyncFloatAPI("token", "stub test", "test@example.com")
+    api.base_url = base_url
+    with Cassette(path).mount(api):
+        assert asyncio.run(get_all(api)) == recorded == PEOPLE
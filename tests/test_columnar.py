@@ -0,0 +1,45 @@
+from pytest import importorskip
+
+np = importorskip("numpy")
+
+from float_api import columnar
+from float_api import Task
+
+
+def task(i):
+    return {
+        "task_id": i,
+        "project_id": 1,
+        "people_id": 2,
+        "start_date": "2023-01-02",
+        "end_date": None,
+        "hours": "7.5",
+        "name": "Task {}".format(i),
+        "modified": "2023-01-01 12:30:00",
+    }
+
+
+def test_to_numpy():
+    columns = columnar.to_numpy((task(i) for i in range(1, 1001)), "tasks", chunk_size=300)
+    assert columns["task_id"].dtype == np.int64, "Ids are ints"
+    assert list(columns["task_id"][:3]) == [1, 2, 3], "Objects are in order"
+    assert columns["hours"].sum() == 7500.0, "Hours are floats"
+    assert columns["start_date"][0] == np.datetime64("2023-01-02"), "Dates are datetime64"
+    assert np.isnat(columns["end_date"]).all(), "Missing dates are NaT"
+    assert columns["phase_id"][0] == 0, "Missing ints are 0"
+
+
+def test_records():
+    columns = columnar.to_numpy([Task.from_dict(task(1))], "tasks")
+    assert columns["modified"][0] == np.datetime64("2023-01-01T12:30:00"), "Records are converted"
+
+
+def test_parquet(tmp_path):
+    pq = importorskip("pyarrow.parquet")
+    path = str(tmp_path / "tasks.parquet")
+    rows = columnar.write_parquet((task(i) for i in range(1, 1001)), path, "tasks", chunk_size=300)
+    table = pq.read_table(path)
+    assert rows == table.num_rows == 1000, "All rows are written"
+    assert pq.ParquetFile(path).num_row_groups == 4, "A row group per chunk"
+    arrow = columnar.to_arrow((task(i) for i in range(1, 1001)), "tasks")
+    assert table.to_pylist() == arrow.to_pylist(), "Same as the Arrow table"
@@ -0,0 +1,35 @@
+from pytest import fixture
+
+from float_api import ConditionalCache
+from stub_server import StubFloat
+
+
+@fixture
+def stub():
+    clients = [{"client_id": i, "name": "Client {}".format(i)} for i in range(1, 251)]
+    with StubFloat({"clients": clients}) as stub:
+        yield stub
+
+
+def test_unchanged_collection_is_served_from_cache(stub):
+    conditional = ConditionalCache()
+    api = stub.api(conditional=conditional)
+    first = api._get_all_pages("clients", [], {"per_page": 100})
+    second = api._get_all_pages("clients", [], {"per_page": 100})
+    assert first == second, "Same clients from the cache"
+    assert conditional.hits == 3, "All three pages were not modified"
+
+
+def test_changed_collection_is_fetched(stub):
+    conditional = ConditionalCache()
+    api = stub.api(conditional=conditional)
+    api.get_client(1)
+    api.update_client(client_id=1, name="Updated")
+    assert api.get_client(1)["name"] == "Updated", "Changed client is fetched"
+    assert conditional.hits == 0, "Nothing served from the cache"
+
+
+def test_cached_payload_is_a_copy(stub):
+    api = stub.api(conditional=ConditionalCache())
+    api.get_all_clients()[0]["name"] = "Changed"
+    assert api.get_all_clients()[0]["name"] == "Client 1", "Changes by the caller are not cached"
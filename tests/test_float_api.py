@@ -6,6 +6,7 @@ from datetime import date
 from datetime import timedelta
 
 from pytest import fixture
+from float_api import Cassette
 from float_api import FloatAPI
 
 # Get access token from environment variable
@@ -19,6 +20,21 @@ api = FloatAPI(
 )
 
 
+# Record the requests to the API in the cassette FLOAT_CASSETTE, or
+# replay them if it exists. Random data is seeded, so it is the same
+# in every run, and dates of today are not matched.
+@fixture(scope="module", autouse=True)
+def cassette():
+    path = os.environ.get("FLOAT_CASSETTE", None)
+    if path is None:
+        yield None
+        return
+
+    random.seed(path)
+    with Cassette(path, ignore_params=("start_date", "end_date")).mount(api) as c:
+        yield c
+
+
 def account_keys():
     return [
         "account_id",
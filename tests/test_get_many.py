@@ -0,0 +1,72 @@
+import asyncio
+
+from pytest import fixture
+
+from float_api import Person
+from float_api import ResponseCache
+from stub_server import StubFloat
+
+PEOPLE = [{"people_id": i, "name": "Person {}".format(i)} for i in range(1, 1001)]
+
+
+@fixture
+def stub():
+    with StubFloat({"people": [dict(p) for p in PEOPLE]}, keep_alive=True) as stub:
+        yield stub
+
+
+def test_few_one_by_one(stub):
+    api = stub.api(max_workers=4)
+
+    people = api.get_people([3, 1, 9999, 3])
+
+    assert people == {3: PEOPLE[2], 1: PEOPLE[0]}
+    assert list(people) == [3, 1], "In the order of ids, without the ids not found"
+    assert sorted(r[1] for r in stub.requests) == ["/v3/people/1", "/v3/people/3", "/v3/people/9999"]
+
+
+def test_many_from_listing(stub):
+    api = stub.api(max_workers=4)
+
+    people = api.get_people(range(1, 301))
+
+    assert people == {p["people_id"]: p for p in PEOPLE[:300]}
+    assert [r[1] for r in stub.requests] == ["/v3/people"] * 5
+
+
+def test_rest_one_by_one(stub):
+    api = stub.api(max_workers=4)
+
+    # All but two are on the first page
+    people = api.get_people(list(range(1, 151)) + [900, 950])
+
+    assert len(people) == 152
+    assert people[950] == PEOPLE[949]
+    assert sorted(r[1] for r in stub.requests) == ["/v3/people", "/v3/people/900", "/v3/people/950"]
+
+
+def test_cache_and_snapshot(stub):
+    api = stub.api(max_workers=4, cache=ResponseCache())
+    api.get_people(range(1, 301))
+    stub.requests.clear()
+
+    # Served from the cache, filled by the listing
+    people = api.get_people(range(1, 301), as_records=True)
+    assert people[1] == Person.from_dict(PEOPLE[0])
+    assert stub.requests == []
+
+    snapshot = {1001: {"people_id": 1001, "name": "Local"}}
+    assert api.get_people([1001, 1], snapshot=snapshot) == {1001: snapshot[1001], 1: PEOPLE[0]}
+    assert stub.requests == []
+
+
+def test_async(stub):
+    async def run(api):
+        async with api:
+            return await api.get_people([1, 2]), await api.get_people(range(1, 301))
+
+    few, many = asyncio.run(run(stub.async_api(max_workers=4)))
+
+    assert few == {1: PEOPLE[0], 2: PEOPLE[1]}
+    assert many == {p["people_id"]: p for p in PEOPLE[:300]}
+    assert len(stub.requests) == 2 + 5
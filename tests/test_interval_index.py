@@ -0,0 +1,96 @@
+from datetime import date
+
+from float_api import IntervalIndex
+from float_api import Task
+from stub_server import StubFloat
+
+
+TASKS = [
+    {"task_id": 1, "people_id": 1, "project_id": 1, "start_date": "2023-01-02", "end_date": "2023-01-31"},
+    {"task_id": 2, "people_id": 1, "project_id": 2, "start_date": "2023-01-10", "end_date": "2023-01-10"},
+    {"task_id": 3, "people_id": 2, "project_id": 1, "start_date": "2023-01-05", "end_date": "2023-01-06"},
+    {"task_id": 4, "people_ids": [1, 2], "project_id": 2, "start_date": "2023-02-01", "end_date": "2023-02-03"},
+]
+
+
+def test_queries():
+    index = IntervalIndex(TASKS)
+
+    assert len(index) == 4
+    assert index.overlapping("2023-01-06", "2023-01-09") == [TASKS[0], TASKS[2]], "Overlap, in start order"
+    assert index.overlapping("2023-01-11", "2023-02-01", people_id=1) == [TASKS[0], TASKS[3]], "Long and multi-person tasks"
+    assert index.overlapping("2023-01-01", "2023-12-31", people_id=1, project_id=2) == [TASKS[1], TASKS[3]]
+    assert index.at(date(2023, 1, 10), project_id=2) == [TASKS[1]], "Point query"
+    assert index.at("2023-01-01") == [], "Nothing before the first task"
+    assert index.at("2023-02-02", people_id=3) == [], "Unknown person"
+
+
+def test_matches_scan():
+    tasks = [
+        {"task_id": i, "people_id": i % 7, "project_id": i % 3,
+         "start_date": date.fromordinal(738000 + i * 37 % 300).isoformat(),
+         "end_date": date.fromordinal(738000 + i * 37 % 300 + i % 20).isoformat()}
+        for i in range(500)
+    ]
+    index = IntervalIndex(tasks)
+
+    for start in range(737990, 738330, 17):
+        for length in (0, 5, 40):
+            first, last = date.fromordinal(start).isoformat(), date.fromordinal(start + length).isoformat()
+            expected = [t for t in tasks if t["people_id"] == 3 and t["start_date"] <= last and t["end_date"] >= first]
+            result = index.overlapping(first, last, people_id=3)
+            assert sorted(t["task_id"] for t in result) == sorted(t["task_id"] for t in expected)
+
+
+def test_records_and_remove():
+    index = IntervalIndex([Task.from_dict(t) for t in TASKS])
+
+    assert [t.task_id for t in index.at("2023-01-05")] == [1, 3]
+
+    assert index.remove(1).task_id == 1
+    assert index.remove(1) is None, "Already removed"
+    assert [t.task_id for t in index.at("2023-01-05")] == [3]
+    assert index.overlapping("2023-01-01", "2023-01-31", project_id=1)[0].task_id == 3
+
+
+def test_attach():
+    with StubFloat({"tasks": [dict(t) for t in TASKS[:3]]}) as stub:
+        api = stub.api()
+        index = IntervalIndex(api.get_all_tasks())
+        index.attach(api)
+
+        created = api.create_task(people_id=2, project_id=2, start_date="2023-03-01", end_date="2023-03-02", hours=8)
+        assert index.at("2023-03-01", people_id=2) == [created], "Created task is indexed"
+
+        api.update_task(task_id=created["task_id"], start_date="2023-03-02")
+        assert index.at("2023-03-01") == [], "Updated task moved"
+        assert index.get(created["task_id"])["start_date"] == "2023-03-02"
+
+        api.update_task(task_id=3, people_id=1)
+        assert index.at("2023-01-05", people_id=2) == [], "Task moved to another person"
+        assert [t["task_id"] for t in index.at("2023-01-05", people_id=1)] == [1, 3]
+
+        api.delete_task(1)
+        assert 1 not in index
+
+        index.detach(api)
+        api.delete_task(2)
+        assert 2 in index, "Detached index is not updated"
+
+
+def test_long_intervals():
+    # Daily tasks, and one allocation for the whole year
+    tasks = [
+        {"task_id": i, "people_id": 1, "start_date": date.fromordinal(738521 + i).isoformat()}
+        for i in range(365)
+    ]
+    tasks.append({"task_id": 999, "people_id": 1, "start_date": "2023-01-01", "end_date": "2023-12-31"})
+    index = IntervalIndex(tasks)
+
+    for i in range(0, 365, 7):
+        day = date.fromordinal(738521 + i)
+        assert sorted(t["task_id"] for t in index.at(day, people_id=1)) == [i, 999]
+
+    index.remove(999)
+    assert [t["task_id"] for t in index.at("2023-06-01")] == [151]
+    assert index.overlapping("2023-06-01", "2023-06-03") == tasks[151:154]
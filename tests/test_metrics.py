@@ -0,0 +1,92 @@
+import asyncio
+
+import requests
+from pytest import raises
+
+from float_api import MetricsCollector
+from float_api import RetryPolicy
+from stub_server import StubFloat
+
+PEOPLE = [{"people_id": i, "name": "Person {}".format(i)} for i in range(1, 11)]
+
+
+def test_hooks():
+    events = []
+    with StubFloat({"people": PEOPLE}) as stub:
+        api = stub.api()
+        api.add_hook(lambda event, info: events.append((event, dict(info))))
+        api._get_all_pages("people", [], {"per_page": 4})
+        api.get_person(3)
+
+    kinds = [e for e, _ in events]
+    assert kinds[0] == "call_start" and kinds.count("request") == 4, "One request event per page and get"
+    end = [i for e, i in events if e == "call_end"]
+    assert end[0]["call"] == "_get_all_pages" and end[0]["pages"] == 3 and end[0]["error"] is None
+    assert end[1]["endpoint"] == "people/{id}", "Ids are left out of endpoints"
+    request = [i for e, i in events if e == "request"][0]
+    assert request["status_code"] == 200 and request["bytes_received"] > 0 and request["elapsed"] > 0
+
+
+def test_collector():
+    metrics = MetricsCollector()
+    with StubFloat({"people": PEOPLE}) as stub:
+        api = stub.api()
+        api.add_hook(metrics)
+
+        stub.throttle = 2
+        api._get_all_pages("people", [], {"per_page": 5})
+        api.update_person(people_id=1, name="New")
+        try:
+            api.get_person(100)
+        except Exception:
+            pass
+
+    stats = metrics.stats()
+    assert stats["requests"] == 4 and stats["retries"] == 2 and stats["throttled"] == 2
+    assert stats["pages"] == 2 and stats["errors"] == 1 and stats["bytes_sent"] > 0
+
+    text = metrics.to_prometheus()
+    assert '# TYPE float_api_request_duration_seconds histogram' in text
+    assert 'float_api_request_duration_seconds_count{method="GET",endpoint="people"} 2' in text
+    assert 'float_api_requests_total{method="GET",endpoint="people/{id}",status="404"} 1' in text
+    assert 'float_api_retries_total{method="GET",endpoint="people"} 2' in text
+    assert 'float_api_pages_total{call="_get_all_pages",endpoint="people"} 2' in text
+    assert 'float_api_request_duration_seconds_bucket{method="PATCH",endpoint="people/{id}",le="+Inf"} 1' in text
+
+
+def test_failed_requests():
+    metrics = MetricsCollector()
+    events = []
+    with StubFloat({"people": PEOPLE}) as stub:
+        api = stub.api(timeout=(1, 0.05), retry=RetryPolicy(retries=1, backoff_factor=0))
+        api.add_hook(metrics)
+        api.add_hook(lambda event, info: event == "request" and events.append(info))
+
+        stub.latency = 0.2
+        with raises(requests.Timeout):
+            api.get_person(1)
+
+    assert len(events) == 1, "A request event without a response"
+    assert events[0]["status_code"] is None and isinstance(events[0]["error"], requests.Timeout)
+    assert events[0]["retries"] == 1
+
+    stats = metrics.stats()
+    assert stats["requests"] == 1 and stats["failed"] == 1 and stats["retries"] == 1
+    assert 'float_api_requests_total{method="GET",endpoint="people/{id}",status="error"} 1' in metrics.to_prometheus()
+
+
+def test_async_collector():
+    metrics = MetricsCollector()
+
+    async def run(api):
+        async with api:
+            api.add_hook(metrics)
+            return [p async for p in api._iter_all_pages("people", [], {"per_page": 5})]
+
+    with StubFloat({"people": PEOPLE}) as stub:
+        stub.throttle = 1
+        people = asyncio.run(run(stub.async_api()))
+
+    assert len(people) == 10
+    stats = metrics.stats()
+    assert stats["requests"] == 2 and stats["retries"] == 1 and stats["throttled"] == 1 and stats["pages"] == 2
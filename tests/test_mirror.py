@@ -0,0 +1,24 @@
+from float_api import FloatMirror
+from stub_server import StubFloat
+
+
+def test_snapshot_and_query():
+    tasks = [
+        {"task_id": 1, "people_id": 1, "project_id": 1, "start_date": "2023-01-02", "end_date": "2023-01-06"},
+        {"task_id": 2, "people_id": 1, "project_id": 2, "start_date": "2023-02-01", "end_date": "2023-02-03"},
+        {"task_id": 3, "people_id": 2, "project_id": 1, "start_date": "2023-01-05", "end_date": "2023-01-20"},
+    ]
+    logged_time = [{"logged_time_id": "abc", "people_id": 1, "project_id": 1, "date": "2023-01-03"}]
+    with StubFloat({"tasks": tasks, "logged-time": logged_time}) as stub:
+        mirror = FloatMirror(":memory:")
+        counts = mirror.snapshot(stub.api())
+
+    assert counts["tasks"] == 3, "All tasks are stored"
+    assert mirror.get("tasks", 2) == tasks[1], "Records are stored as returned by Float"
+    assert mirror.tasks_for_person(1) == tasks[:2], "Tasks of a person"
+    assert mirror.tasks_for_person(1, "2023-01-06", "2023-01-31") == tasks[:1], "Tasks of a person in a period"
+    assert mirror.query("tasks", project_id=[1, 2], start_date="2023-01-10") == tasks[1:], "Filter on a list"
+    assert mirror.logged_time_for_person(1, "2023-01-01", "2023-01-03") == logged_time, "Logged time by date"
+
+    mirror.delete("tasks", [1])
+    assert mirror.tasks_for_project(1) == tasks[2:], "Deleted task is gone"
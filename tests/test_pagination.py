@@ -0,0 +1,87 @@
+import json
+
+from pytest import fixture
+
+from stub_server import StubFloat
+
+
+@fixture
+def stub():
+    people = [{"people_id": i, "name": "Person {}".format(i)} for i in range(1, 1001)]
+    with StubFloat({"people": people}) as stub:
+        yield stub
+
+
+def test_get_all_pages_in_order(stub):
+    api = stub.api(max_workers=8)
+    people = api._get_all_pages("people", [], {"per_page": 30})
+    assert [p["people_id"] for p in people] == list(range(1, 1001)), "Pages are returned in order"
+
+
+def test_get_all_pages_serial(stub):
+    api = stub.api()
+    people = api.get_all_people(max_workers=1)
+    assert len(people) == 1000, "All records with a single worker"
+
+
+def test_get_all_pages_leaves_params_untouched(stub):
+    api = stub.api()
+    params = {"per_page": 100}
+    api._get_all_pages("people", [], params)
+    assert params == {"per_page": 100}, "Caller's params are not modified"
+
+
+def test_get_all_pages_fetches_every_page_once(stub):
+    api = stub.api(max_workers=4)
+    api._get_all_pages("people", [], {"per_page": 100})
+    pages = sorted(int(q["page"]) for m, p, q in stub.requests)
+    assert pages == list(range(1, 11)), "Each page is requested once"
+
+
+def test_iter_all_pages(stub):
+    api = stub.api()
+    people = api._iter_all_pages("people", [], {"per_page": 100})
+    assert [p["people_id"] for p in people] == list(range(1, 1001)), "Iterate all records in order"
+
+
+def test_iter_all_is_lazy(stub):
+    api = stub.api()
+    people = api.iter_all_people(read_ahead=False)
+    assert stub.requests == [], "Nothing is requested before iterating"
+    next(people)
+    assert len(stub.requests) == 1, "Only the first page is requested"
+
+
+def test_iter_all_without_read_ahead(stub):
+    api = stub.api()
+    people = list(api._iter_all_pages("people", [], {"per_page": 300}, read_ahead=False))
+    assert len(people) == 1000, "All records without read ahead"
+
+
+def test_get_all_tasks_in_windows():
+    tasks = [
+        {"task_id": 1, "start_date": "2023-01-02", "end_date": "2023-01-06"},
+        {"task_id": 2, "start_date": "2023-01-20", "end_date": "2023-03-10"},
+        {"task_id": 3, "start_date": "2023-02-01", "end_date": "2023-02-01"},
+        {"task_id": 4, "start_date": "2023-06-01", "end_date": "2023-06-30"},
+    ]
+    with StubFloat({"tasks": tasks}) as stub:
+        api = stub.api()
+        windowed = api.get_all_tasks("2023-01-01", "2023-03-31", window="month")
+        requests = len(stub.requests)
+        assert windowed == api.get_all_tasks("2023-01-01", "2023-03-31"), "Same tasks as a single query"
+    assert requests == 3, "One request per window"
+
+
+def test_json_decoder(stub):
+    decoded = []
+
+    def decoder(content):
+        decoded.append(content)
+        return json.loads(content)
+
+    api = stub.api(json_decoder=decoder)
+    people = api._get_all_pages("people", [], {"per_page": 500})
+    assert len(people) == 1000, "All records are decoded"
+    assert len(decoded) == 2, "Every page is decoded by the decoder"
+    assert isinstance(decoded[0], bytes), "Decoder gets the raw bytes"
@@ -0,0 +1,118 @@
+import threading
+import time
+
+from pytest import raises
+
+from float_api import DeadlineExceeded
+from float_api import RateLimiter
+from stub_server import StubFloat
+
+
+def test_burst_is_not_delayed():
+    limiter = RateLimiter(rate=10, per=1.0)
+    assert all(limiter.reserve() == 0 for i in range(10)), "A full bucket allows a burst"
+    assert limiter.reserve() > 0, "An empty bucket delays the next request"
+
+
+def test_paced_to_rate():
+    limiter = RateLimiter(rate=20, per=1.0, burst=1)
+    start = time.monotonic()
+    for i in range(5):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.15, "Requests are paced to the rate"
+
+
+def test_follows_remaining_header():
+    limiter = RateLimiter(rate=100, per=60.0, margin=1)
+    limiter.update(200, {"X-RateLimit-Limit": "100", "X-RateLimit-Remaining": "3"})
+    assert limiter.reserve() == 0, "Requests left on the server"
+    assert limiter.reserve() == 0, "Requests left on the server"
+    assert limiter.reserve() > 0, "The margin is kept in hand"
+
+
+def test_blocks_until_reset():
+    limiter = RateLimiter()
+    limiter.update(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "30"})
+    assert limiter.reserve() > 29, "Wait for the window to reset"
+
+
+def test_retry_after():
+    limiter = RateLimiter()
+    limiter.update(429, {"Retry-After": "5"})
+    assert limiter.reserve() > 4, "Wait as long as the server asks"
+
+
+def test_retry_after_capped():
+    limiter = RateLimiter()
+    limiter.update(429, {"Retry-After": "3600"}, max_wait=2)
+    assert 1 < limiter.reserve() <= 2, "Wait no longer than max_wait"
+
+
+def test_cancel():
+    limiter = RateLimiter(rate=1, per=60.0)
+    assert limiter.reserve() == 0
+    limiter.cancel()
+    assert limiter.in_flight == 0
+    assert limiter.reserve() == 0, "The token was given back"
+
+
+def test_deadline():
+    limiter = RateLimiter(rate=1, per=5.0, burst=1)
+    with StubFloat({"people": [{"people_id": 1}]}) as stub:
+        api = stub.api(rate_limiter=limiter)
+        api.get_person(1)
+
+        start = time.monotonic()
+        with raises(DeadlineExceeded):
+            with api.limits(deadline=0.5):
+                api.get_person(2)
+        assert time.monotonic() - start < 0.1, "No waiting for a turn past the deadline"
+        assert len(stub.requests) == 1
+
+    assert limiter.in_flight == 0
+    assert 4 < limiter.reserve() <= 5, "The token was given back"
+
+
+def test_shared_between_clients():
+    limiter = RateLimiter(rate=2, per=60.0)
+    with StubFloat({"people": [{"people_id": 1}]}) as stub:
+        stub.api(rate_limiter=limiter).get_person(1)
+        stub.api(rate_limiter=limiter).get_person(1)
+    assert limiter.reserve() > 0, "Both clients took from the same bucket"
+
+
+def test_in_flight_requests():
+    limiter = RateLimiter(rate=100, per=60.0, margin=1)
+
+    # 4 requests in flight. The first response says 5 are left.
+    for i in range(4):
+        assert limiter.reserve() == 0
+    limiter.update(200, {"X-RateLimit-Remaining": "5"})
+
+    # The 3 still in flight will take 3 of them, and 1 is kept in hand
+    assert limiter.reserve() == 0
+    assert limiter.reserve() > 0
+
+
+def test_concurrent_requests_stay_below_limit():
+    limiter = RateLimiter(rate=1000, per=60.0, margin=0)
+    server = {"remaining": 40, "throttled": 0}
+    lock = threading.Lock()
+
+    def send():
+        while limiter.reserve() == 0:
+            time.sleep(0.005)
+            with lock:
+                server["remaining"] -= 1
+                server["throttled"] += server["remaining"] < 0
+                remaining = max(0, server["remaining"])
+            time.sleep(0.005)
+            limiter.update(200, {"X-RateLimit-Remaining": str(remaining)})
+
+    threads = [threading.Thread(target=send) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert server["throttled"] == 0, "No request is sent beyond the limit"
@@ -0,0 +1,42 @@
+from datetime import date
+from datetime import datetime
+
+from float_api import Task
+from stub_server import StubFloat
+
+
+def task(i):
+    return {
+        "task_id": i,
+        "project_id": 1,
+        "start_date": "2023-01-02",
+        "end_date": "2023-01-06",
+        "hours": 8,
+        "people_id": 2,
+        "modified": "2023-01-01 12:30:00",
+        "unknown_key": "value",
+    }
+
+
+def test_from_dict():
+    t = Task.from_dict(task(1))
+    assert t.task_id == 1, "Attributes are the keys"
+    assert t.start_date == date(2023, 1, 2), "Dates are parsed"
+    assert t.modified == datetime(2023, 1, 1, 12, 30), "Timestamps are parsed"
+    assert t["unknown_key"] == "value", "Unknown keys are kept"
+    assert not hasattr(t, "__dict__"), "Records have no __dict__"
+
+
+def test_to_dict():
+    d = Task.from_dict(task(1)).to_dict()
+    assert {k: d[k] for k in task(1)} == task(1), "Back to the object returned by the API"
+
+
+def test_get_all_as_records():
+    with StubFloat({"tasks": [task(i) for i in range(1, 301)]}) as stub:
+        api = stub.api()
+        tasks = api.get_all_tasks(as_records=True)
+        iterated = list(api.iter_all_tasks(as_records=True))
+        windowed = api.get_all_tasks("2023-01-01", "2023-01-31", window=7, as_records=True)
+    assert all(isinstance(t, Task) for t in tasks), "All tasks are records"
+    assert tasks == iterated == windowed, "Same records from all calls"
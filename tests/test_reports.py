@@ -0,0 +1,41 @@
+from datetime import date
+
+from stub_server import StubFloat
+
+
+def people_report(query):
+    """One scheduled hour per day and person"""
+    days = (date.fromisoformat(query["end_date"]) - date.fromisoformat(query["start_date"])).days + 1
+    ids = [int(query["people_id"])] if "people_id" in query else [1, 2, 3]
+    return {
+        "people": [
+            {
+                "people_id": i,
+                "department_id": 7,
+                "name": "Person {}".format(i),
+                "scheduled": days,
+                "capacity": 8.0 * days,
+                "logged": {"billable": 2 * days, "nonbillable": 0.5 * days, "project_id": 4},
+            }
+            for i in ids
+        ]
+    }
+
+
+def test_reports_in_windows_match_single_report():
+    with StubFloat({"reports/people": people_report}) as stub:
+        api = stub.api()
+        single = api.get_people_reports("2023-01-01", "2023-12-31")
+        windowed = api.get_people_reports("2023-01-01", "2023-12-31", window="month")
+        assert len(stub.requests) == 13, "One request per month"
+    assert windowed == single, "Numbers are summed per person"
+
+
+def test_reports_for_list_of_ids():
+    with StubFloat({"reports/people": people_report}) as stub:
+        api = stub.api()
+        reports = api.get_people_reports("2023-01-01", "2023-01-31", people_id=[1, 3], window=10)
+    assert [r["people_id"] for r in reports] == [1, 3], "One report per person"
+    assert reports[1]["scheduled"] == 31, "Windows are merged"
+    assert reports[1]["department_id"] == 7, "Ids are not summed"
+    assert reports[1]["logged"] == {"billable": 62, "nonbillable": 15.5, "project_id": 4}, "Nested numbers are summed"
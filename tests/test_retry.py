@@ -0,0 +1,182 @@
+import asyncio
+import socket
+import socketserver
+import threading
+from email.utils import formatdate
+import time
+
+import requests
+from pytest import fixture
+from pytest import raises
+
+from float_api import DeadlineExceeded
+from float_api import FloatAPI
+from float_api import MetricsCollector
+from float_api import RetryBudget
+from float_api import RetryPolicy
+from float_api.retry import retry_after
+from stub_server import StubFloat
+
+PEOPLE = [{"people_id": i, "name": "Person {}".format(i)} for i in range(1, 251)]
+
+
+@fixture
+def stub():
+    with StubFloat({"people": [dict(p) for p in PEOPLE]}, keep_alive=True) as stub:
+        yield stub
+
+
+def test_backoff():
+    policy = RetryPolicy(backoff_factor=1, max_backoff=4, jitter=False)
+    assert [policy.backoff(r) for r in range(5)] == [1, 2, 4, 4, 4]
+
+    policy = RetryPolicy(backoff_factor=1, max_backoff=4)
+    assert all(0 <= policy.backoff(10) <= 4 for _ in range(100))
+
+    # The server knows best, up to max_backoff
+    assert policy.backoff(0, {"Retry-After": "3"}) == 3
+    assert policy.backoff(0, {"Retry-After": "3600"}) == 4
+
+
+def test_retry_after():
+    assert retry_after({}) is None
+    assert retry_after({"Retry-After": "3"}) == 3
+    assert retry_after({"Retry-After": "soon"}) is None
+    assert 8 < retry_after({"Retry-After": formatdate(time.time() + 10, usegmt=True)}) <= 10
+
+
+def test_retry_error():
+    policy = RetryPolicy()
+    assert policy.retry_error("GET", False)
+    assert policy.retry_error("POST", True)
+    assert not policy.retry_error("POST", False)
+
+
+def local_api(port, **kwargs):
+    api = FloatAPI("token", "retry test", "test@example.com", **kwargs)
+    api.base_url = "http://127.0.0.1:{}/v3/{{}}".format(port)
+    return api
+
+
+def test_dropped_connection_not_retried():
+    received = []
+
+    # Reads the request, then closes the connection without answering
+    class Dropping(socketserver.BaseRequestHandler):
+        def handle(self):
+            received.append(self.request.recv(65536).split(b" ")[0])
+
+    with socketserver.ThreadingTCPServer(("127.0.0.1", 0), Dropping) as server:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        api = local_api(server.server_address[1], retry=RetryPolicy(retries=3, backoff_factor=0))
+
+        with raises(requests.ConnectionError):
+            api.create_person(name="X")
+        assert received == [b"POST"], "The person may have been created"
+
+        # Safe to send again
+        with raises(requests.ConnectionError):
+            api.get_person(1)
+        assert received[1:] == [b"GET"] * 4
+
+        server.shutdown()
+
+
+def test_connect_error_retried():
+    # A port nobody listens on
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    api = local_api(port, retry=RetryPolicy(retries=2, backoff_factor=0))
+
+    with raises(requests.ConnectionError) as e:
+        api.create_person(name="X")
+    assert api.transport.is_connect_error(e.value)
+
+
+def test_budget():
+    budget = RetryBudget(ratio=0.5, min_tokens=1, max_tokens=2)
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+
+    for _ in range(10):
+        budget.deposit()
+    assert budget.tokens == 2
+
+
+def test_retries(stub):
+    api = stub.api()
+    metrics = MetricsCollector()
+    api.add_hook(metrics)
+
+    stub.throttle = 2
+    assert api.get_person(1) == PEOPLE[0]
+    assert metrics.stats()["retries"] == 2
+    assert metrics.stats()["throttled"] == 2
+
+
+def test_budget_limits_retries(stub):
+    api = stub.api(retry=RetryPolicy(budget=RetryBudget(ratio=0, min_tokens=1)))
+
+    stub.throttle = 3
+    r = api._request("GET", api.base_url.format("people/1"))
+    assert r.status_code == 429
+    assert stub.throttle == 1
+
+
+def test_timeout(stub):
+    api = stub.api(timeout=(1, 0.05), retry=RetryPolicy(retries=0))
+
+    stub.latency = 0.3
+    with raises(requests.exceptions.Timeout):
+        api.get_person(1)
+
+    # A longer timeout for these calls only
+    with api.limits(timeout=1):
+        assert api.get_person(1) == PEOPLE[0]
+
+
+def test_deadline_spans_pages(stub):
+    api = stub.api(max_workers=1)
+
+    stub.latency = 0.1
+    start = time.monotonic()
+    with raises(DeadlineExceeded):
+        with api.limits(deadline=0.25):
+            api._get_all_pages("people", [], {"per_page": 50})
+    assert time.monotonic() - start < 0.5
+
+    # Nested blocks can not extend the deadline
+    with api.limits(deadline=0.05):
+        with api.limits(deadline=10):
+            with raises(DeadlineExceeded):
+                api.get_person(1)
+
+
+def test_client_deadline(stub):
+    api = stub.api(deadline=0.05)
+
+    stub.latency = 0.2
+    with raises(DeadlineExceeded):
+        api.get_person(1)
+
+
+def test_async_deadline(stub):
+    async def run(api):
+        async with api:
+            stub.throttle = 1
+            assert await api.get_person(1) == PEOPLE[0]
+
+            stub.latency = 0.2
+            with api.limits(deadline=0.05):
+                await api.get_person(1)
+
+    with raises(DeadlineExceeded):
+        asyncio.run(run(stub.async_api()))
@@ -0,0 +1,182 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pytest import fixture
+from pytest import raises
+
+from float_api import DeadlineExceeded
+from float_api import MetricsCollector
+from float_api import UnexpectedStatusCode
+from stub_server import StubFloat
+
+PEOPLE = [{"people_id": i, "name": "Person {}".format(i)} for i in range(1, 101)]
+
+
+@fixture
+def stub():
+    with StubFloat({"people": [dict(p) for p in PEOPLE]}, keep_alive=True) as stub:
+        stub.latency = 0.2
+        yield stub
+
+
+def concurrently(function, n=8):
+    barrier = threading.Barrier(n)
+
+    def call(_):
+        barrier.wait()
+        try:
+            return function()
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=n) as executor:
+        return list(executor.map(call, range(n)))
+
+
+def test_get_shared(stub):
+    api = stub.api(pool_maxsize=8)
+    metrics = MetricsCollector()
+    api.add_hook(metrics)
+
+    results = concurrently(lambda: api.get_person(1))
+
+    assert results == [PEOPLE[0]] * 8
+    assert metrics.stats()["requests"] == 1
+    assert api.single_flight.shared == 7
+
+    # Every caller gets its own copy
+    results[0]["name"] = "Changed"
+    assert results[1]["name"] == "Person 1"
+
+
+def test_pages_shared(stub):
+    api = stub.api(pool_maxsize=8, max_workers=2)
+    metrics = MetricsCollector()
+    api.add_hook(metrics)
+
+    results = concurrently(lambda: api._get_all_pages("people", [], {"per_page": 25}))
+
+    assert results == [PEOPLE] * 8
+    assert metrics.stats()["requests"] == 4
+    assert len(set(id(r) for r in results)) == 8
+
+    # The next call is not shared
+    api.get_all_people()
+    assert metrics.stats()["requests"] == 5
+
+
+def test_error_shared(stub):
+    api = stub.api(pool_maxsize=8)
+    metrics = MetricsCollector()
+    api.add_hook(metrics)
+
+    results = concurrently(lambda: api._get("people/999", {}))
+
+    assert all(isinstance(r, UnexpectedStatusCode) for r in results)
+    assert metrics.stats()["requests"] == 1
+
+
+def test_disabled(stub):
+    api = stub.api(pool_maxsize=8, single_flight=False)
+    metrics = MetricsCollector()
+    api.add_hook(metrics)
+
+    concurrently(lambda: api.get_person(1))
+    assert metrics.stats()["requests"] == 8
+
+
+def test_deadline_of_waiter(stub):
+    api = stub.api()
+    started = threading.Event()
+
+    def first():
+        api.add_hook(lambda event, info: started.set())
+        return api.get_person(1)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(first)
+        started.wait()
+
+        # Gives up on the request of the other thread
+        with raises(DeadlineExceeded):
+            with api.limits(deadline=0.05):
+                api.get_person(1)
+
+        assert future.result() == PEOPLE[0]
+
+
+def test_deadline_of_leader(stub):
+    api = stub.api()
+    started = threading.Event()
+
+    def first():
+        api.add_hook(lambda event, info: started.set())
+        with api.limits(deadline=0.1):
+            return api.get_person(1)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(first)
+        started.wait()
+        time.sleep(0.02)
+
+        # Makes the request again, instead of raising the
+        # DeadlineExceeded of the other thread
+        assert api.get_person(1) == PEOPLE[0]
+
+        with raises(DeadlineExceeded):
+            future.result()
+
+    assert api.single_flight.shared == 1
+    assert len(stub.requests) == 2
+
+
+def test_async_deadline_of_leader(stub):
+    async def run(api):
+        async def first():
+            with api.limits(deadline=0.1):
+                return await api.get_person(1)
+
+        async with api:
+            leader = asyncio.ensure_future(first())
+            await asyncio.sleep(0.02)
+            result = await api.get_person(1)
+            with raises(DeadlineExceeded):
+                await leader
+            return result
+
+    api = stub.async_api()
+    assert asyncio.run(run(api)) == PEOPLE[0]
+    assert api.single_flight.shared == 1
+    assert len(stub.requests) == 2
+
+
+def test_async_shared(stub):
+    async def run(api):
+        async with api:
+            return await asyncio.gather(*[api.get_person(1) for _ in range(8)])
+
+    api = stub.async_api()
+    metrics = MetricsCollector()
+    api.add_hook(metrics)
+
+    results = asyncio.run(run(api))
+    assert results == [PEOPLE[0]] * 8
+    assert metrics.stats()["requests"] == 1
+    assert len(set(id(r) for r in results)) == 8
+
+
+def test_not_shared_after_write(stub):
+    api = stub.api()
+    started = threading.Event()
+    api.add_hook(lambda event, info: event == "call_start" and started.set())
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        before = executor.submit(api.get_person, 1)
+        started.wait()
+
+        # Requests in flight may not see the update
+        api.update_person(people_id=1, name="New")
+        assert api.get_person(1)["name"] == "New"
+        assert before.result()["people_id"] == 1
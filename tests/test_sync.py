@@ -0,0 +1,49 @@
+from float_api import SyncEngine
+from stub_server import StubFloat
+
+
+def task(task_id, modified):
+    return {"task_id": task_id, "modified": modified}
+
+
+def test_incremental_sync():
+    tasks = [task(i, "2023-01-01 00:00:00") for i in range(1, 101)]
+    with StubFloat({"tasks": tasks}) as stub:
+        engine = SyncEngine(stub.api(), entities=["tasks"])
+
+        changes = engine.sync()
+        assert len(changes["tasks"]["updated"]) == 100, "First sync gets everything"
+        assert engine.high_water["tasks"] == "2023-01-01 00:00:00", "High-water mark is set"
+
+        # Change one task, add one and delete one
+        stub.data["tasks"][0]["modified"] = "2023-02-01 00:00:00"
+        stub.data["tasks"].append(task(101, "2023-02-02 00:00:00"))
+        stub.data["tasks"].pop(50)
+
+        changes = engine.sync_entity("tasks")
+        assert sorted(changes["updated"]) == [1, 101], "Only changed tasks"
+        assert changes["deleted"] == [51], "Deleted task is detected"
+        assert len(engine.store["tasks"]) == 100, "Store mirrors Float"
+        assert engine.high_water["tasks"] == "2023-02-02 00:00:00", "High-water mark moves"
+
+        changes = engine.sync_entity("tasks")
+        assert changes == {"updated": [], "deleted": []}, "Nothing changed"
+
+
+def test_sync_requests():
+    tasks = [task(i, "2023-01-01 00:00:00") for i in range(1, 2000)]
+    tasks.append(task(2000, "2023-01-02 00:00:00"))
+    with StubFloat({"tasks": tasks}) as stub:
+        engine = SyncEngine(stub.api(), entities=["tasks"])
+        engine.sync()
+
+        # Nothing changed: the delta and the count
+        stub.requests.clear()
+        assert engine.sync_entity("tasks") == {"updated": [], "deleted": []}
+        assert len(stub.requests) == 2, "No crawl of the ids"
+
+        # A deletion: the delta, the count and the 10 pages of ids
+        stub.data["tasks"].pop(0)
+        stub.requests.clear()
+        assert engine.sync_entity("tasks")["deleted"] == [1]
+        assert len(stub.requests) == 12
@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from float_api import MetricsCollector
+from float_api import ResponseCache
+from stub_server import StubFloat
+
+THREADS = 32
+
+
+def test_params_are_not_changed():
+    with StubFloat({"people": [{"people_id": i} for i in range(1, 31)]}) as stub:
+        api = stub.api()
+        params = {"per_page": 10, "fields": "people_id"}
+        assert len(api._get_all_pages("people", [], params)) == 30
+        assert len(list(api._iter_all_pages("people", [], params))) == 30
+        assert params == {"per_page": 10, "fields": "people_id"}, "The caller's params are left untouched"
+
+
+def test_shared_client():
+    people = [{"people_id": i, "name": "Person {}".format(i)} for i in range(1, 501)]
+    metrics = MetricsCollector()
+
+    with StubFloat({"people": people}, keep_alive=True) as stub:
+        # Keep all threads busy at the same time
+        stub.latency = 0.005
+        api = stub.api(max_workers=1, pool_maxsize=THREADS, pool_block=True, cache=ResponseCache())
+        api.add_hook(metrics)
+
+        def work(n):
+            for i in range(5):
+                people_id = 1 + (n * 5 + i) % 500
+                assert len(api.get_all_people()) == 500
+                assert len(api.get_all_people(fields="people_id")[0]) == 1
+                name = "Thread {} round {}".format(n, i)
+                api.update_person(people_id=people_id, name=name)
+                assert api.get_person(people_id)["name"] == name, "Cache is consistent per object"
+            return n
+
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            assert list(executor.map(work, range(THREADS))) == list(range(THREADS))
+
+        requests_sent = len(stub.requests)
+
+    # Identical requests in flight at the same time are sent once
+    assert requests_sent == metrics.stats()["requests"] == THREADS * 5 * 7 - api.single_flight.shared
+    assert stub.connections <= THREADS, "Connections are kept open and reused"
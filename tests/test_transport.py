@@ -0,0 +1,82 @@
+from pytest import fixture
+from pytest import raises
+
+from float_api import Cassette
+from float_api import HTTPXTransport
+from float_api import MetricsCollector
+from float_api import RequestsTransport
+from float_api import Transport
+from float_api import UnexpectedStatusCode
+from stub_server import StubFloat
+
+PEOPLE = [{"people_id": i, "name": "Person {}".format(i)} for i in range(1, 251)]
+
+
+@fixture
+def stub():
+    with StubFloat({"people": [dict(p) for p in PEOPLE]}, keep_alive=True) as stub:
+        yield stub
+
+
+def httpx_api(stub, **kwargs):
+    return stub.api(transport=HTTPXTransport(http2=False), **kwargs)
+
+
+def test_default_transport(stub):
+    api = stub.api(pool_maxsize=20)
+    assert isinstance(api.transport, RequestsTransport)
+    assert api.session is api.transport.session
+
+
+def test_httpx_transport(stub):
+    api = httpx_api(stub, max_workers=4)
+    metrics = MetricsCollector()
+    api.add_hook(metrics)
+
+    stub.throttle = 1
+    assert api._get_all_pages("people", [], {"per_page": 50, "fields": None}) == PEOPLE
+    assert api.update_person(people_id=1, name="New")["name"] == "New"
+    assert api.get_person(1)["name"] == "New"
+    assert api.delete_person(2)
+    with raises(UnexpectedStatusCode):
+        api.get_person(2)
+
+    stats = metrics.stats()
+    assert stats["retries"] == 1 and stats["throttled"] == 1 and stats["bytes_sent"] > 0
+    assert stub.connections <= 4, "Connections are reused"
+    api.close()
+
+
+def test_httpx_bulk_errors(stub):
+    api = httpx_api(stub)
+    results = api.bulk_delete_people([1, 1000])
+    assert results[1].ok and isinstance(results[1000].error, UnexpectedStatusCode)
+
+
+def test_httpx_cassette(stub, tmp_path):
+    path = str(tmp_path / "people.json")
+    api = httpx_api(stub)
+    with Cassette(path).mount(api):
+        recorded = api._get_all_pages("people", [], {"per_page": 100})
+
+    stub.data["people"] = []
+    with Cassette(path).mount(api):
+        assert api._get_all_pages("people", [], {"per_page": 100}) == recorded == PEOPLE
+
+
+def test_custom_transport(stub):
+    class Counting(RequestsTransport):
+        def __init__(self):
+            super().__init__()
+            self.sent = []
+
+        def request(self, method, url, headers, params=None, json=None, timeout=None):
+            self.sent.append(method)
+            return super().request(method, url, headers, params, json, timeout)
+
+    transport = Counting()
+    assert isinstance(transport, Transport)
+    api = stub.api(transport=transport)
+    api.get_all_people()
+    api.update_person(people_id=3, name="Three")
+    assert transport.sent == ["GET", "GET", "PATCH"]